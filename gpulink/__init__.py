@@ -1,15 +1,48 @@
+from gpulink.clock import Clock, ClockAnchor, MonotonicClock, PerfCounterClock, default_clock, set_default_clock
 from gpulink.devices.device_mock import DeviceMock
 from gpulink.devices.devicectx import DeviceCtx
 from gpulink.devices.gpu import GpuSet, Gpu
-from gpulink.devices.nvml_defines import TemperatureThreshold, ClockId, ClockType, TemperatureSensorType
+from gpulink.devices.nvml_defines import TemperatureThreshold, ClockId, ClockType, TemperatureSensorType, \
+    PcieUtilCounter, SamplingType, ThrottleReason
 from gpulink.devices.nvml_device import LocalNvmlGpu
-from gpulink.devices.query import MemInfo, SimpleResult
+from gpulink.devices.shm_device import TelemetryPublisher, SharedMemoryDevice
+from gpulink.devices.tracing import QueryHook, ChromeTraceExporter, add_hook, remove_hook
+from gpulink.devices.query import MemInfo, SimpleResult, ProcessInfo, ProcessResult, UtilizationInfo, SampleResult
+from gpulink.plotting.batch import save_plots
+from gpulink.plotting.dashboard import Dashboard
 from gpulink.plotting.plot import Plot
+from gpulink.recording.alerts import AlertEngine, Alert, Rule, Condition, LogSink, FileSink, WebhookSink
+from gpulink.recording.catalog import RecordingCatalog, Query, Table
+from gpulink.recording.compare import Comparison, GpuComparison, compare_recordings
 from gpulink.recording.gpu_recording import Recording
-from gpulink.recording.recorder import Recorder, record, RecType
+from gpulink.recording.instrumentation import RecorderStats, Histogram, HistogramSnapshot
+from gpulink.recording.markers import mark, span, Markers, SpanStats
+from gpulink.recording.metrics import Metric, register_metric, get_metric
+from gpulink.units import Unit, get_unit, conversion_factor
+from gpulink.recording.process_recorder import ProcessRecorder, ProcessRecording
+from gpulink.recording.recorder import Recorder, record, RecType, SharedSampler, shared_sampler, SAMPLE_DTYPE, \
+    release_shared_samplers
+from gpulink.recording.rollup import Rollup, Buckets
+from gpulink.recording.segmentation import Segment, segment_timeseries, find_change_points
+from gpulink.recording.storage import save_recording, load_recording
+from gpulink.recording.store import RecordingStore, Window
 from gpulink.recording.timeseries import TimeSeries
 
 __all__ = ["DeviceCtx", "DeviceMock", "Plot", "Recorder", "record", "RecType", "TemperatureThreshold",
            "ClockId", "ClockType", "TemperatureSensorType", "LocalNvmlGpu", "Gpu", "GpuSet", "MemInfo", "SimpleResult",
-           "TimeSeries", "Recording"]
+           "TimeSeries", "Recording", "ProcessInfo", "ProcessResult", "ProcessRecorder", "ProcessRecording",
+           "PcieUtilCounter", "SamplingType", "ThrottleReason", "UtilizationInfo", "SampleResult",
+           "save_recording", "load_recording", "RecordingStore", "Window", "save_plots", "Dashboard",
+           "TelemetryPublisher", "SharedMemoryDevice", "QueryHook", "ChromeTraceExporter", "add_hook", "remove_hook",
+           "SharedSampler", "shared_sampler", "release_shared_samplers", "SAMPLE_DTYPE",
+           "Rollup", "Buckets",
+           "AlertEngine", "Alert", "Rule", "Condition", "LogSink", "FileSink", "WebhookSink",
+           "Comparison", "GpuComparison", "compare_recordings",
+           "Segment", "segment_timeseries", "find_change_points",
+           "RecordingCatalog", "Query", "Table",
+           "RecorderStats", "Histogram", "HistogramSnapshot",
+           "mark", "span", "Markers", "SpanStats",
+           "Clock", "ClockAnchor", "MonotonicClock", "PerfCounterClock", "default_clock", "set_default_clock",
+           "Metric", "register_metric", "get_metric",
+           "Unit", "get_unit", "conversion_factor"]
 __version__ = "0.6.0"
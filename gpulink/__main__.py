@@ -1,8 +1,13 @@
 import click
 
 import gpulink
+from gpulink.cli.cmd_compare import compare
+from gpulink.cli.cmd_publish import publish
+from gpulink.cli.cmd_query import query
 from gpulink.cli.cmd_record import record
+from gpulink.cli.cmd_run import run
 from gpulink.cli.cmd_sensors import sensors
+from gpulink.cli.cmd_view import view
 
 
 @click.group()
@@ -13,6 +18,11 @@ def gpu_link():
 
 gpu_link.add_command(sensors)
 gpu_link.add_command(record)
+gpu_link.add_command(view)
+gpu_link.add_command(run)
+gpu_link.add_command(publish)
+gpu_link.add_command(compare)
+gpu_link.add_command(query)
 
 
 def main():
@@ -0,0 +1,41 @@
+import click
+
+from gpulink.recording.storage import load_recording
+
+
+@click.command(name="compare")
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("candidate", type=click.Path(exists=True, dir_okay=False))
+@click.option('--ks-threshold', type=click.FloatRange(min=0, max=1), default=None,
+              help="Minimum KS distance to flag a difference.")
+@click.option('--peak-threshold', type=click.FloatRange(min=0), default=None,
+              help="Minimum relative peak change to flag a difference, e.g. 0.05 for 5%.")
+@click.option('--fail', is_flag=True, help="Exit with code 1 if a significant difference is found.")
+@click.pass_context
+def compare(ctx, baseline: str, candidate: str, ks_threshold: float, peak_threshold: float, fail: bool) -> None:
+    """
+    Compare two stored recordings of the same property.
+
+    \f
+    :param ctx: The click context.
+    :param baseline: The path to the reference recording.
+    :param candidate: The path to the recording to be checked.
+    :param ks_threshold: The minimum KS distance to flag a difference.
+    :param peak_threshold: The minimum relative peak change to flag a difference.
+    :param fail: If true, the command fails if a significant difference is found.
+    :return: None
+    """
+    thresholds = {}
+    if ks_threshold is not None:
+        thresholds["ks_threshold"] = ks_threshold
+    if peak_threshold is not None:
+        thresholds["peak_threshold"] = peak_threshold
+    try:
+        comparison = load_recording(baseline).compare(load_recording(candidate), **thresholds)
+    except ValueError as e:
+        click.secho(str(e), fg="red", err=True)
+        ctx.exit(code=-1)
+
+    click.echo(comparison)
+    if fail and comparison.significant:
+        ctx.exit(code=1)
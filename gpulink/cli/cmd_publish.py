@@ -0,0 +1,39 @@
+from typing import Optional
+
+import click
+
+from gpulink.cli.stop import StopCondition
+from gpulink.devices.devicectx import DeviceCtx
+from gpulink.devices.shm_device import TelemetryPublisher
+
+
+@click.command(name="publish")
+@click.option('--name', '-n', type=str, default=None,
+              help="Name of the shared memory block (default: $GPULINK_SHM_NAME or 'gpulink').")
+@click.option('--capacity', '-c', type=click.IntRange(min=1), default=1024,
+              help="Number of samples per GPU kept in shared memory.")
+@click.option('--interval', '-i', type=click.FloatRange(min=0), default=0.1, help="Time between two samples [s].")
+@click.option('--duration', '-d', type=click.FloatRange(min=0), default=None,
+              help="Stop publishing after the given time [s].")
+def publish(name: Optional[str], capacity: int, interval: float, duration: Optional[float]) -> None:
+    """
+    Publish GPU telemetry into shared memory for local consumers.
+
+    \f
+    :param name: The name of the shared memory block.
+    :param capacity: The number of samples per GPU kept in shared memory.
+    :param interval: The time [s] between two samples.
+    :param duration: The time [s] after which publishing stops.
+    :return: None
+    """
+    with DeviceCtx() as ctx:
+        publisher = TelemetryPublisher(ctx, name=name, capacity=capacity, interval=interval)
+        try:
+            with StopCondition(duration=duration) as stop_condition:
+                publisher.start()
+                click.echo(f"Publishing telemetry as '{publisher.name}'")
+                reason = stop_condition.wait()
+            publisher.stop(auto_join=True)
+            click.echo(f"Publishing stopped: {reason}")
+        finally:
+            publisher.close()
@@ -0,0 +1,55 @@
+from typing import Optional, Tuple
+
+import click
+
+from gpulink.cli.cmd_run import METRICS
+from gpulink.recording.catalog import RecordingCatalog, GROUP_KEYS
+
+
+@click.command(name="query")
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option('--aggregate', '-a', 'aggregations', multiple=True, default=("count", "mean", "max"),
+              help="Aggregation, e.g. mean, std, min, max, count, sum or p99 (repeatable).")
+@click.option('--group-by', '-g', 'groups', type=click.Choice(GROUP_KEYS), multiple=True, default=("name", "gpu"),
+              help="Key to group the time series by (repeatable).")
+@click.option('--metric', '-m', 'metrics', type=click.Choice(sorted(METRICS)), multiple=True,
+              help="Recorded property to be included (repeatable).")
+@click.option('--gpu', 'gpus', type=int, multiple=True, help="GPU id to be included (repeatable).")
+@click.option('--name', '-n', type=str, default=None, help="Shell-style pattern of the recording names.")
+@click.option('--start', '-s', type=float, default=None,
+              help="Start of the time range [s] relative to the first sample of each recording.")
+@click.option('--end', '-e', type=float, default=None,
+              help="End of the time range [s] relative to the first sample of each recording.")
+@click.option('--pattern', type=str, default="*.rec", help="File pattern of the stored recordings.")
+@click.pass_context
+def query(ctx, directory: str, aggregations: Tuple[str, ...], groups: Tuple[str, ...], metrics: Tuple[str, ...],
+          gpus: Tuple[int, ...], name: Optional[str], start: Optional[float], end: Optional[float],
+          pattern: str) -> None:
+    """
+    Aggregate a directory of stored recordings.
+
+    \f
+    :param ctx: The click context.
+    :param directory: The directory containing the stored recordings.
+    :param aggregations: The aggregations per group.
+    :param groups: The keys to group the time series by.
+    :param metrics: The recorded properties to be included.
+    :param gpus: The GPU ids to be included.
+    :param name: A shell-style pattern of the recording names.
+    :param start: Start of the time range [s] relative to the first sample of each recording.
+    :param end: End of the time range [s] relative to the first sample of each recording.
+    :param pattern: The file pattern of the stored recordings.
+    :return: None
+    """
+    catalog_query = RecordingCatalog(directory, pattern).query().where(
+        gpus=gpus if gpus else None,
+        rtypes=[METRICS[metric] for metric in metrics] if metrics else None,
+        name=name,
+        start=start,
+        end=end
+    ).group_by(*groups)
+    try:
+        click.echo(catalog_query.aggregate(*aggregations))
+    except ValueError as e:
+        click.secho(str(e), fg="red", err=True)
+        ctx.exit(code=-1)
@@ -1,16 +1,20 @@
 from dataclasses import dataclass
 from itertools import cycle
 from pathlib import Path
-from time import perf_counter
 from typing import Callable, Optional, List
 
 import click
-from matplotlib import pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-from gpulink import DeviceCtx, Plot, Recorder
+from gpulink import DeviceCtx, Plot, Recorder, ThrottleReason
 from gpulink.cli.console import get_spinner, set_cursor
-from gpulink.consts import MB, WATTS
-from gpulink.recording.gpu_recording import Recording
+from gpulink.cli.stop import StopCondition, is_interactive
+from gpulink.clock import default_clock
+from gpulink.consts import SEC
+from gpulink.plotting.live_plot import LivePlot
+from gpulink.recording.gpu_recording import Recording, RecType
+from gpulink.recording.storage import save_recording
 
 
 class Callback:
@@ -23,8 +27,8 @@ class Callback:
             click.echo("Press any key to abort...\n[RECORDING] ", nl=False)
             click.secho(f"{next(spinner)}{set_cursor(1, 1)}", nl=False, fg="green")
 
-        ts = perf_counter()
-        if ts - self._last_ts > 0.10:
+        ts = default_clock().now()
+        if ts - self._last_ts > 0.10 * SEC:
             _echo(self._spinner)
             self._last_ts = ts
 
@@ -37,21 +41,31 @@ _callback: Optional[Callback] = None
 class _RecOptions:
     plot: bool
     output: Optional[Path] = None
+    live: bool = False
+    interval: Optional[float] = None
+    buffered: bool = False
+    save: Optional[Path] = None
+    duration: Optional[float] = None
+    until_pid: Optional[int] = None
     spinner = get_spinner()
 
 
 def _check_output_file_type(output_path: Path) -> bool:
-    supported_file_types = plt.gcf().canvas.get_supported_filetypes()
-    # Necessary to ensure that implicitly created figure is deleted
-    plt.clf()
-    plt.cla()
-    plt.close()
+    supported_file_types = FigureCanvasAgg.get_supported_filetypes()
     if output_path and output_path.suffix[1:] not in supported_file_types:
         click.secho(f"Output format '{output_path.suffix}' not supported", fg="red")
         return False
     return True
 
 
+# The units recordings are converted to per default while recording
+DEFAULT_UNITS = {
+    RecType.REC_TYPE_MEMORY: "MB",
+    RecType.REC_TYPE_POWER_USAGE: "W",
+    RecType.REC_TYPE_ENERGY: "J",
+}
+
+
 def _store_records(recording: Recording, rec_options: _RecOptions):
     graph = Plot(recording)
     graph.save(rec_options.output)
@@ -62,28 +76,62 @@ def _display_plot(recording: Recording):
     p.plot()
 
 
+def _describe_throttle_reasons(recording: Recording) -> str:
+    lines = []
+    for gpu, timeseries in zip(recording.gpus, recording.timeseries):
+        occurred = ThrottleReason(int(np.bitwise_or.reduce(timeseries.data.astype(np.int64)))) \
+            if timeseries.data.size else ThrottleReason.NONE
+        reasons = [reason.name for reason in ThrottleReason if reason and reason in occurred]
+        lines.append(f"GPU {gpu.id} throttle reasons: {', '.join(reasons) if reasons else 'NONE'}")
+    return "\n".join(lines)
+
+
+_BUFFERED_FACTORIES = [
+    Recorder.create_power_usage_recorder,
+    Recorder.create_gpu_utilization_recorder,
+    Recorder.create_memory_utilization_recorder
+]
+
+
 def _handle_record(rec_options: _RecOptions, factory_method: Callable, gpus: Optional[List[int]] = None):
     global _callback
+    if rec_options.buffered and factory_method not in _BUFFERED_FACTORIES:
+        click.secho("Buffered recording is only supported for power-usage and utilization", fg="red")
+        return
+    # Without a terminal (batch schedulers, systemd, nohup) neither the spinner nor any other UI is used
+    interactive = is_interactive()
+    headless = not interactive or rec_options.duration is not None or rec_options.until_pid is not None
     with DeviceCtx() as ctx:
         gpus = gpus if gpus else ctx.gpus.ids
-        _callback = Callback(rec_options.spinner)
-        recorder = factory_method(ctx, gpus, callback=_callback.echo)
+        _callback = Callback(rec_options.spinner) if interactive else None
+        kwargs = {"buffered": True} if rec_options.buffered else {}
+        recorder = factory_method(ctx, gpus, callback=_callback.echo if _callback else None,
+                                  interval=rec_options.interval, **kwargs)
+        if recorder.rtype in DEFAULT_UNITS:
+            recorder.convert_to(DEFAULT_UNITS[recorder.rtype])
         with recorder:
+            if interactive:
+                click.clear()
+            if rec_options.live:
+                click.echo("Close the plot window to abort...")
+                LivePlot(recorder).show()
+            elif headless:
+                with StopCondition(rec_options.duration, rec_options.until_pid) as stop_condition:
+                    reason = stop_condition.wait()
+            else:
+                click.pause(info="")
+        if interactive:
             click.clear()
-            click.pause(info="")
-        click.clear()
+        if headless and not rec_options.live:
+            click.echo(f"Recording stopped: {reason}")
         recording = recorder.get_recording()
-
-        # If memory was recorded: convert the output to MB per default
-        if factory_method == Recorder.create_memory_recorder:
-            recording.convert(MB, "MB")
-
-        # If power-consumption was recorded: convert the output to W per default
-        if factory_method == Recorder.create_power_usage_recorder:
-            recording.convert(WATTS, "W")
-
         click.echo(recording)
 
+        if factory_method == Recorder.create_throttle_reasons_recorder:
+            click.echo(_describe_throttle_reasons(recording))
+
+    if rec_options.save:
+        save_recording(recording, rec_options.save)
     if rec_options.output:
         _store_records(recording, rec_options)
     if rec_options.plot:
@@ -93,15 +141,36 @@ def _handle_record(rec_options: _RecOptions, factory_method: Callable, gpus: Opt
 @click.group()
 @click.option('--plot', '-p', is_flag=True, help="Displays a plot of the recorded GPU property over time.")
 @click.option('--output', '-o', type=click.Path(), default=None, help="File path to store the GPU plot.")
+@click.option('--live', '-l', is_flag=True,
+              help="Displays a live plot while recording. Closing it stops the recording.")
+@click.option('--interval', '-i', type=click.FloatRange(min=0), default=None,
+              help="Time [s] to wait between two samples. Samples are taken continuously if not set.")
+@click.option('--buffered', '-b', is_flag=True,
+              help="Drain the driver sample buffer instead of polling (power-usage and utilization only).")
+@click.option('--save', '-s', type=click.Path(dir_okay=False), default=None,
+              help="File path to store the recording (e.g. for 'gpulink view').")
+@click.option('--duration', '-d', type=click.FloatRange(min=0), default=None,
+              help="Stop recording after the given time [s].")
+@click.option('--until-pid', type=int, default=None, help="Stop recording when the process with the given id exits.")
 @click.pass_context
-def record(ctx, plot: bool, output: str) -> None:
+def record(ctx, plot: bool, output: str, live: bool, interval: Optional[float], buffered: bool,
+           save: Optional[str], duration: Optional[float], until_pid: Optional[int]) -> None:
     """
     Record GPU properties.
 
+    Recording stops on a key press. If --duration or --until-pid is given or stdout is not a terminal,
+    recording stops on the given condition or on SIGTERM/SIGINT instead.
+
     \f
     :param ctx: The Command context.
     :param plot: If true, a plot of the recorded GPU property is displayed.
     :param output: File path to store the GPU plot.
+    :param live: If true, a live plot is displayed while recording.
+    :param interval: Time [s] to wait between two samples.
+    :param buffered: If true, the driver sample buffer is drained once per interval.
+    :param save: File path to store the recording.
+    :param duration: Time [s] after which recording stops.
+    :param until_pid: Id of a process whose exit stops recording.
     :return: None
     """
     if output:
@@ -111,7 +180,13 @@ def record(ctx, plot: bool, output: str) -> None:
 
     ctx.obj = _RecOptions(
         plot=plot,
-        output=output
+        output=output,
+        live=live,
+        interval=interval,
+        buffered=buffered,
+        save=Path(save) if save else None,
+        duration=duration,
+        until_pid=until_pid
     )
 
 
@@ -159,6 +234,106 @@ def power_usage(rec_options: _RecOptions) -> None:
     _handle_record(rec_options, Recorder.create_power_usage_recorder)
 
 
+@record.command()
+@click.pass_obj
+def energy(rec_options: _RecOptions) -> None:
+    """
+    Record GPU energy consumption.
+    \f
+    :return: None
+    """
+    _handle_record(rec_options, Recorder.create_energy_recorder)
+
+
+@record.command()
+@click.pass_obj
+def throttle_reasons(rec_options: _RecOptions) -> None:
+    """
+    Record GPU clock throttle reasons.
+    \f
+    :return: None
+    """
+    _handle_record(rec_options, Recorder.create_throttle_reasons_recorder)
+
+
+@record.group()
+@click.pass_obj
+def utilization(rec_options: _RecOptions) -> None:
+    """
+    Record a GPU utilization (gpu or memory).
+
+    \f
+    :param rec_options: The recording options.
+    :return: None
+    """
+    pass
+
+
+@utilization.command(name="gpu")
+@click.pass_obj
+def gpu_utilization(rec_options: _RecOptions) -> None:
+    """
+    Record the GPU (SM) utilization.
+
+    \f
+    :param rec_options: The recording options.
+    :return: None
+    """
+    _handle_record(rec_options, Recorder.create_gpu_utilization_recorder)
+
+
+@utilization.command(name="memory")
+@click.pass_obj
+def memory_utilization(rec_options: _RecOptions) -> None:
+    """
+    Record the GPU memory utilization.
+
+    \f
+    :param rec_options: The recording options.
+    :return: None
+    """
+    _handle_record(rec_options, Recorder.create_memory_utilization_recorder)
+
+
+@record.group()
+@click.pass_obj
+def pcie(rec_options: _RecOptions) -> None:
+    """
+    Record the GPU PCIe throughput (tx or rx).
+
+    \f
+    :param rec_options: The recording options.
+    :return: None
+    """
+    pass
+
+
+@pcie.command()
+@click.pass_obj
+def tx(rec_options: _RecOptions) -> None:
+    """
+    Record the GPU PCIe transmit throughput.
+
+    \f
+    :param rec_options: The recording options.
+    :return: None
+    """
+    _handle_record(rec_options, Recorder.create_pcie_tx_recorder)
+
+
+@pcie.command()
+@click.pass_obj
+def rx(rec_options: _RecOptions) -> None:
+    """
+    Record the GPU PCIe receive throughput.
+
+    \f
+    :param rec_options: The recording options.
+    :return: None
+    """
+    _handle_record(rec_options, Recorder.create_pcie_rx_recorder)
+
+
 @record.group()
 @click.pass_obj
 def clock(rec_options: _RecOptions) -> None:
@@ -0,0 +1,138 @@
+import signal
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Tuple, Type, Dict
+
+import click
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from gpulink.cli.cmd_record import DEFAULT_UNITS
+from gpulink.devices.base_device import BaseDevice
+from gpulink.devices.devicectx import DeviceCtx
+from gpulink.devices.nvml_device import LocalNvmlGpu
+from gpulink.plotting.dashboard import Dashboard
+from gpulink.recording.gpu_recording import Recording, RecType
+from gpulink.recording.recorder import Recorder
+from gpulink.recording.storage import save_recording
+
+# The default time between two samples [s] - keeps the sampler cheap compared to the recorded command
+RUN_INTERVAL = 0.1
+
+# Maps the metric names accepted by 'gpulink run' to the corresponding RecType, e.g. 'power-usage'
+METRICS = {rtype.name[len("REC_TYPE_"):].lower().replace("_", "-"): rtype for rtype in RecType}
+
+
+class _SignalForwarder:
+    """
+    Forwards SIGTERM to a child process while the context is entered.
+    The child shares the foreground process group of the terminal, which already delivers SIGINT (Ctrl-C) to it, so
+    SIGINT is only ignored here to keep recording until the child has shut down. Forwarding it as well would deliver
+    it twice, which makes many programs skip their graceful shutdown.
+    """
+
+    def __init__(self, child: subprocess.Popen):
+        self._child = child
+        self._previous_handlers = {}
+
+    def _forward(self, signum, _frame):
+        self._child.send_signal(signum)
+
+    def _ignore(self, _signum, _frame):
+        pass
+
+    def __enter__(self):
+        self._previous_handlers[signal.SIGTERM] = signal.signal(signal.SIGTERM, self._forward)
+        self._previous_handlers[signal.SIGINT] = signal.signal(signal.SIGINT, self._ignore)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+
+
+def run_and_record(command: List[str], rtypes: List[RecType], device: Type[BaseDevice] = LocalNvmlGpu,
+                   gpus: Optional[List[int]] = None, interval: Optional[float] = RUN_INTERVAL,
+                   units: Optional[Dict[RecType, str]] = None) -> Tuple[int, List[Recording]]:
+    """
+    Runs a command in a child process and records GPU properties for its lifetime.
+    Sampling happens in this process, so it is not part of the critical path of the command.
+    :param command: The command and its arguments.
+    :param rtypes: The properties to be recorded.
+    :param device: The device to record from (default: LocalNvmlGpu).
+    :param gpus: A list of GPU ids to be recorded from.
+    :param interval: The time [s] to wait between two samples.
+    :param units: Optional units per property the samples are converted to while recording.
+    :return: A Tuple containing the return code of the command and a recording per property.
+    """
+    with DeviceCtx(device=device) as ctx:
+        name = " ".join(command)
+        units = units if units else {}
+        recorders = [Recorder.create_recorder(ctx, rtype, gpus, name=name, interval=interval, unit=units.get(rtype))
+                     for rtype in rtypes]
+        for recorder in recorders:
+            recorder.start()
+        try:
+            child = subprocess.Popen(command)
+            with _SignalForwarder(child):
+                returncode = child.wait()
+        finally:
+            for recorder in recorders:
+                recorder.stop(auto_join=True)
+        return returncode, [recorder.get_recording() for recorder in recorders]
+
+
+def _save_path(path: Path, rtype: RecType, multiple: bool) -> Path:
+    if not multiple:
+        return path
+    metric = next(name for name, value in METRICS.items() if value == rtype)
+    return path.with_name(f"{path.stem}_{metric}{path.suffix}")
+
+
+@click.command(name="run", context_settings={"ignore_unknown_options": True})
+@click.option('--metric', '-m', 'metrics', type=click.Choice(list(METRICS)), multiple=True, default=["memory"],
+              show_default=True, help="GPU property to be recorded. Can be given multiple times.")
+@click.option('--gpu', '-g', 'gpus', type=int, multiple=True,
+              help="GPU id to be recorded. Can be given multiple times.")
+@click.option('--interval', '-i', type=click.FloatRange(min=0), default=RUN_INTERVAL, show_default=True,
+              help="Time [s] to wait between two samples.")
+@click.option('--save', '-s', type=click.Path(dir_okay=False), default=None,
+              help="File path to store the recording. The metric name is appended if several metrics are recorded.")
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default=None,
+              help="File path to store a plot of all recorded metrics.")
+@click.argument("command", nargs=-1, required=True, type=click.UNPROCESSED)
+@click.pass_context
+def run(ctx, metrics: Tuple[str], gpus: Tuple[int], interval: float, save: Optional[str], output: Optional[str],
+        command: Tuple[str]) -> None:
+    """
+    Run a command and record GPU properties for its lifetime, e.g. 'gpulink run -m memory -- python train.py'.
+
+    \f
+    :param ctx: The Command context.
+    :param metrics: The GPU properties to be recorded.
+    :param gpus: The GPU ids to be recorded.
+    :param interval: Time [s] to wait between two samples.
+    :param save: File path to store the recording.
+    :param output: File path to store a plot of all recorded metrics.
+    :param command: The command to be run.
+    :return: None
+    """
+    if output and Path(output).suffix[1:] not in FigureCanvasAgg.get_supported_filetypes():
+        click.secho(f"Output format '{Path(output).suffix}' not supported", fg="red")
+        ctx.exit(code=-1)
+
+    rtypes = [METRICS[metric] for metric in dict.fromkeys(metrics)]
+    try:
+        returncode, recordings = run_and_record(list(command), rtypes, gpus=list(gpus), interval=interval,
+                                                units=DEFAULT_UNITS)
+    except FileNotFoundError:
+        click.secho(f"Command not found: {command[0]}", fg="red", err=True)
+        ctx.exit(code=127)
+
+    for recording in recordings:
+        if save:
+            save_recording(recording, _save_path(Path(save), recording.rtype, len(recordings) > 1))
+        click.echo(recording, err=True)
+
+    if output:
+        Dashboard(recordings, name=recordings[0].name).save(Path(output))
+    ctx.exit(code=returncode)
@@ -0,0 +1,60 @@
+from pathlib import Path
+from typing import Optional
+
+import click
+from tabulate import tabulate
+
+from gpulink.consts import SEC
+from gpulink.plotting.store_view import StoreView
+from gpulink.recording.store import RecordingStore
+
+
+def _describe_store(store: RecordingStore, start: Optional[float], end: Optional[float], points: int) -> str:
+    first, last = store.time_range
+    t0 = None if start is None else first + int(start * SEC)
+    t1 = None if end is None else first + int(end * SEC)
+    table = [["GPU", "Name", f"{store.name} ({store.rtype.value} [{store.unit}])"]]
+    for window in store.window(t0, t1, points):
+        if window.timestamps.size == 0:
+            table.append([window.gpu.id, window.gpu.name, "no samples"])
+            continue
+        table.append([
+            window.gpu.id,
+            window.gpu.name,
+            f"minimum: {window.data_min.min()}\n"
+            f"maximum: {window.data_max.max()} "
+        ])
+    return f"{tabulate(table, tablefmt='fancy_grid')}\n" \
+           f"{'Duration:':25}{(last - first) / SEC:.3f} [s]"
+
+
+@click.command(name="view")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option('--start', '-s', type=float, default=None,
+              help="Start of the time range [s] relative to the first sample.")
+@click.option('--end', '-e', type=float, default=None, help="End of the time range [s] relative to the first sample.")
+@click.option('--points', '-n', type=click.IntRange(min=1), default=2000, help="Maximum number of points per GPU.")
+@click.option('--output', '-o', type=click.Path(), default=None, help="File path to store the plot.")
+@click.option('--no-plot', is_flag=True, help="Only print the summary of the time range.")
+def view(path: str, start: Optional[float], end: Optional[float], points: int, output: Optional[str],
+         no_plot: bool) -> None:
+    """
+    View a stored recording without loading it.
+
+    \f
+    :param path: The path to the stored recording.
+    :param start: Start of the time range [s] relative to the first sample.
+    :param end: End of the time range [s] relative to the first sample.
+    :param points: Maximum number of points per GPU.
+    :param output: File path to store the plot.
+    :param no_plot: If true, no plot is displayed.
+    :return: None
+    """
+    store = RecordingStore(path)
+    click.echo(_describe_store(store, start, end, points))
+
+    store_view = StoreView(store, max_points=points)
+    if output:
+        store_view.save(Path(output), start, end)
+    if not no_plot and not output:
+        store_view.plot(start, end)
@@ -0,0 +1,84 @@
+import os
+import signal
+import sys
+from threading import Event
+from time import monotonic
+from typing import Optional
+
+# The time between two checks whether a watched process is still alive [s]
+PID_POLL_INTERVAL = 0.5
+
+
+def is_interactive() -> bool:
+    """
+    Checks whether stdout is attached to a terminal.
+    """
+    return sys.stdout.isatty()
+
+
+def pid_alive(pid: int) -> bool:
+    """
+    Checks whether a process with the given id is running.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        return True
+    return True
+
+
+class StopCondition:
+    """
+    Waits until a recording should stop: after a duration, when a watched process exits or on SIGTERM/SIGINT.
+    Signal handlers are installed while the context is entered and restored afterwards.
+    """
+
+    def __init__(self, duration: Optional[float] = None, until_pid: Optional[int] = None):
+        self._duration = duration
+        self._until_pid = until_pid
+        self._stop = Event()
+        self._previous_handlers = {}
+        self.reason: Optional[str] = None
+
+    def _on_signal(self, signum, _frame):
+        self.reason = signal.Signals(signum).name
+        self._stop.set()
+
+    def __enter__(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self._previous_handlers[signum] = signal.signal(signum, self._on_signal)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers.clear()
+
+    def stop(self, reason: str) -> None:
+        """
+        Stops waiting.
+        :param reason: A description of why waiting was stopped.
+        """
+        self.reason = reason
+        self._stop.set()
+
+    def wait(self) -> str:
+        """
+        Blocks until one of the stop conditions is met.
+        :return: A description of the met stop condition.
+        """
+        deadline = None if self._duration is None else monotonic() + self._duration
+        while not self._stop.is_set():
+            timeout = None if deadline is None else max(deadline - monotonic(), 0)
+            if self._until_pid is not None:
+                timeout = PID_POLL_INTERVAL if timeout is None else min(timeout, PID_POLL_INTERVAL)
+            if self._stop.wait(timeout):
+                break
+            if deadline is not None and monotonic() >= deadline:
+                self.stop("duration elapsed")
+            elif self._until_pid is not None and not pid_alive(self._until_pid):
+                self.stop(f"process {self._until_pid} exited")
+        return self.reason
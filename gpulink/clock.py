@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import time_ns, monotonic_ns, perf_counter_ns
+from typing import Callable, Union
+
+import numpy as np
+
+# The number of attempts to read the wall time between two clock readings, the tightest pair is used as anchor
+ANCHOR_ROUNDS = 5
+
+Timestamps = Union[int, np.ndarray]
+
+
+@dataclass(frozen=True)
+class ClockAnchor:
+    """
+    A reading of a clock taken together with the wall time, which maps timestamps of the clock to wall time.
+    """
+    clock: str  # The name of the clock
+    timestamp: int  # The reading of the clock [ns]
+    wall: int  # The wall time [ns] since the epoch at the reading
+
+    def to_wall(self, timestamps: Timestamps) -> Timestamps:
+        """
+        Converts timestamps of the clock into wall time [ns] since the epoch.
+        """
+        return timestamps - self.timestamp + self.wall
+
+    def from_wall(self, wall: Timestamps) -> Timestamps:
+        """
+        Converts wall time [ns] since the epoch into timestamps of the clock.
+        """
+        return wall - self.wall + self.timestamp
+
+    def to_dict(self) -> dict:
+        return {"clock": self.clock, "timestamp": self.timestamp, "wall": self.wall}
+
+    @classmethod
+    def from_dict(cls, anchor: dict) -> ClockAnchor:
+        return cls(anchor["clock"], anchor["timestamp"], anchor["wall"])
+
+
+class Clock:
+    """
+    The source of all sample and marker timestamps [ns].
+    Clocks must be monotonic, wall time is only read once to anchor them.
+    """
+
+    def __init__(self, now: Callable[[], int], name: str):
+        self._now = now
+        self.name = name
+
+    def now(self) -> int:
+        return self._now()
+
+    def anchor(self) -> ClockAnchor:
+        """
+        Reads the clock together with the wall time. The wall time is read between two readings of the clock and the
+        tightest of several attempts is used, so the anchor is accurate to a few hundred nanoseconds.
+        """
+        best = None
+        for _ in range(ANCHOR_ROUNDS):
+            before = self._now()
+            wall = time_ns()
+            after = self._now()
+            if best is None or after - before < best[0]:
+                best = (after - before, before + (after - before) // 2, wall)
+        return ClockAnchor(self.name, best[1], best[2])
+
+
+class MonotonicClock(Clock):
+    """
+    The system-wide monotonic clock, comparable between processes of the same host.
+    """
+
+    def __init__(self):
+        super().__init__(monotonic_ns, "monotonic")
+
+
+class PerfCounterClock(Clock):
+    """
+    The clock with the highest available resolution.
+    """
+
+    def __init__(self):
+        super().__init__(perf_counter_ns, "perf_counter")
+
+
+_default_clock: Clock = MonotonicClock()
+
+
+def default_clock() -> Clock:
+    """
+    Returns the clock used to stamp samples and markers.
+    """
+    return _default_clock
+
+
+def set_default_clock(clock: Clock) -> None:
+    """
+    Replaces the clock used to stamp samples and markers. Devices pick up the clock when they are set up, so it
+    should be set before any DeviceCtx is entered.
+    """
+    global _default_clock
+    _default_clock = clock
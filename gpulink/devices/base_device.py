@@ -1,9 +1,10 @@
 from typing import Optional, List
 
+from gpulink.clock import Clock, default_clock
 from gpulink.devices.gpu import GpuSet
 from gpulink.devices.nvml_defines import ClockType, ClockId, TemperatureThreshold, \
-    TemperatureSensorType
-from gpulink.devices.query import SimpleResult, MemInfo
+    TemperatureSensorType, PcieUtilCounter, SamplingType
+from gpulink.devices.query import SimpleResult, MemInfo, ProcessResult, UtilizationInfo, SampleResult
 
 
 class BaseDevice:
@@ -37,3 +38,26 @@ class BaseDevice:
 
     def get_power_usage(self, gpus: Optional[List[int]]) -> List[SimpleResult]:
         raise NotImplementedError()
+
+    def get_energy_consumption(self, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        raise NotImplementedError()
+
+    def get_processes(self, gpus: Optional[List[int]] = None) -> List[ProcessResult]:
+        raise NotImplementedError()
+
+    def get_utilization(self, gpus: Optional[List[int]] = None) -> List[UtilizationInfo]:
+        raise NotImplementedError()
+
+    def get_pcie_throughput(self, counter: PcieUtilCounter, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        raise NotImplementedError()
+
+    def get_throttle_reasons(self, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        raise NotImplementedError()
+
+    def get_samples(self, sampling_type: SamplingType, since: int = 0, gpus: Optional[List[int]] = None) -> \
+            List[SampleResult]:
+        raise NotImplementedError()
+
+    def get_timestamp_clock(self) -> Clock:
+        # Devices stamping their results with a clock of their own override this
+        return default_clock()
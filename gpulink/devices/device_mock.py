@@ -1,16 +1,35 @@
 from typing import Optional, List
 
+from gpulink.clock import Clock
 from gpulink.devices.base_device import BaseDevice
 from gpulink.devices.gpu import Gpu, GpuSet
 from gpulink.devices.nvml_defines import TemperatureThreshold, ClockId, ClockType, \
-    TemperatureSensorType
-from gpulink.devices.query import SimpleResult, MemInfo
+    TemperatureSensorType, PcieUtilCounter, SamplingType, ThrottleReason
+from gpulink.devices.query import SimpleResult, MemInfo, ProcessResult, ProcessInfo, UtilizationInfo, SampleResult
 
 TEST_GB = int(1e9)
 TEST_FAN_SPEED_PCT = 100
 TEST_TEMP = 30
 TEST_CLOCK = 100
 TEST_POWER_CONSUMPTION = 30
+TEST_ENERGY_PER_TICK = 30
+TEST_GPU_UTIL = 80
+TEST_MEM_UTIL = 40
+TEST_PCIE_TX = 1000
+TEST_PCIE_RX = 2000
+TEST_THROTTLE_REASONS = [ThrottleReason.SW_POWER_CAP, ThrottleReason.GPU_IDLE]
+TEST_SAMPLES_PER_QUERY = 4  # The number of samples the simulated driver buffers between two queries
+TEST_SAMPLE_BUFFER_SIZE = 16  # The capacity of the simulated driver sample buffer
+TEST_SAMPLE_VALUES = {
+    SamplingType.TOTAL_POWER_SAMPLES: TEST_POWER_CONSUMPTION,
+    SamplingType.GPU_UTILIZATION_SAMPLES: TEST_GPU_UTIL,
+    SamplingType.MEMORY_UTILIZATION_SAMPLES: TEST_MEM_UTIL,
+}
+TEST_PROCESSES = [
+    [ProcessInfo(pid=1000, name="train.py", used_memory=TEST_GB // 4, sm_util=80, mem_util=40)],
+    [ProcessInfo(pid=1001, name="train.py", used_memory=TEST_GB // 8, sm_util=40, mem_util=20),
+     ProcessInfo(pid=1002, name="eval.py", used_memory=TEST_GB // 8, sm_util=20, mem_util=10)]
+]
 
 
 class DeviceMock(BaseDevice):
@@ -24,6 +43,10 @@ class DeviceMock(BaseDevice):
     def shutdown(self) -> None:
         pass
 
+    def get_timestamp_clock(self) -> Clock:
+        # Results are stamped with the number of simulated queries
+        return Clock(lambda: self._time_simulated, "simulated")
+
     def get_gpus(self) -> GpuSet:
         return GpuSet([Gpu(0, "GPU_0"), Gpu(1, "GPU_1")])
 
@@ -98,3 +121,68 @@ class DeviceMock(BaseDevice):
         ]
         self._time_simulated += 1
         return power if not gpus else [power[i] for i in gpus]
+
+    def get_energy_consumption(self, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        energy = [
+            SimpleResult(gpu_idx=0, timestamp=self._time_simulated, gpu_name="GPU_0",
+                         value=TEST_ENERGY_PER_TICK * self._time_simulated),
+            SimpleResult(gpu_idx=1, timestamp=self._time_simulated, gpu_name="GPU_1",
+                         value=TEST_ENERGY_PER_TICK * self._time_simulated)
+        ]
+        self._time_simulated += 1
+        return energy if not gpus else [energy[i] for i in gpus]
+
+    def get_processes(self, gpus: Optional[List[int]] = None) -> List[ProcessResult]:
+        processes = [
+            ProcessResult(gpu_idx=0, timestamp=self._time_simulated, gpu_name="GPU_0",
+                          processes=list(TEST_PROCESSES[0])),
+            ProcessResult(gpu_idx=1, timestamp=self._time_simulated, gpu_name="GPU_1",
+                          processes=list(TEST_PROCESSES[1]))
+        ]
+        self._time_simulated += 1
+        return processes if not gpus else [processes[i] for i in gpus]
+
+    def get_utilization(self, gpus: Optional[List[int]] = None) -> List[UtilizationInfo]:
+        utilization = [
+            UtilizationInfo(gpu_idx=0, timestamp=self._time_simulated, gpu_name="GPU_0", gpu=TEST_GPU_UTIL,
+                            memory=TEST_MEM_UTIL),
+            UtilizationInfo(gpu_idx=1, timestamp=self._time_simulated, gpu_name="GPU_1", gpu=TEST_GPU_UTIL // 2,
+                            memory=TEST_MEM_UTIL // 2)
+        ]
+        self._time_simulated += 1
+        return utilization if not gpus else [utilization[i] for i in gpus]
+
+    def get_pcie_throughput(self, counter: PcieUtilCounter, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        value = TEST_PCIE_TX if counter == PcieUtilCounter.PCIE_UTIL_TX_BYTES else TEST_PCIE_RX
+        throughput = [
+            SimpleResult(gpu_idx=0, timestamp=self._time_simulated, gpu_name="GPU_0", value=value),
+            SimpleResult(gpu_idx=1, timestamp=self._time_simulated, gpu_name="GPU_1", value=value // 2)
+        ]
+        self._time_simulated += 1
+        return throughput if not gpus else [throughput[i] for i in gpus]
+
+    def get_throttle_reasons(self, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        reasons = [
+            SimpleResult(gpu_idx=0, timestamp=self._time_simulated, gpu_name="GPU_0",
+                         value=int(TEST_THROTTLE_REASONS[0])),
+            SimpleResult(gpu_idx=1, timestamp=self._time_simulated, gpu_name="GPU_1",
+                         value=int(TEST_THROTTLE_REASONS[1]))
+        ]
+        self._time_simulated += 1
+        return reasons if not gpus else [reasons[i] for i in gpus]
+
+    def get_samples(self, sampling_type: SamplingType, since: int = 0, gpus: Optional[List[int]] = None) -> \
+            List[SampleResult]:
+        # The simulated driver buffers TEST_SAMPLES_PER_QUERY samples per tick. The sample at 'since' is included
+        # as well, so consumers have to deal with overlapping batches.
+        newest = (self._time_simulated + 1) * TEST_SAMPLES_PER_QUERY
+        timestamps = list(range(max(since, newest - TEST_SAMPLE_BUFFER_SIZE, 0), newest))
+        value = TEST_SAMPLE_VALUES.get(sampling_type, 0)
+        samples = [
+            SampleResult(gpu_idx=0, timestamp=self._time_simulated, gpu_name="GPU_0", timestamps=timestamps,
+                         values=[value] * len(timestamps)),
+            SampleResult(gpu_idx=1, timestamp=self._time_simulated, gpu_name="GPU_1", timestamps=timestamps,
+                         values=[value] * len(timestamps))
+        ]
+        self._time_simulated += 1
+        return samples if not gpus else [samples[i] for i in gpus]
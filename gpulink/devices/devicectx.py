@@ -1,41 +1,55 @@
-from functools import wraps
+from threading import Lock
 from typing import List, Optional, Type
 
+from gpulink.clock import Clock
 from gpulink.devices.base_device import BaseDevice
 from gpulink.devices.gpu import GpuSet
 from gpulink.devices.nvml_defines import TemperatureThreshold, ClockId, \
-    ClockType, TemperatureSensorType
+    ClockType, TemperatureSensorType, PcieUtilCounter, SamplingType
 from gpulink.devices.nvml_device import LocalNvmlGpu
-from gpulink.devices.query import SimpleResult, MemInfo
+from gpulink.devices.query import SimpleResult, MemInfo, ProcessResult, UtilizationInfo, SampleResult
 
 
-def ctx_guard(fn):
-    @wraps(fn)
-    def guard(ref, *args, **kwargs):
-        if not ref.valid_ctx:
-            raise RuntimeError("Cannot execute query in an invalid NVContext")
-        return fn(ref, *args, **kwargs)
+class _InvalidDevice:
+    """
+    Stands in for the device while a DeviceCtx is not entered, so queries need no validity check of their own.
+    """
+
+    def __getattr__(self, item):
+        raise RuntimeError("Cannot execute query in an invalid NVContext")
 
-    return guard
+
+_INVALID_DEVICE = _InvalidDevice()
 
 
 class DeviceCtx:
     """
     A context for fetching device data.
+    The context is reference-counted: it can be entered several times, also from different threads, and the device
+    is only set up on the first and shut down on the last enter. Queries are serialized by a per-context lock,
+    so all threads can safely share a single session.
     """
 
     def __init__(self, device: Type[BaseDevice] = LocalNvmlGpu):
-        self._valid_ctx = False
-        self._device = device()
+        self._lock = Lock()
+        self._refs = 0
+        self._backend = device()
+        self._device = _INVALID_DEVICE
 
     def __enter__(self):
-        self._device.setup()
-        self._valid_ctx = True
+        with self._lock:
+            if self._refs == 0:
+                self._backend.setup()
+                self._device = self._backend
+            self._refs += 1
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._device.shutdown()
-        self._valid_ctx = False
+        with self._lock:
+            self._refs -= 1
+            if self._refs == 0:
+                self._device = _INVALID_DEVICE
+                self._backend.shutdown()
 
     @property
     def valid_ctx(self):
@@ -43,27 +57,26 @@ class DeviceCtx:
         Queries if the actual NVContext is valid.
         :return: True if the actual NVContext is valid, else False
         """
-        return self._valid_ctx
+        return self._device is not _INVALID_DEVICE
 
     @property
-    @ctx_guard
     def gpus(self) -> GpuSet:
         """
         Queries the indices of all active GPUs
         :return: The indices of all active GPUs in a List
         """
-        return self._device.get_gpus()
+        with self._lock:
+            return self._device.get_gpus()
 
-    @ctx_guard
     def get_memory_info(self, gpus: Optional[List[int]] = None) -> List[MemInfo]:
         """
         Queries the memory information [Bytes] using nvmlDeviceGetMemoryInfo.
         :param gpus: A list of indices from GPU to be queried.
         :return: A list of GPUMemInfo.
         """
-        return self._device.get_memory_info(gpus)
+        with self._lock:
+            return self._device.get_memory_info(gpus)
 
-    @ctx_guard
     def get_fan_speed(self, fan: Optional[int] = None, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
         """
         Queries the fan speed [%] using nvmlDeviceGetFanSpeed_v2 and nvmlDeviceGetFanSpeed.
@@ -71,9 +84,9 @@ class DeviceCtx:
         :param gpus: An optional list of GPU indices to be queried.
         :return: A list GPUQuerySingleResult.
         """
-        return self._device.get_fan_speed(fan, gpus)
+        with self._lock:
+            return self._device.get_fan_speed(fan, gpus)
 
-    @ctx_guard
     def get_temperature(self, sensor_type: TemperatureSensorType, gpus: Optional[List[int]] = None) -> \
             List[SimpleResult]:
         """
@@ -82,9 +95,9 @@ class DeviceCtx:
         :param gpus: An optional list of GPU indices to be queried.
         :return: A List of GPUQuerySingleResult.
         """
-        return self._device.get_temperature(sensor_type, gpus)
+        with self._lock:
+            return self._device.get_temperature(sensor_type, gpus)
 
-    @ctx_guard
     def get_temperature_threshold(self, threshold: TemperatureThreshold, gpus: Optional[List[int]] = None) -> \
             List[SimpleResult]:
         """
@@ -93,9 +106,9 @@ class DeviceCtx:
         :param threshold: The type of threshold to be queried.
         :return: A List of GPUQuerySingleResult.
         """
-        return self._device.get_temperature_threshold(threshold, gpus)
+        with self._lock:
+            return self._device.get_temperature_threshold(threshold, gpus)
 
-    @ctx_guard
     def get_clock(self, clock_type: ClockType, clock_id: ClockId = None, gpus: Optional[List[int]] = None) -> \
             List[SimpleResult]:
         """
@@ -105,13 +118,81 @@ class DeviceCtx:
         :param clock_id: The id of the clock to be queried.
         :return: A List of GPUQuerySingleResult.
         """
-        return self._device.get_clock(clock_type, clock_id, gpus)
+        with self._lock:
+            return self._device.get_clock(clock_type, clock_id, gpus)
 
-    @ctx_guard
     def get_power_usage(self, gpus: Optional[List[int]]) -> List[SimpleResult]:
         """
         Queries the power usage [mW].
         :param gpus: A list of indices from GPU to be queried.
         :return: A List of GPUQuerySingleResult.
         """
-        return self._device.get_power_usage(gpus)
+        with self._lock:
+            return self._device.get_power_usage(gpus)
+
+    def get_energy_consumption(self, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        """
+        Queries the total energy consumption [mJ] since the driver was last reloaded.
+        :param gpus: A list of indices from GPU to be queried.
+        :return: A List of GPUQuerySingleResult.
+        :raises NotImplementedError: If the device does not expose an energy counter.
+        """
+        with self._lock:
+            return self._device.get_energy_consumption(gpus)
+
+    def get_processes(self, gpus: Optional[List[int]] = None) -> List[ProcessResult]:
+        """
+        Queries the compute processes running on each GPU including their used memory [Bytes] and utilization [%].
+        :param gpus: A list of indices from GPU to be queried.
+        :return: A List of ProcessResult.
+        """
+        with self._lock:
+            return self._device.get_processes(gpus)
+
+    def get_utilization(self, gpus: Optional[List[int]] = None) -> List[UtilizationInfo]:
+        """
+        Queries the GPU (SM) and memory utilization [%] using nvmlDeviceGetUtilizationRates.
+        :param gpus: A list of indices from GPU to be queried.
+        :return: A List of UtilizationInfo.
+        """
+        with self._lock:
+            return self._device.get_utilization(gpus)
+
+    def get_pcie_throughput(self, counter: PcieUtilCounter, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        """
+        Queries the PCIe throughput [KB/s] using nvmlDeviceGetPcieThroughput.
+        :param counter: The PCIe counter (TX or RX) to be queried.
+        :param gpus: A list of indices from GPU to be queried.
+        :return: A List of GPUQuerySingleResult.
+        """
+        with self._lock:
+            return self._device.get_pcie_throughput(counter, gpus)
+
+    def get_throttle_reasons(self, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        """
+        Queries the reasons for clock throttling as a ThrottleReason bitmask.
+        :param gpus: A list of indices from GPU to be queried.
+        :return: A List of GPUQuerySingleResult.
+        """
+        with self._lock:
+            return self._device.get_throttle_reasons(gpus)
+
+    def get_samples(self, sampling_type: SamplingType, since: int = 0, gpus: Optional[List[int]] = None) -> \
+            List[SampleResult]:
+        """
+        Fetches all samples buffered by the driver using nvmlDeviceGetSamples.
+        :param sampling_type: The type of samples to be fetched.
+        :param since: Only samples newer than this timestamp [ns] are fetched.
+        :param gpus: A list of indices from GPU to be queried.
+        :return: A List of SampleResult.
+        """
+        with self._lock:
+            return self._device.get_samples(sampling_type, since, gpus)
+
+    def get_timestamp_clock(self) -> Clock:
+        """
+        Queries the clock the timestamps of all results are taken from.
+        :return: The clock of the device.
+        """
+        with self._lock:
+            return self._device.get_timestamp_clock()
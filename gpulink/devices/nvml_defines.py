@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from enum import Enum
+from enum import Enum, IntFlag
 
 
 class TemperatureThreshold(Enum):
@@ -30,3 +30,31 @@ class ClockType(Enum):
 
 class TemperatureSensorType(Enum):
     GPU = 0
+
+
+class PcieUtilCounter(Enum):
+    PCIE_UTIL_TX_BYTES = 0
+    PCIE_UTIL_RX_BYTES = 1
+
+
+class SamplingType(Enum):
+    TOTAL_POWER_SAMPLES = 0
+    GPU_UTILIZATION_SAMPLES = 1
+    MEMORY_UTILIZATION_SAMPLES = 2
+    ENC_UTILIZATION_SAMPLES = 3
+    DEC_UTILIZATION_SAMPLES = 4
+    PROCESSOR_CLK_SAMPLES = 5
+    MEMORY_CLK_SAMPLES = 6
+
+
+class ThrottleReason(IntFlag):
+    NONE = 0x0
+    GPU_IDLE = 0x1
+    APPLICATIONS_CLOCKS_SETTING = 0x2
+    SW_POWER_CAP = 0x4
+    HW_SLOWDOWN = 0x8
+    SYNC_BOOST = 0x10
+    SW_THERMAL_SLOWDOWN = 0x20
+    HW_THERMAL_SLOWDOWN = 0x40
+    HW_POWER_BRAKE_SLOWDOWN = 0x80
+    DISPLAY_CLOCK_SETTING = 0x100
@@ -1,16 +1,43 @@
-from time import time_ns
-from typing import Type, Optional, cast, List
+from collections import namedtuple
+from functools import lru_cache
+from typing import Type, Optional, cast, List, Dict
 
 import pynvml
 from pynvml import nvmlDeviceGetCount, nvmlDeviceGetHandleByIndex, nvmlDeviceGetName, nvmlDeviceGetClock, \
     nvmlDeviceGetTemperatureThreshold, nvmlDeviceGetClockInfo, nvmlDeviceGetPowerUsage, nvmlDeviceGetTemperature, \
-    nvmlDeviceGetMemoryInfo, nvmlDeviceGetFanSpeed_v2, nvmlDeviceGetFanSpeed, nvmlInit, nvmlShutdown
+    nvmlDeviceGetMemoryInfo, nvmlDeviceGetFanSpeed_v2, nvmlDeviceGetFanSpeed, nvmlInit, nvmlShutdown, \
+    nvmlDeviceGetTotalEnergyConsumption, nvmlDeviceGetComputeRunningProcesses, nvmlDeviceGetProcessUtilization, \
+    nvmlSystemGetProcessName, nvmlDeviceGetUtilizationRates, nvmlDeviceGetPcieThroughput, \
+    nvmlDeviceGetCurrentClocksThrottleReasons, nvmlDeviceGetSamples
 
+from gpulink.clock import Clock, ClockAnchor, default_clock
 from gpulink.devices.base_device import BaseDevice
 from gpulink.devices.gpu import Gpu, GpuSet
 from gpulink.devices.nvml_defines import ClockType, ClockId, TemperatureSensorType, \
-    TemperatureThreshold
-from gpulink.devices.query import QueryResult, SimpleResult, MemInfo
+    TemperatureThreshold, PcieUtilCounter, SamplingType
+from gpulink.devices.query import QueryResult, SimpleResult, MemInfo, ProcessResult, ProcessInfo, UtilizationInfo, \
+    SampleResult
+from gpulink.devices.tracing import get_hooks, call_traced
+
+_Samples = namedtuple("_Samples", "timestamps values")
+
+# Maps the nvmlValueType_t of a sample to the corresponding member of the nvmlValue_t union
+_SAMPLE_VALUE_MEMBERS = {
+    pynvml.NVML_VALUE_TYPE_DOUBLE: "dVal",
+    pynvml.NVML_VALUE_TYPE_UNSIGNED_INT: "uiVal",
+    pynvml.NVML_VALUE_TYPE_UNSIGNED_LONG: "ulVal",
+    pynvml.NVML_VALUE_TYPE_UNSIGNED_LONG_LONG: "ullVal",
+    pynvml.NVML_VALUE_TYPE_SIGNED_LONG_LONG: "sllVal",
+}
+
+
+# Process names are cached to keep high-rate sampling cheap. Reused PIDs may therefore report a stale name.
+@lru_cache(maxsize=1024)
+def _get_process_name(pid: int) -> str:
+    try:
+        return nvmlSystemGetProcessName(pid)
+    except pynvml.nvml.NVMLError:
+        return "N/A"
 
 
 class LocalNvmlGpu(BaseDevice):
@@ -19,6 +46,9 @@ class LocalNvmlGpu(BaseDevice):
         self._device_handles = []
         self._device_names = []
         self._device_ids = []
+        self._last_util_timestamps: Dict[object, int] = {}
+        self._clock: Clock = default_clock()
+        self._anchor: Optional[ClockAnchor] = None
 
     def _get_device_handles(self):
         self._device_ids = [i for i in range(nvmlDeviceGetCount())]
@@ -36,10 +66,14 @@ class LocalNvmlGpu(BaseDevice):
             handles = [self._device_handles[gpu] for gpu in gpus]
             gpu_names = [self._device_names[gpu] for gpu in gpus]
 
+        hooks = get_hooks()
         res = []
         for handle, name, idx in zip(handles, gpu_names, gpus):
-            query_result = query(handle, *args, **kwargs)
-            tmp = {"timestamp": time_ns(), "gpu_idx": idx, "gpu_name": name}
+            if hooks:
+                query_result = call_traced(hooks, query, idx, handle, *args, **kwargs)
+            else:
+                query_result = query(handle, *args, **kwargs)
+            tmp = {"timestamp": self._clock.now(), "gpu_idx": idx, "gpu_name": name}
 
             keys = list(type.__annotations__)
             if len(keys) == 1:
@@ -50,16 +84,64 @@ class LocalNvmlGpu(BaseDevice):
             res.append(type(**tmp))
         return res
 
+    def _query_processes(self, handle) -> List[ProcessInfo]:
+        try:
+            samples = nvmlDeviceGetProcessUtilization(handle, self._last_util_timestamps.get(handle, 0))
+        except pynvml.nvml.NVMLError_NotFound:
+            # No utilization samples were taken since the last query
+            samples = []
+        except pynvml.nvml.NVMLError_NotSupported:
+            # Per-process utilization is not available on all devices, the memory usage still is
+            samples = []
+
+        utilization = {}
+        for sample in samples:
+            if sample.pid not in utilization or sample.timeStamp > utilization[sample.pid].timeStamp:
+                utilization[sample.pid] = sample
+            self._last_util_timestamps[handle] = max(self._last_util_timestamps.get(handle, 0), sample.timeStamp)
+
+        processes = []
+        for proc in nvmlDeviceGetComputeRunningProcesses(handle):
+            sample = utilization.get(proc.pid)
+            processes.append(ProcessInfo(
+                pid=proc.pid,
+                name=_get_process_name(proc.pid),
+                used_memory=proc.usedGpuMemory,
+                sm_util=sample.smUtil if sample else None,
+                mem_util=sample.memUtil if sample else None
+            ))
+        return processes
+
+    def _query_samples(self, handle, sampling_type: int, since: int) -> _Samples:
+        try:
+            # NVML sample timestamps are given in microseconds of wall time, they are converted into the domain of
+            # the clock all other results are stamped with
+            since = self._anchor.to_wall(since) // 1000 if since > 0 else 0
+            value_type, samples = nvmlDeviceGetSamples(handle, sampling_type, since)
+        except pynvml.nvml.NVMLError_NotFound:
+            # No samples were buffered since the given timestamp
+            return _Samples(timestamps=[], values=[])
+        member = _SAMPLE_VALUE_MEMBERS[value_type]
+        return _Samples(
+            timestamps=[self._anchor.from_wall(sample.timeStamp * 1000) for sample in samples],
+            values=[getattr(sample.sampleValue, member) for sample in samples]
+        )
+
     def setup(self) -> None:
         try:
             nvmlInit()
             self._get_device_handles()
+            self._clock = default_clock()
+            self._anchor = self._clock.anchor()
         except pynvml.nvml.NVMLError as e:
             raise RuntimeError("Cannot initialize NVML library - Is it installed?")
 
     def shutdown(self) -> None:
         nvmlShutdown()
 
+    def get_timestamp_clock(self) -> Clock:
+        return self._clock
+
     def get_gpus(self) -> GpuSet:
         gpus = []
         for id, name in zip(self._device_ids, self._device_names):
@@ -97,3 +179,29 @@ class LocalNvmlGpu(BaseDevice):
     def get_power_usage(self, gpus: Optional[List[int]]) -> List[SimpleResult]:
         return cast(List[SimpleResult],
                     self._execute(nvmlDeviceGetPowerUsage, SimpleResult, gpus))
+
+    def get_energy_consumption(self, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        try:
+            return cast(List[SimpleResult],
+                        self._execute(nvmlDeviceGetTotalEnergyConsumption, SimpleResult, gpus))
+        except pynvml.nvml.NVMLError_NotSupported:
+            raise NotImplementedError("The energy counter is not supported by this device")
+
+    def get_processes(self, gpus: Optional[List[int]] = None) -> List[ProcessResult]:
+        return cast(List[ProcessResult], self._execute(self._query_processes, ProcessResult, gpus))
+
+    def get_utilization(self, gpus: Optional[List[int]] = None) -> List[UtilizationInfo]:
+        return cast(List[UtilizationInfo], self._execute(nvmlDeviceGetUtilizationRates, UtilizationInfo, gpus))
+
+    def get_pcie_throughput(self, counter: PcieUtilCounter, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        return cast(List[SimpleResult],
+                    self._execute(nvmlDeviceGetPcieThroughput, SimpleResult, gpus, counter.value))
+
+    def get_throttle_reasons(self, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        return cast(List[SimpleResult],
+                    self._execute(nvmlDeviceGetCurrentClocksThrottleReasons, SimpleResult, gpus))
+
+    def get_samples(self, sampling_type: SamplingType, since: int = 0, gpus: Optional[List[int]] = None) -> \
+            List[SampleResult]:
+        return cast(List[SampleResult],
+                    self._execute(self._query_samples, SampleResult, gpus, sampling_type.value, since))
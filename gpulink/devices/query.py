@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Union
+from typing import List, Optional, Union
 
 
 @dataclass
@@ -30,3 +30,41 @@ class MemInfo(QueryResult):
     total: int
     used: int
     free: int
+
+
+@dataclass
+class ProcessInfo:
+    """
+    Stores the memory usage and utilization of a single process running on a GPU.
+    """
+    pid: int
+    name: str
+    used_memory: Optional[int]  # [Bytes], None if not available
+    sm_util: Optional[int]  # [%], None if no utilization sample is available
+    mem_util: Optional[int]  # [%], None if no utilization sample is available
+
+
+@dataclass
+class ProcessResult(QueryResult):
+    """
+    Stores all compute processes running on a GPU.
+    """
+    processes: List[ProcessInfo]
+
+
+@dataclass
+class UtilizationInfo(QueryResult):
+    """
+    Stores the result of a nvmlDeviceGetUtilizationRates query.
+    """
+    gpu: int
+    memory: int
+
+
+@dataclass
+class SampleResult(QueryResult):
+    """
+    Stores the samples fetched from the driver's sample buffer of a GPU.
+    """
+    timestamps: List[int]
+    values: List[Union[int, float]]
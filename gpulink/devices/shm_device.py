@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from typing import Optional, List, Tuple, Dict
+
+import numpy as np
+import pynvml
+
+from gpulink.devices.base_device import BaseDevice
+from gpulink.devices.devicectx import DeviceCtx
+from gpulink.devices.gpu import Gpu, GpuSet
+from gpulink.devices.nvml_defines import ClockType, ClockId, TemperatureSensorType
+from gpulink.devices.query import SimpleResult, MemInfo, UtilizationInfo
+from gpulink.threading.stoppable_thread import StoppableThread
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    resource_tracker = shared_memory = None
+
+# The default name of the shared memory block, can be overridden using the GPULINK_SHM_NAME environment variable
+SHM_NAME = "gpulink"
+
+# The published values per GPU and sample
+FIELDS = ("memory_total", "memory_used", "memory_free", "temperature", "fan_speed", "clock_graphics", "clock_sm",
+          "clock_mem", "clock_video", "power_usage", "utilization_gpu", "utilization_memory")
+NOT_AVAILABLE = -1
+
+# Layout of the shared memory block:
+#   header (8 x uint64) | JSON metadata (META_SIZE bytes) | timestamps (capacity x gpus) |
+#   values (capacity x gpus x fields)
+# Header: [0] sequence number (odd while a sample is written), [1] number of written samples, [2] capacity,
+#         [3] number of GPUs, [4] length of the JSON metadata, [5] number of failed samples since the last published one
+_HEADER_SIZE = 64
+META_SIZE = 4096
+_SEQ, _COUNT, _CAPACITY, _GPUS, _META_LEN, _FAILURES = range(6)
+
+# The number of attempts to read a consistent sample, consumers yield between attempts and sleep after the first few
+READ_ATTEMPTS = 1000
+_SPIN_ATTEMPTS = 10
+_RETRY_DELAY = 1e-4  # [s]
+
+# Blocks created by publishers of this process, which are tracked by its resource tracker
+_published = set()
+
+_CLOCK_FIELDS = {
+    ClockType.CLOCK_GRAPHICS: "clock_graphics",
+    ClockType.CLOCK_SM: "clock_sm",
+    ClockType.CLOCK_MEM: "clock_mem",
+    ClockType.CLOCK_VIDEO: "clock_video",
+}
+
+
+def _require_shared_memory():
+    if shared_memory is None:
+        raise RuntimeError("Shared memory telemetry requires Python 3.8 or newer")
+
+
+def _block_size(capacity: int, gpus: int) -> int:
+    return _HEADER_SIZE + META_SIZE + capacity * gpus * 8 * (1 + len(FIELDS))
+
+
+class _Layout:
+    """
+    NumPy views onto a shared memory block - reading them does not perform a syscall.
+    """
+
+    def __init__(self, buffer, capacity: int, gpus: int):
+        self.header = np.ndarray((8,), dtype=np.uint64, buffer=buffer)
+        offset = _HEADER_SIZE + META_SIZE
+        self.timestamps = np.ndarray((capacity, gpus), dtype=np.int64, buffer=buffer, offset=offset)
+        offset += capacity * gpus * 8
+        self.values = np.ndarray((capacity, gpus, len(FIELDS)), dtype=np.int64, buffer=buffer, offset=offset)
+
+
+class TelemetryPublisher(StoppableThread):
+    """
+    Samples all GPUs of a DeviceCtx and publishes the latest samples and a short history into shared memory.
+    Any number of local consumers can read them using SharedMemoryDevice without querying NVML themselves.
+    """
+
+    def __init__(self, ctx: DeviceCtx, name: Optional[str] = None, capacity: int = 1024, interval: float = 0.1):
+        super().__init__()
+        _require_shared_memory()
+        self._ctx = ctx
+        self._interval = interval
+        self._gpus = ctx.gpus
+        self._queries = self._probe_queries()
+        # The metadata is checked before the block is created, which would leak otherwise
+        meta = json.dumps({
+            "gpus": [{"id": gpu.id, "name": gpu.name} for gpu in self._gpus],
+            "fields": [FIELDS[column] for column in sorted(c for columns, _ in self._queries for c in columns)]
+        }).encode("utf-8")
+        if len(meta) > META_SIZE:
+            raise ValueError("Too many GPUs to be published")
+
+        self._shm = shared_memory.SharedMemory(name=name or os.environ.get("GPULINK_SHM_NAME", SHM_NAME),
+                                               create=True, size=_block_size(capacity, len(self._gpus)))
+        self._layout = _Layout(self._shm.buf, capacity, len(self._gpus))
+        _published.add(self._shm._name)
+        self._shm.buf[_HEADER_SIZE:_HEADER_SIZE + len(meta)] = meta
+        header = self._layout.header
+        header[_CAPACITY], header[_GPUS], header[_META_LEN] = capacity, len(self._gpus), len(meta)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _probe_queries(self):
+        ids = self._gpus.ids
+        queries = [
+            (("memory_total", "memory_used", "memory_free"),
+             lambda: [(r.timestamp, (r.total, r.used, r.free)) for r in self._ctx.get_memory_info(ids)]),
+            (("temperature",),
+             lambda: [(r.timestamp, (r.value,)) for r in self._ctx.get_temperature(TemperatureSensorType.GPU, ids)]),
+            (("fan_speed",), lambda: [(r.timestamp, (r.value,)) for r in self._ctx.get_fan_speed(gpus=ids)]),
+            (("power_usage",), lambda: [(r.timestamp, (r.value,)) for r in self._ctx.get_power_usage(ids)]),
+            (("utilization_gpu", "utilization_memory"),
+             lambda: [(r.timestamp, (r.gpu, r.memory)) for r in self._ctx.get_utilization(ids)]),
+        ]
+        for clock_type, field in _CLOCK_FIELDS.items():
+            queries.append(((field,), lambda c=clock_type: [(r.timestamp, (r.value,))
+                                                            for r in self._ctx.get_clock(c, gpus=ids)]))
+
+        # Queries not supported by the device are not published
+        supported = []
+        for fields, query in queries:
+            try:
+                query()
+            except (NotImplementedError, pynvml.nvml.NVMLError):
+                continue
+            supported.append(([FIELDS.index(field) for field in fields], query))
+        return supported
+
+    def publish(self) -> None:
+        """
+        Samples all supported properties once and publishes them as a new sample.
+        """
+        values = np.full((len(self._gpus), len(FIELDS)), NOT_AVAILABLE, dtype=np.int64)
+        timestamps = np.zeros(len(self._gpus), dtype=np.int64)
+        for columns, query in self._queries:
+            for gpu, (timestamp, result) in enumerate(query()):
+                values[gpu, columns] = result
+                timestamps[gpu] = max(timestamps[gpu], timestamp)
+
+        layout = self._layout
+        count = int(layout.header[_COUNT])
+        slot = count % int(layout.header[_CAPACITY])
+        layout.header[_SEQ] += 1
+        try:
+            layout.timestamps[slot] = timestamps
+            layout.values[slot] = values
+            layout.header[_COUNT] = count + 1
+            layout.header[_FAILURES] = 0
+        finally:
+            # Readers must never see an odd sequence number once the write is over
+            layout.header[_SEQ] += 1
+
+    def run(self):
+        while not self.should_stop:
+            try:
+                self.publish()
+            except Exception:
+                # E.g. an NVMLError after a GPU reset, the publisher keeps running and readers see the failures
+                self._layout.header[_FAILURES] += 1
+                logging.getLogger("gpulink").exception("Publishing a telemetry sample failed")
+            self.wait(self._interval)
+
+    def close(self) -> None:
+        """
+        Releases and removes the shared memory block.
+        """
+        del self._layout
+        self._shm.close()
+        self._shm.unlink()
+        _published.discard(self._shm._name)
+
+
+class SharedMemoryDevice(BaseDevice):
+    """
+    A device reading the samples published by a TelemetryPublisher.
+    Queries return the latest published sample, so they do not access NVML.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self._name = name
+        self._shm = None
+        self._layout: Optional[_Layout] = None
+        self._gpus: Optional[GpuSet] = None
+        self._fields: List[str] = []
+
+    def setup(self) -> None:
+        _require_shared_memory()
+        name = self._name or os.environ.get("GPULINK_SHM_NAME", SHM_NAME)
+        try:
+            self._shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            raise RuntimeError(f"No gpulink telemetry is published as '{name}' - Is 'gpulink publish' running?")
+        # Consumers must not remove the block on exit, which the resource tracker would do otherwise
+        if self._shm._name not in _published:
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+
+        header = np.ndarray((8,), dtype=np.uint64, buffer=self._shm.buf)
+        meta_len = int(header[_META_LEN])
+        meta = json.loads(bytes(self._shm.buf[_HEADER_SIZE:_HEADER_SIZE + meta_len]).decode("utf-8"))
+        self._gpus = GpuSet([Gpu(gpu["id"], gpu["name"]) for gpu in meta["gpus"]])
+        self._fields = meta["fields"]
+        self._layout = _Layout(self._shm.buf, int(header[_CAPACITY]), int(header[_GPUS]))
+
+    def shutdown(self) -> None:
+        self._layout = None
+        self._shm.close()
+
+    def _read(self, history: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        # The requested samples are copied out of the block, which is only consistent if no sample was written
+        # meanwhile (seqlock), so views onto the block cannot be returned
+        layout = self._layout
+        header = layout.header
+        capacity = int(header[_CAPACITY])
+        for attempt in range(READ_ATTEMPTS):
+            seq = int(header[_SEQ])
+            if not seq & 1:
+                count = int(header[_COUNT])
+                if count == 0:
+                    raise RuntimeError("No samples were published yet")
+                samples = min(history, count, capacity)
+                start = (count - samples) % capacity
+                end = start + samples
+                if end <= capacity:
+                    timestamps, values = layout.timestamps[start:end].copy(), layout.values[start:end].copy()
+                else:
+                    # The samples wrap around the end of the ring buffer
+                    timestamps = np.concatenate([layout.timestamps[start:], layout.timestamps[:end - capacity]])
+                    values = np.concatenate([layout.values[start:], layout.values[:end - capacity]])
+                if int(header[_SEQ]) == seq:
+                    return timestamps, values
+            # The publisher is writing a sample
+            time.sleep(0 if attempt < _SPIN_ATTEMPTS else _RETRY_DELAY)
+        raise RuntimeError("The published samples are being written for too long - "
+                           "Did 'gpulink publish' stop while writing a sample?")
+
+    @property
+    def failed_samples(self) -> int:
+        """
+        The number of samples the publisher failed to take since the latest published one, which is stale if not 0.
+        """
+        return int(self._layout.header[_FAILURES])
+
+    def _latest(self, fields: List[str], gpus: Optional[List[int]]) -> List[Tuple[int, Gpu, List[int]]]:
+        for field in fields:
+            if field not in self._fields:
+                raise NotImplementedError(f"'{field}' is not published")
+        timestamps, values = self._read()
+        columns = [FIELDS.index(field) for field in fields]
+        positions = range(len(self._gpus)) if not gpus else [self._gpus.ids.index(gpu) for gpu in gpus]
+        return [(int(timestamps[0, pos]), self._gpus[pos], values[0, pos, columns].tolist()) for pos in positions]
+
+    def _simple(self, field: str, gpus: Optional[List[int]]) -> List[SimpleResult]:
+        return [SimpleResult(timestamp=ts, gpu_idx=gpu.id, gpu_name=gpu.name, value=value[0])
+                for ts, gpu, value in self._latest([field], gpus)]
+
+    def get_history(self, field: str, samples: int, gpus: Optional[List[int]] = None) -> \
+            Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Reads the most recent published samples of a property.
+        :param field: The property (one of FIELDS).
+        :param samples: The maximum number of samples per GPU.
+        :param gpus: A list of GPU ids to be read.
+        :return: A dictionary mapping each GPU id to its (timestamps, values).
+        """
+        if field not in self._fields:
+            raise NotImplementedError(f"'{field}' is not published")
+        timestamps, values = self._read(samples)
+        column = FIELDS.index(field)
+        return {gpu.id: (timestamps[:, pos], values[:, pos, column])
+                for pos, gpu in enumerate(self._gpus) if not gpus or gpu.id in gpus}
+
+    def get_gpus(self) -> GpuSet:
+        return self._gpus
+
+    def get_memory_info(self, gpus: Optional[List[int]] = None) -> List[MemInfo]:
+        return [MemInfo(timestamp=ts, gpu_idx=gpu.id, gpu_name=gpu.name, total=total, used=used, free=free)
+                for ts, gpu, (total, used, free) in
+                self._latest(["memory_total", "memory_used", "memory_free"], gpus)]
+
+    def get_fan_speed(self, fan: Optional[int] = None, gpus: Optional[List[int]] = None) -> List[SimpleResult]:
+        if fan is not None:
+            raise NotImplementedError("Only the default fan is published")
+        return self._simple("fan_speed", gpus)
+
+    def get_temperature(self, sensor_type: TemperatureSensorType, gpus: Optional[List[int]] = None) -> \
+            List[SimpleResult]:
+        return self._simple("temperature", gpus)
+
+    def get_clock(self, clock_type: ClockType, clock_id: ClockId = None, gpus: Optional[List[int]] = None) -> \
+            List[SimpleResult]:
+        if clock_id not in (None, ClockId.CLOCK_ID_CURRENT):
+            raise NotImplementedError("Only the current clocks are published")
+        return self._simple(_CLOCK_FIELDS[clock_type], gpus)
+
+    def get_power_usage(self, gpus: Optional[List[int]]) -> List[SimpleResult]:
+        return self._simple("power_usage", gpus)
+
+    def get_utilization(self, gpus: Optional[List[int]] = None) -> List[UtilizationInfo]:
+        return [UtilizationInfo(timestamp=ts, gpu_idx=gpu.id, gpu_name=gpu.name, gpu=util_gpu, memory=util_memory)
+                for ts, gpu, (util_gpu, util_memory) in
+                self._latest(["utilization_gpu", "utilization_memory"], gpus)]
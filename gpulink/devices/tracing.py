@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Tuple, Optional, Union, List, Callable, Any
+
+# The installed hooks - replaced as a whole on changes, so readers never need a lock
+_hooks: Tuple[QueryHook, ...] = ()
+_hooks_lock = threading.Lock()
+
+
+class QueryHook:
+    """
+    Receives an event before and after every device query of a single GPU.
+    Hooks are called on the querying thread and should return quickly.
+    """
+
+    def on_query_start(self, query: str, gpu: int) -> None:
+        """
+        Called before a query.
+        :param query: The name of the query, e.g. 'nvmlDeviceGetPowerUsage'.
+        :param gpu: The id of the queried GPU.
+        """
+
+    def on_query_end(self, query: str, gpu: int, start: int, duration: int, error: Optional[BaseException]) -> None:
+        """
+        Called after a query.
+        :param query: The name of the query.
+        :param gpu: The id of the queried GPU.
+        :param start: The start of the query as time.perf_counter_ns() [ns].
+        :param duration: The duration of the query [ns].
+        :param error: The exception raised by the query, if any.
+        """
+
+
+def add_hook(hook: QueryHook) -> None:
+    """
+    Installs a hook for all devices of this process.
+    """
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook: QueryHook) -> None:
+    """
+    Removes an installed hook.
+    """
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def get_hooks() -> Tuple[QueryHook, ...]:
+    """
+    Returns the installed hooks. Devices check the result once per query, so tracing costs nothing while disabled.
+    """
+    return _hooks
+
+
+def call_traced(hooks: Tuple[QueryHook, ...], query: Callable, gpu: int, *args, **kwargs) -> Any:
+    """
+    Calls a query of a single GPU and reports it to the given hooks.
+    """
+    name = getattr(query, "__name__", type(query).__name__)
+    for hook in hooks:
+        hook.on_query_start(name, gpu)
+    error = None
+    start = perf_counter_ns()
+    try:
+        return query(*args, **kwargs)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        duration = perf_counter_ns() - start
+        for hook in hooks:
+            hook.on_query_end(name, gpu, start, duration, error)
+
+
+class ChromeTraceExporter(QueryHook):
+    """
+    Collects all device queries as complete events and writes them as Chrome trace JSON, which can be opened with
+    chrome://tracing or Perfetto. Use it as context manager to install it while the context is entered and write
+    the trace when leaving it.
+    """
+
+    def __init__(self, path: Union[str, Path], max_events: int = 1_000_000):
+        self._path = Path(path)
+        self._max_events = max_events
+        self._pid = os.getpid()
+        self.events: List[dict] = []
+
+    def on_query_end(self, query: str, gpu: int, start: int, duration: int, error: Optional[BaseException]) -> None:
+        if len(self.events) >= self._max_events:
+            return
+        args = {"gpu": gpu}
+        if error is not None:
+            args["error"] = repr(error)
+        # list.append is atomic, so events of several sampling threads need no lock
+        self.events.append({"name": query, "cat": "nvml", "ph": "X", "ts": start / 1e3, "dur": duration / 1e3,
+                            "pid": self._pid, "tid": threading.get_ident(), "args": args})
+
+    def save(self) -> None:
+        """
+        Writes the collected events.
+        """
+        with self._path.open("w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def __enter__(self):
+        add_hook(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        remove_hook(self)
+        self.save()
@@ -0,0 +1,38 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Sequence, Optional, Tuple
+
+from gpulink.plotting.plot import Plot
+from gpulink.recording.gpu_recording import Recording
+
+
+def _save_plot(job: Tuple[Recording, Path]) -> Path:
+    recording, img_path = job
+    Plot(recording).save(img_path)
+    return img_path
+
+
+def save_plots(recordings: Sequence[Recording], img_paths: Sequence[Path], processes: Optional[int] = None) -> None:
+    """
+    Generates and saves the plots of many recordings in parallel worker processes.
+    Each plot is rendered as a standalone Figure using the Agg backend, so no global pyplot state is involved.
+    :param recordings: The recordings to be plotted.
+    :param img_paths: The paths to the image files - one per recording.
+    :param processes: The number of worker processes (default: number of CPUs). If 1, all plots are rendered within
+    the calling process.
+    """
+    if len(recordings) != len(img_paths):
+        raise ValueError("A single image path must be provided per recording")
+
+    jobs = list(zip(recordings, (Path(p) for p in img_paths)))
+    if processes == 1 or len(jobs) <= 1:
+        for job in jobs:
+            _save_plot(job)
+        return
+
+    workers = min(processes or os.cpu_count() or 1, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Results are consumed to propagate exceptions raised by the workers
+        for _ in executor.map(_save_plot, jobs, chunksize=max(1, len(jobs) // (4 * workers))):
+            pass
@@ -0,0 +1,139 @@
+from pathlib import Path
+from typing import Tuple, List, Optional
+
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.axis import Axis
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from gpulink.consts import SEC
+from gpulink.plotting.plot import _clean_matplotlib
+from gpulink.recording.gpu_recording import Recording
+
+# The height of a single metric subplot [inch]
+SUBPLOT_HEIGHT = 2.5
+
+
+def _min_max_indices(data: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Splits a series into buckets of equal size and selects the minimum and maximum of each bucket, so short peaks
+    such as memory spikes survive the decimation.
+    :return: The sorted indices of at most max_points (but at least 2) samples.
+    """
+    width = -(-data.size // max(max_points // 2, 1))
+    buckets = np.pad(data, (0, -data.size % width), mode="edge").reshape(-1, width)
+    starts = np.arange(0, data.size, width)
+    # Indices into the padding point to the last sample, which has the same value
+    indices = np.concatenate([starts + buckets.argmin(axis=1), starts + buckets.argmax(axis=1)])
+    return np.unique(np.minimum(indices, data.size - 1))
+
+
+class _TimeAxis:
+    """
+    The time axis shared by all metrics of a Dashboard, the time origin is computed once.
+    """
+
+    def __init__(self, recordings: List[Recording], max_points: Optional[int]):
+        self._max_points = max_points
+        self.timestamps = [[ts.timestamps for ts in recording.timeseries] for recording in recordings]
+
+        firsts = [t[0] for series in self.timestamps for t in series if t.size]
+        if not firsts:
+            raise ValueError("Timeseries data is empty")
+        self.origin = min(firsts)
+
+    def get(self, timestamps: np.ndarray, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the relative time [s] and the data of a time series, decimated to the minimum and maximum per bucket.
+        """
+        if self._max_points and timestamps.size > self._max_points:
+            indices = _min_max_indices(data, self._max_points)
+            return (timestamps[indices] - self.origin) / SEC, data[indices]
+        return (timestamps - self.origin) / SEC, data
+
+
+class Dashboard:
+    """
+    Plots several recordings of a single run as subplots sharing a single time axis.
+    """
+
+    def __init__(self, recordings: List[Recording], name: Optional[str] = None, max_points: Optional[int] = None):
+        """
+        :param recordings: The recordings to be plotted - one subplot per recording.
+        :param name: An optional title of the dashboard.
+        :param max_points: If provided, each time series is decimated to at most max_points points, keeping the
+        minimum and maximum of each of max_points / 2 buckets.
+        """
+        if len(recordings) == 0:
+            raise ValueError("At least one recording must be provided")
+        self._recordings = recordings
+        self._name = name
+        self._max_points = max_points
+
+    def draw(self, fig: Figure) -> List[Axis]:
+        """
+        Draws all recordings onto an existing Figure.
+        :param fig: The Figure to draw on.
+        :return: The generated Axes - one per recording.
+        """
+        time_axis = _TimeAxis(self._recordings, self._max_points)
+        axes = fig.subplots(len(self._recordings), 1, sharex=True, squeeze=False)[:, 0]
+
+        for ax, recording, timestamps in zip(axes, self._recordings, time_axis.timestamps):
+            for gpu, series, ts in zip(recording.gpus, recording.timeseries, timestamps):
+                data = series.data
+                if ts.size == 0 or data.size == 0:
+                    raise ValueError("Timeseries data is empty")
+                if ts.shape != data.shape:
+                    raise ValueError("Recorded timestamps and data must be of same shape")
+
+                x_axis, y_axis = time_axis.get(ts, data)
+                ax.plot(x_axis, y_axis, label=f"{gpu.name} [{gpu.id}]")
+
+            ax.set_title(recording.name, fontsize="medium")
+            ax.set_ylabel(f"{recording.rtype.value} [{recording.unit}]")
+
+        axes[0].legend(loc="upper left")
+        axes[-1].set_xlabel("Time [s]")
+        if self._name:
+            fig.suptitle(self._name)
+        return list(axes)
+
+    def _figure_size(self) -> Tuple[float, float]:
+        return plt.rcParams["figure.figsize"][0], SUBPLOT_HEIGHT * len(self._recordings)
+
+    def generate_graph(self) -> Tuple[Figure, List[Axis]]:
+        """
+        Generates the dashboard.
+        :return: A Tuple containing the generated Figure and Axes.
+        """
+        _clean_matplotlib()
+
+        fig = plt.figure(figsize=self._figure_size(), layout="constrained")
+        return fig, self.draw(fig)
+
+    def render(self) -> Figure:
+        """
+        Generates the dashboard as a standalone Figure using the non-interactive Agg backend.
+        :return: The generated Figure.
+        """
+        fig = Figure(figsize=self._figure_size(), layout="constrained")
+        FigureCanvasAgg(fig)
+        self.draw(fig)
+        return fig
+
+    def save(self, img_path: Path) -> None:
+        """
+        Generates and saves the dashboard as an image.
+        :param img_path: The path to the image file.
+        """
+        self.render().savefig(img_path.as_posix())
+
+    def plot(self) -> None:
+        """
+        Generates and displays the dashboard.
+        """
+        fig, _ = self.generate_graph()
+        fig.canvas.manager.set_window_title("GPULink")
+        plt.show()
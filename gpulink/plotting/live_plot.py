@@ -0,0 +1,106 @@
+from collections import deque
+from typing import List, Tuple
+
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.animation import FuncAnimation
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from gpulink.consts import SEC
+from gpulink.plotting.plot import _clean_matplotlib
+from gpulink.recording.recorder import Recorder
+
+# The relative margin added to the y-axis limits when they have to be expanded
+_Y_MARGIN = 0.1
+
+
+class LivePlot:
+    """
+    Plots the data of a running Recorder in a sliding time window.
+    New samples are appended to the existing lines which are redrawn using blitting. Only a fixed number of points
+    per GPU is kept, so the frame rate does not degrade during long recordings.
+    """
+
+    def __init__(self, recorder: Recorder, window: float = 30.0, max_points: int = 1000, refresh: float = 0.1):
+        """
+        :param recorder: The recorder providing the data.
+        :param window: The width of the sliding time window [s].
+        :param max_points: The maximum number of points displayed per GPU.
+        :param refresh: The time between two frames [s].
+        """
+        self._recorder = recorder
+        self._window = window
+        self._refresh = refresh
+        self._spacing = window * SEC / max_points
+        gpus = len(recorder.gpus)
+        self._cursors = [0] * gpus
+        self._timestamps = [deque(maxlen=max_points) for _ in range(gpus)]
+        self._data = [deque(maxlen=max_points) for _ in range(gpus)]
+        self._fig, self._ax, self._lines = self._create_figure()
+        self._animation = None
+
+    def _create_figure(self) -> Tuple[Figure, object, List[Line2D]]:
+        _clean_matplotlib()
+        fig, ax = plt.subplots()
+        lines = [ax.plot([], [], label=f"{gpu.name} [{gpu.id}]", animated=True)[0] for gpu in self._recorder.gpus]
+        ax.set_xlim(-self._window, 0)
+        ax.set_ylim(0, 1)
+        ax.set_title(self._recorder.name)
+        ax.legend(loc="upper left")
+        ax.set_ylabel(f"{self._recorder.rtype.value} [{self._recorder.unit}]")
+        ax.set_xlabel("Time [s]")
+        return fig, ax, lines
+
+    def _append(self, idx: int, timestamps: List, data: List):
+        kept_timestamps, kept_data = self._timestamps[idx], self._data[idx]
+        last = kept_timestamps[-1] if kept_timestamps else None
+        for timestamp, value in zip(timestamps, data):
+            # Samples closer than the point budget allows are skipped
+            if last is None or timestamp - last >= self._spacing:
+                kept_timestamps.append(timestamp)
+                kept_data.append(value)
+                last = timestamp
+
+    def _fit_y_limits(self, lower: float, upper: float) -> bool:
+        y_min, y_max = self._ax.get_ylim()
+        if y_min <= lower and upper <= y_max:
+            return False
+        margin = max(upper - lower, abs(upper), 1.0) * _Y_MARGIN
+        self._ax.set_ylim(min(y_min, lower - margin), max(y_max, upper + margin))
+        return True
+
+    def update(self, _frame=None) -> List[Line2D]:
+        """
+        Appends the samples recorded since the last update to the lines.
+        :return: The updated lines.
+        """
+        for idx, (timestamps, data) in enumerate(self._recorder.read_new(self._cursors)):
+            self._cursors[idx] += len(timestamps)
+            self._append(idx, timestamps, data)
+
+        latest = max((t[-1] for t in self._timestamps if t), default=None)
+        if latest is None:
+            return self._lines
+
+        lower, upper = np.inf, -np.inf
+        for line, timestamps, data in zip(self._lines, self._timestamps, self._data):
+            if not timestamps:
+                continue
+            y_axis = np.fromiter(data, dtype=np.float64, count=len(data))
+            line.set_data((np.fromiter(timestamps, dtype=np.float64, count=len(timestamps)) - latest) / SEC, y_axis)
+            lower, upper = min(lower, y_axis.min()), max(upper, y_axis.max())
+
+        if self._fit_y_limits(lower, upper):
+            # The axis changed, so the blitting background has to be re-rendered
+            self._fig.canvas.draw()
+        return self._lines
+
+    def show(self) -> None:
+        """
+        Displays the live plot. Blocks until the window is closed.
+        """
+        self._fig.canvas.manager.set_window_title("GPULink")
+        self._animation = FuncAnimation(self._fig, self.update, interval=self._refresh * 1000, blit=True,
+                                        cache_frame_data=False)
+        plt.show()
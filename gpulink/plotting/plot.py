@@ -1,12 +1,18 @@
 from pathlib import Path
-from typing import Tuple, Union
+from typing import Tuple, Union, Optional, List
 
+import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib.axis import Axis
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.figure import Figure
 
 from gpulink.consts import SEC
 from gpulink.recording.gpu_recording import Recording
+from gpulink.recording.segmentation import Segment
+
+# Marks and spans are only labeled up to this number, denser markers are drawn without labels
+MAX_MARKER_LABELS = 20
 
 
 def _clean_matplotlib():
@@ -23,8 +29,44 @@ class Plot:
     Plots recorded GPU properties over time.
     """
 
-    def __init__(self, recording: Recording):
+    def __init__(self, recording: Recording, segments: Optional[List[Segment]] = None, markers: bool = True):
+        """
+        :param recording: The recording to be plotted.
+        :param segments: Optional segments, e.g. from Recording.segments(), shaded and labeled in the plot.
+        :param markers: If true, the marks and spans of the recording are drawn.
+        """
         self._recording = recording
+        self._segments = segments if segments else []
+        self._markers = markers
+
+    def _origin(self) -> int:
+        # All GPUs share the time axis, which starts at the earliest sample
+        return min(ts.timestamps[0] for ts in self._recording.timeseries)
+
+    def _draw_segments(self, ax) -> None:
+        origin = self._origin()
+        for idx, segment in enumerate(self._segments):
+            start, end = (segment.start - origin) / SEC, (segment.end - origin) / SEC
+            ax.axvspan(start, end, color="grey", alpha=0.15 if idx % 2 else 0.05, linewidth=0)
+            ax.annotate(segment.label, xy=(start, 1), xycoords=("data", "axes fraction"), xytext=(2, -2),
+                        textcoords="offset points", va="top", fontsize="small")
+
+    def _draw_markers(self, ax) -> None:
+        markers = self._recording.markers
+        if not self._markers or markers is None or not len(markers):
+            return
+        origin = self._origin()
+        starts, ends = (markers.starts - origin) / SEC, (markers.ends - origin) / SEC
+        labeled = len(markers) <= MAX_MARKER_LABELS
+        for name, value, start, end, is_span in zip(markers.names, markers.values, starts, ends, markers.spans):
+            if is_span:
+                ax.axvspan(start, end, color="tab:orange", alpha=0.1, linewidth=0)
+            else:
+                ax.axvline(start, color="tab:orange", linestyle="--", linewidth=0.8)
+            if labeled:
+                label = name if np.isnan(value) else f"{name} {value:g}"
+                ax.annotate(label, xy=(start, 0), xycoords=("data", "axes fraction"), xytext=(2, 2),
+                            textcoords="offset points", va="bottom", fontsize="small", color="tab:orange")
 
     def _describe_plot(self, ax):
         ax.set_title(self._recording.name)
@@ -32,37 +74,57 @@ class Plot:
         ax.set_ylabel(f"{self._recording.rtype.value} [{self._recording.unit}]")
         ax.set_xlabel("Time [s]")
 
-    def generate_graph(self) -> Tuple[Figure, Axis]:
+    def draw(self, ax) -> None:
         """
-        Generates the plot.
-        :return: A Tuple containing the generated Figure and Axis.
+        Draws the recording onto an existing Axis.
+        :param ax: The Axis to draw on.
         """
-        _clean_matplotlib()
-
-        fig, ax = plt.subplots()
-
-        for gpu, data in zip(self._recording.gpus, self._recording.timeseries):
+        for data in self._recording.timeseries:
             if data.timestamps.size == 0 or data.data.size == 0:
                 raise ValueError("Timeseries data is empty")
             if data.timestamps.shape != data.data.shape:
                 raise ValueError("Recorded timestamps and data must be of same shape")
 
-            x_axis = (data.timestamps - data.timestamps[0]) / SEC
+        origin = self._origin()
+        for gpu, data in zip(self._recording.gpus, self._recording.timeseries):
+            x_axis = (data.timestamps - origin) / SEC
             y_axis = data.data
 
             ax.plot(x_axis, y_axis, label=f"{gpu.name} [{gpu.id}]")
             ax.autoscale()
 
+        self._draw_segments(ax)
+        self._draw_markers(ax)
         self._describe_plot(ax)
+
+    def generate_graph(self) -> Tuple[Figure, Axis]:
+        """
+        Generates the plot.
+        :return: A Tuple containing the generated Figure and Axis.
+        """
+        _clean_matplotlib()
+
+        fig, ax = plt.subplots()
+        self.draw(ax)
         return fig, ax
 
+    def render(self) -> Figure:
+        """
+        Generates the plot as a standalone Figure using the non-interactive Agg backend.
+        The global pyplot state is neither used nor modified.
+        :return: The generated Figure.
+        """
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        self.draw(fig.add_subplot())
+        return fig
+
     def save(self, img_path: Path) -> None:
         """
         Generates and saves a Plot as an image.
         :param img_path: The path to the image file.
         """
-        self.generate_graph()
-        plt.savefig(img_path.as_posix())
+        self.render().savefig(img_path.as_posix())
 
     def plot(self) -> None:
         """
@@ -0,0 +1,113 @@
+from pathlib import Path
+from typing import Tuple, Optional, List
+
+from matplotlib import pyplot as plt
+from matplotlib.axis import Axis
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from gpulink.consts import SEC
+from gpulink.plotting.plot import _clean_matplotlib
+from gpulink.recording.store import RecordingStore, Window
+
+
+class StoreView:
+    """
+    Plots a stored recording using windowed queries.
+    Zooming or panning an interactive plot re-queries the visible time range only.
+    """
+
+    def __init__(self, store: RecordingStore, max_points: int = 2000):
+        self._store = store
+        self._max_points = max_points
+        self._origin = store.time_range[0]
+        self._lines = []
+        self._bands = []
+
+    def _query(self, start: Optional[float], end: Optional[float]) -> List[Window]:
+        t0 = None if start is None else self._origin + int(start * SEC)
+        t1 = None if end is None else self._origin + int(end * SEC)
+        return self._store.window(t0, t1, self._max_points)
+
+    def _draw_bands(self, ax, windows: List[Window]):
+        for band in self._bands:
+            band.remove()
+        self._bands = [
+            ax.fill_between((w.timestamps - self._origin) / SEC, w.data_min, w.data_max, alpha=0.3,
+                            color=line.get_color(), linewidth=0)
+            for w, line in zip(windows, self._lines)
+        ]
+
+    def _on_xlim_changed(self, ax):
+        start, end = ax.get_xlim()
+        windows = self._query(max(start, 0.0), end)
+        for line, window in zip(self._lines, windows):
+            line.set_data((window.timestamps - self._origin) / SEC, window.data_mean)
+        self._draw_bands(ax, windows)
+        ax.figure.canvas.draw_idle()
+
+    def draw(self, ax, start: Optional[float] = None, end: Optional[float] = None) -> None:
+        """
+        Draws a time range onto an existing Axis.
+        :param ax: The Axis to draw on.
+        :param start: The start of the plotted time range [s] relative to the first sample.
+        :param end: The end of the plotted time range [s] relative to the first sample.
+        """
+        windows = self._query(start, end)
+        self._lines = [
+            ax.plot((w.timestamps - self._origin) / SEC, w.data_mean, label=f"{w.gpu.name} [{w.gpu.id}]")[0]
+            for w in windows
+        ]
+        self._bands = []
+        self._draw_bands(ax, windows)
+
+        ax.set_title(self._store.name)
+        ax.legend(loc="upper left")
+        ax.set_ylabel(f"{self._store.rtype.value} [{self._store.unit}]")
+        ax.set_xlabel("Time [s]")
+
+    def generate_graph(self, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[Figure, Axis]:
+        """
+        Generates the plot.
+        :param start: The start of the plotted time range [s] relative to the first sample.
+        :param end: The end of the plotted time range [s] relative to the first sample.
+        :return: A Tuple containing the generated Figure and Axis.
+        """
+        _clean_matplotlib()
+
+        fig, ax = plt.subplots()
+        self.draw(ax, start, end)
+        return fig, ax
+
+    def render(self, start: Optional[float] = None, end: Optional[float] = None) -> Figure:
+        """
+        Generates the plot of a time range as a standalone Figure using the non-interactive Agg backend.
+        The global pyplot state is neither used nor modified.
+        :param start: The start of the plotted time range [s] relative to the first sample.
+        :param end: The end of the plotted time range [s] relative to the first sample.
+        :return: The generated Figure.
+        """
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        self.draw(fig.add_subplot(), start, end)
+        return fig
+
+    def save(self, img_path: Path, start: Optional[float] = None, end: Optional[float] = None) -> None:
+        """
+        Generates and saves a plot of a time range as an image.
+        :param img_path: The path to the image file.
+        :param start: The start of the plotted time range [s] relative to the first sample.
+        :param end: The end of the plotted time range [s] relative to the first sample.
+        """
+        self.render(start, end).savefig(img_path.as_posix())
+
+    def plot(self, start: Optional[float] = None, end: Optional[float] = None) -> None:
+        """
+        Generates and displays an interactive plot which re-queries the visible time range on zoom.
+        :param start: The start of the plotted time range [s] relative to the first sample.
+        :param end: The end of the plotted time range [s] relative to the first sample.
+        """
+        fig, ax = self.generate_graph(start, end)
+        ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+        fig.canvas.manager.set_window_title("GPULink")
+        plt.show()
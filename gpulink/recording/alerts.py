@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, asdict
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional, Callable, Sequence, Union
+
+import numpy as np
+
+from gpulink.consts import SEC
+
+Sink = Callable[["Alert"], None]
+
+
+class Condition(Enum):
+    ABOVE = "above"  # The value exceeds the threshold
+    BELOW = "below"  # The value falls below the threshold
+    RISING = "rising"  # The value increases faster than the threshold [unit/s]
+    FALLING = "falling"  # The value decreases faster than the threshold [unit/s]
+
+
+@dataclass
+class Rule:
+    """
+    An alert rule evaluated on each sample of every GPU.
+    The alert fires once the condition held for 'sustained' seconds and resolves once the value (or rate) passes
+    the 'clear' threshold in the opposite direction, which defaults to the threshold itself.
+    """
+    name: str
+    condition: Condition
+    threshold: float
+    sustained: float = 0.0  # [s]
+    clear: Optional[float] = None  # A separate threshold for resolving the alert (hysteresis)
+
+    @classmethod
+    def above(cls, name: str, threshold: float, sustained: float = 0.0, clear: Optional[float] = None) -> Rule:
+        return cls(name, Condition.ABOVE, threshold, sustained, clear)
+
+    @classmethod
+    def below(cls, name: str, threshold: float, sustained: float = 0.0, clear: Optional[float] = None) -> Rule:
+        return cls(name, Condition.BELOW, threshold, sustained, clear)
+
+    @classmethod
+    def rising(cls, name: str, rate: float, sustained: float = 0.0, clear: Optional[float] = None) -> Rule:
+        return cls(name, Condition.RISING, rate, sustained, clear)
+
+    @classmethod
+    def falling(cls, name: str, rate: float, sustained: float = 0.0, clear: Optional[float] = None) -> Rule:
+        return cls(name, Condition.FALLING, rate, sustained, clear)
+
+
+@dataclass
+class Alert:
+    rule: str
+    gpu: int
+    timestamp: int
+    value: float
+    firing: bool  # True when the alert fires, False when it resolves
+
+
+class AlertEngine:
+    """
+    Evaluates alert rules on every sample frame of a recording and reports state changes to sinks.
+    All rules are compiled into arrays, so a frame is checked for all rules and GPUs in a few vectorized operations.
+    The engine is a Recorder callback, e.g. Recorder.create_temperature_recorder(ctx, callback=AlertEngine(...)).
+    Alerts report the ids of the recorded GPUs unless 'gpus' is given.
+    """
+
+    def __init__(self, rules: Sequence[Rule], sinks: Sequence[Sink], gpus: Optional[List[int]] = None):
+        self._rules = list(rules)
+        self._sinks = list(sinks)
+        self._gpus = gpus
+
+        # Each rule is normalized to 'signed value > trigger': BELOW negates value and threshold, FALLING only negates
+        # the rate as its threshold is the magnitude of the decrease
+        sign = np.array([-1.0 if r.condition in (Condition.BELOW, Condition.FALLING) else 1.0 for r in rules])
+        threshold_sign = np.array([-1.0 if r.condition == Condition.BELOW else 1.0 for r in rules])
+        self._sign = sign[:, None]
+        self._trigger = (threshold_sign * np.array([r.threshold for r in rules], dtype=np.float64))[:, None]
+        self._clear = (threshold_sign * np.array([r.threshold if r.clear is None else r.clear for r in rules],
+                                                 dtype=np.float64))[:, None]
+        self._sustained = np.array([int(r.sustained * SEC) for r in rules], dtype=np.int64)[:, None]
+        self._on_rate = np.array([r.condition in (Condition.RISING, Condition.FALLING) for r in rules])[:, None]
+
+        self._active: Optional[np.ndarray] = None  # Whether an alert is firing per rule and GPU
+        self._since: Optional[np.ndarray] = None  # Since when the condition holds per rule and GPU, -1 if not
+        self._last_timestamps: Optional[np.ndarray] = None
+        self._last_values: Optional[np.ndarray] = None
+
+    def bind(self, gpus: List[int]) -> None:
+        """
+        Called by the Recorder with the ids of the recorded GPUs.
+        :param gpus: The GPU ids in the order of the samples passed to the callback.
+        """
+        if self._gpus is None:
+            self._gpus = list(gpus)
+
+    def __call__(self, timestamps: List, data: List) -> None:
+        self.evaluate(np.asarray(timestamps, dtype=np.int64), np.asarray(data, dtype=np.float64))
+
+    @property
+    def active(self) -> np.ndarray:
+        """
+        Whether an alert is firing per rule (rows) and GPU (columns).
+        """
+        return self._active.copy() if self._active is not None else np.zeros((len(self._rules), 0), dtype=bool)
+
+    def evaluate(self, timestamps: np.ndarray, values: np.ndarray) -> List[Alert]:
+        """
+        Evaluates all rules on a single sample per GPU.
+        :param timestamps: The timestamp of the sample per GPU.
+        :param values: The value of the sample per GPU, NaN for GPUs without a sample on this frame.
+        :return: The alerts which fired or resolved on this frame.
+        """
+        if self._active is None:
+            shape = (len(self._rules), values.size)
+            self._active = np.zeros(shape, dtype=bool)
+            self._since = np.full(shape, -1, dtype=np.int64)
+            rates = np.full(values.size, np.nan)
+        else:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rates = (values - self._last_values) / ((timestamps - self._last_timestamps) / SEC)
+        present = ~np.isnan(values)
+        if self._last_values is None:
+            self._last_timestamps, self._last_values = timestamps, values
+        else:
+            self._last_timestamps = np.where(present, timestamps, self._last_timestamps)
+            self._last_values = np.where(present, values, self._last_values)
+
+        # NaN values and rates (missing sample, first frame, equal timestamps) compare False and therefore neither
+        # trigger nor clear. GPUs without a sample keep their state.
+        signed = self._sign * np.where(self._on_rate, rates[None, :], values[None, :])
+        holds = signed > self._trigger
+        since = np.where(holds, np.where(self._since < 0, timestamps[None, :], self._since), -1)
+        self._since = np.where(present[None, :], since, self._since)
+        fires = ~self._active & holds & (timestamps[None, :] - self._since >= self._sustained)
+        resolves = self._active & (signed <= self._clear)
+        self._active = (self._active | fires) & ~resolves
+
+        alerts = []
+        for changed, firing in ((fires, True), (resolves, False)):
+            for rule_idx, gpu_pos in zip(*np.nonzero(changed)):
+                alerts.append(Alert(
+                    rule=self._rules[rule_idx].name,
+                    gpu=self._gpus[gpu_pos] if self._gpus is not None else int(gpu_pos),
+                    timestamp=int(timestamps[gpu_pos]),
+                    value=float(values[gpu_pos]),
+                    firing=firing))
+        for alert in alerts:
+            for sink in self._sinks:
+                sink(alert)
+        return alerts
+
+
+class LogSink:
+    """
+    Reports alerts using the 'gpulink' logger.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self._logger = logger if logger else logging.getLogger("gpulink")
+
+    def __call__(self, alert: Alert) -> None:
+        if alert.firing:
+            self._logger.warning("Alert '%s' fired on GPU %d (value: %s)", alert.rule, alert.gpu, alert.value)
+        else:
+            self._logger.info("Alert '%s' resolved on GPU %d (value: %s)", alert.rule, alert.gpu, alert.value)
+
+
+class FileSink:
+    """
+    Appends alerts as JSON lines to a file.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self._path = Path(path)
+
+    def __call__(self, alert: Alert) -> None:
+        with self._path.open("a") as file:
+            file.write(json.dumps(asdict(alert)) + "\n")
+
+
+class WebhookSink:
+    """
+    Encodes alerts as JSON payloads for a webhook.
+    The payloads are handed to a transport, e.g. an HTTP client, and are collected in 'payloads' if none is given.
+    """
+
+    def __init__(self, url: str, transport: Optional[Callable[[str, bytes], None]] = None):
+        self._url = url
+        self._transport = transport
+        self.payloads: List[bytes] = []
+
+    def __call__(self, alert: Alert) -> None:
+        payload = json.dumps({"text": f"{'FIRING' if alert.firing else 'RESOLVED'}: {alert.rule} on GPU {alert.gpu}",
+                              "alert": asdict(alert)}).encode("utf-8")
+        if self._transport:
+            self._transport(self._url, payload)
+        else:
+            self.payloads.append(payload)
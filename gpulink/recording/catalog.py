@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import fnmatch
+import os
+import re
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import List, Optional, Dict, Tuple, Sequence, Iterable, Any
+
+import numpy as np
+from tabulate import tabulate
+
+from gpulink.consts import SEC
+from gpulink.devices.gpu import Gpu
+from gpulink.recording.gpu_recording import RecType
+from gpulink.recording.storage import PathLike, read_header, map_series
+
+# The keys recordings can be grouped by
+GROUP_KEYS = ("file", "name", "rtype", "unit", "gpu")
+# The keys every group is split by, values of different properties or units are never aggregated together
+_REQUIRED_GROUP_KEYS = ("rtype", "unit")
+# Aggregations besides quantiles, which are given as 'p<percentile>', e.g. 'p99' or 'p99.9'
+AGGREGATIONS = ("count", "sum", "mean", "std", "min", "max")
+_QUANTILE = re.compile(r"^p(\d+(\.\d+)?)$")
+# The number of cached quantiles of groups spanning several series
+MAX_GROUP_RESULTS = 1024
+
+
+@dataclass(frozen=True)
+class _Series:
+    """
+    The time series of a single GPU within a stored recording.
+    """
+    path: Path
+    index: int
+    name: str
+    rtype: RecType
+    unit: str
+    gpu: Gpu
+
+    def key(self, group: str) -> Any:
+        if group == "file":
+            return self.path.name
+        if group == "rtype":
+            return self.rtype.value
+        if group == "gpu":
+            return self.gpu.id
+        return getattr(self, group)
+
+
+@dataclass
+class _CachedFile:
+    signature: Tuple[int, int]  # (mtime, size) of the file when it was read
+    header: dict
+    series: List[_Series]
+    results: Dict[Tuple, Any] = field(default_factory=dict)  # Aggregations per (series, time range, aggregation)
+    mapped: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None  # The memory-mapped series once accessed
+
+
+@dataclass
+class Table:
+    """
+    The result of a catalog query: one row per group.
+    """
+    columns: List[str]
+    rows: List[List[Any]]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def __str__(self):
+        return tabulate(self.rows, headers=self.columns, tablefmt='fancy_grid')
+
+
+def _parse_aggregation(aggregation: str) -> Optional[float]:
+    match = _QUANTILE.match(aggregation)
+    if match:
+        return float(match.group(1)) / 100
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation '{aggregation}', use one of {', '.join(AGGREGATIONS)} or p<percentile>")
+    return None
+
+
+class RecordingCatalog:
+    """
+    Queries a directory of stored recordings (see save_recording).
+    Headers and aggregation results are cached per file (quantiles of groups per set of series) and invalidated once
+    the modification time or size of a file changes, so repeated queries only read files which were added or
+    changed. Time series are memory-mapped.
+    """
+
+    def __init__(self, directory: PathLike, pattern: str = "*.rec"):
+        self._directory = Path(directory)
+        self._pattern = pattern
+        self._files: Dict[Path, _CachedFile] = {}
+        self._skipped: Dict[Path, Tuple[int, int]] = {}  # Files which are no recordings by their signature
+        # Quantiles of groups spanning several series together with the signatures of all involved files, an entry is
+        # replaced once a file changes and the oldest entries are evicted beyond MAX_GROUP_RESULTS
+        self._group_results: Dict[Tuple, Tuple[Tuple, float]] = {}
+
+    def _scan(self) -> List[_CachedFile]:
+        files = {}
+        for path in sorted(self._directory.glob(self._pattern)):
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._skipped.get(path) == signature:
+                continue
+            cached = self._files.get(path)
+            if cached is None or cached.signature != signature:
+                try:
+                    header = read_header(path)
+                except (ValueError, OSError):
+                    # Not a (supported) recording
+                    self._skipped[path] = signature
+                    continue
+                gpus = [Gpu(gpu["id"], gpu["name"]) for gpu in header["gpus"]]
+                series = [_Series(path, idx, header["name"], RecType[header["rtype"]], header["unit"], gpu)
+                          for idx, gpu in enumerate(gpus)]
+                cached = _CachedFile(signature, header, series)
+            files[path] = cached
+        self._files = files
+        return list(files.values())
+
+    def query(self) -> Query:
+        """
+        Starts a query over all recordings in the directory.
+        """
+        return Query(self)
+
+    def _slice(self, series: _Series, start: Optional[float], end: Optional[float]) -> np.ndarray:
+        cached = self._files[series.path]
+        if cached.mapped is None:
+            cached.mapped = map_series(series.path, cached.header)
+        mapped = cached.mapped
+        timestamps, data = mapped[series.index]
+        if start is None and end is None:
+            return data
+        firsts = [t[0] for t, _ in mapped if t.size]
+        origin = min(firsts) if firsts else 0
+        first = 0 if start is None else np.searchsorted(timestamps, origin + int(start * SEC), side="left")
+        last = timestamps.size if end is None else np.searchsorted(timestamps, origin + int(end * SEC), side="right")
+        return data[first:last]
+
+    def _partials(self, series: _Series, start: Optional[float], end: Optional[float]) -> Tuple[float, ...]:
+        # Decomposable partial aggregates, so groups of several series never need to re-read cached series
+        results = self._files[series.path].results
+        key = (series.index, start, end, "partials")
+        if key not in results:
+            data = np.asarray(self._slice(series, start, end), dtype=np.float64)
+            results[key] = (data.size, float(data.sum()), float(np.square(data).sum()),
+                            float(data.min()) if data.size else np.nan, float(data.max()) if data.size else np.nan)
+        return results[key]
+
+    def _quantile(self, group: Sequence[_Series], q: float, start: Optional[float], end: Optional[float]) -> float:
+        if len(group) == 1:
+            series = group[0]
+            results = self._files[series.path].results
+            key = (series.index, start, end, q)
+            if key not in results:
+                data = self._slice(series, start, end)
+                results[key] = float(np.quantile(data, q)) if data.size else np.nan
+            return results[key]
+        key = (tuple((series.path, series.index) for series in group), start, end, q)
+        signatures = tuple(self._files[series.path].signature for series in group)
+        cached = self._group_results.pop(key, None)
+        if cached is None or cached[0] != signatures:
+            data = np.concatenate([self._slice(series, start, end) for series in group])
+            cached = (signatures, float(np.quantile(data, q)) if data.size else np.nan)
+        # Re-inserting keeps the dict ordered by last use
+        self._group_results[key] = cached
+        while len(self._group_results) > MAX_GROUP_RESULTS:
+            del self._group_results[next(iter(self._group_results))]
+        return cached[1]
+
+    def _aggregate(self, group: Sequence[_Series], aggregations: Sequence[str], start: Optional[float],
+                   end: Optional[float]) -> List[float]:
+        partials = np.array([self._partials(series, start, end) for series in group], dtype=np.float64)
+        count, total, squares = partials[:, 0].sum(), partials[:, 1].sum(), partials[:, 2].sum()
+        values = []
+        for aggregation in aggregations:
+            q = _parse_aggregation(aggregation)
+            if q is not None:
+                values.append(self._quantile(group, q, start, end))
+            elif aggregation == "count":
+                values.append(int(count))
+            elif aggregation == "sum":
+                values.append(total)
+            elif not count:
+                values.append(np.nan)
+            elif aggregation == "mean":
+                values.append(total / count)
+            elif aggregation == "std":
+                values.append(float(np.sqrt(max(squares / count - (total / count) ** 2, 0.0))))
+            elif aggregation == "min":
+                values.append(float(np.nanmin(partials[:, 3])))
+            else:
+                values.append(float(np.nanmax(partials[:, 4])))
+        return values
+
+
+@dataclass(frozen=True)
+class Query:
+    """
+    An immutable query over a RecordingCatalog, built by chaining where() and group_by() and run by aggregate(), e.g.
+    catalog.query().where(rtypes=[RecType.REC_TYPE_POWER_USAGE]).group_by("name", "gpu").aggregate("p99", "mean")
+    Groups never mix properties or units, see group_by().
+    """
+    catalog: RecordingCatalog
+    gpus: Optional[Tuple[int, ...]] = None
+    rtypes: Optional[Tuple[RecType, ...]] = None
+    name: Optional[str] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
+    groups: Tuple[str, ...] = ()
+
+    def where(self, gpus: Optional[Iterable[int]] = None, rtypes: Optional[Iterable[RecType]] = None,
+              name: Optional[str] = None, start: Optional[float] = None, end: Optional[float] = None) -> Query:
+        """
+        Restricts the query, unspecified filters are kept.
+        :param gpus: The GPU ids to be included.
+        :param rtypes: The recorded properties to be included.
+        :param name: A shell-style pattern the recording names have to match, e.g. 'resnet-*'.
+        :param start: The start of the time range [s] relative to the first sample of each recording.
+        :param end: The end of the time range [s] relative to the first sample of each recording.
+        :return: The restricted query.
+        """
+        return replace(
+            self,
+            gpus=tuple(gpus) if gpus is not None else self.gpus,
+            rtypes=tuple(rtypes) if rtypes is not None else self.rtypes,
+            name=name if name is not None else self.name,
+            start=start if start is not None else self.start,
+            end=end if end is not None else self.end)
+
+    def group_by(self, *keys: str) -> Query:
+        """
+        Groups the matching time series, each group is aggregated into a single row. Groups are always split by 'rtype'
+        and 'unit' as well, which are appended to the keys if missing.
+        :param keys: Any of 'file', 'name', 'rtype', 'unit' and 'gpu'.
+        :return: The grouped query.
+        """
+        for key in keys:
+            if key not in GROUP_KEYS:
+                raise ValueError(f"Cannot group by '{key}', use one of {', '.join(GROUP_KEYS)}")
+        return replace(self, groups=tuple(keys))
+
+    def _matching(self) -> List[_Series]:
+        return [series for cached in self.catalog._scan() for series in cached.series
+                if (self.gpus is None or series.gpu.id in self.gpus)
+                and (self.rtypes is None or series.rtype in self.rtypes)
+                and (self.name is None or fnmatch.fnmatchcase(series.name, self.name))]
+
+    def aggregate(self, *aggregations: str) -> Table:
+        """
+        Runs the query.
+        :param aggregations: Any of 'count', 'sum', 'mean', 'std', 'min', 'max' and quantiles such as 'p99'.
+        :return: A table with one row per group.
+        """
+        for aggregation in aggregations:
+            _parse_aggregation(aggregation)
+        keys = list(self.groups) + [key for key in _REQUIRED_GROUP_KEYS if key not in self.groups]
+        groups: Dict[Tuple, List[_Series]] = {}
+        for series in self._matching():
+            groups.setdefault(tuple(series.key(key) for key in keys), []).append(series)
+        rows = [list(key) + self.catalog._aggregate(group, aggregations, self.start, self.end)
+                for key, group in groups.items()]
+        return Table(columns=keys + list(aggregations), rows=rows)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Tuple, TYPE_CHECKING
+
+import numpy as np
+from tabulate import tabulate
+
+from gpulink.devices.gpu import Gpu
+from gpulink.units import conversion_factor
+
+if TYPE_CHECKING:
+    from gpulink.recording.gpu_recording import Recording, RecType
+
+# The quantiles compared per GPU
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+# The KS distance from which two distributions are flagged as different - long recordings are autocorrelated, so the
+# statistical critical value alone would flag virtually every difference
+KS_THRESHOLD = 0.1
+# The relative peak change from which a difference is flagged
+PEAK_THRESHOLD = 0.05
+# The coefficient c(alpha) of the two-sample KS critical value for alpha = 0.05
+_KS_COEFFICIENT = 1.358
+
+
+def ks_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Computes the two-sample Kolmogorov-Smirnov distance, the maximum difference of both empirical CDFs.
+    :param a: The samples of the first distribution.
+    :param b: The samples of the second distribution.
+    :return: The KS distance in [0, 1].
+    """
+    a, b = np.sort(a), np.sort(b)
+    points = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, points, side="right") / a.size
+    cdf_b = np.searchsorted(b, points, side="right") / b.size
+    return float(np.max(np.abs(cdf_a - cdf_b)))
+
+
+@dataclass
+class GpuComparison:
+    """
+    The comparison of the samples of a single GPU in two recordings.
+    """
+    gpu: Gpu
+    quantiles: Tuple[float, ...]
+    baseline_quantiles: np.ndarray
+    candidate_quantiles: np.ndarray
+    baseline_peak: float
+    candidate_peak: float
+    baseline_mean: float
+    candidate_mean: float
+    ks_distance: float
+    ks_critical: float  # The critical value of the KS test for alpha = 0.05
+    significant: bool
+
+    @property
+    def peak_delta(self) -> float:
+        """
+        The relative change of the peak value.
+        """
+        if self.baseline_peak == 0:
+            return 0.0 if self.candidate_peak == 0 else float(np.inf)
+        return (self.candidate_peak - self.baseline_peak) / abs(self.baseline_peak)
+
+
+@dataclass
+class Comparison:
+    """
+    The comparison of two recordings of the same property per GPU.
+    """
+    rtype: RecType
+    unit: str
+    baseline: str  # The name of the baseline recording
+    candidate: str  # The name of the candidate recording
+    gpus: List[GpuComparison]
+
+    @property
+    def significant(self) -> bool:
+        return any(gpu.significant for gpu in self.gpus)
+
+    def __str__(self):
+        table = [["GPU", "Name", f"{self.rtype.value} [{self.unit}]: {self.baseline} -> {self.candidate}", "Verdict"]]
+        for gpu in self.gpus:
+            quantiles = "\n".join(f"p{q * 100:g}: {b:.6g} -> {c:.6g}" for q, b, c in
+                                  zip(gpu.quantiles, gpu.baseline_quantiles, gpu.candidate_quantiles))
+            table.append([
+                gpu.gpu.id,
+                gpu.gpu.name,
+                f"{quantiles}\n"
+                f"mean: {gpu.baseline_mean:.6g} -> {gpu.candidate_mean:.6g}\n"
+                f"peak: {gpu.baseline_peak:.6g} -> {gpu.candidate_peak:.6g} ({gpu.peak_delta:+.2%})\n"
+                f"KS distance: {gpu.ks_distance:.4f} (critical: {gpu.ks_critical:.4f})",
+                "DIFFERENT" if gpu.significant else "same"
+            ])
+        return tabulate(table, tablefmt='fancy_grid')
+
+
+def compare_recordings(baseline: Recording, candidate: Recording, quantiles: Tuple[float, ...] = QUANTILES,
+                       ks_threshold: float = KS_THRESHOLD, peak_threshold: float = PEAK_THRESHOLD) -> Comparison:
+    """
+    Compares the sample distributions of two recordings of the same property per GPU.
+    GPUs are aligned by id, GPUs missing in one of the recordings are skipped. Recordings in different units of
+    the same quantity are compared in the unit of the baseline.
+    A GPU is flagged if the KS distance exceeds both its critical value and ks_threshold or if the peak changed by
+    more than peak_threshold.
+    :param baseline: The reference recording.
+    :param candidate: The recording to be checked.
+    :param quantiles: The quantiles to be compared.
+    :param ks_threshold: The minimum KS distance to be flagged.
+    :param peak_threshold: The minimum relative peak change to be flagged.
+    :return: The comparison per GPU.
+    """
+    if baseline.rtype != candidate.rtype:
+        raise ValueError(f"Cannot compare a '{baseline.rtype.value}' with a '{candidate.rtype.value}' recording")
+    try:
+        # The candidate is compared in the unit of the baseline, e.g. a recording in [MB] with one in [Byte]
+        factor = conversion_factor(candidate.unit, baseline.unit)
+    except ValueError:
+        raise ValueError(f"Cannot compare recordings in [{baseline.unit}] and [{candidate.unit}]")
+
+    candidate_series = {gpu.id: ts for gpu, ts in zip(candidate.gpus, candidate.timeseries)}
+    gpus = []
+    for gpu, timeseries in zip(baseline.gpus, baseline.timeseries):
+        if gpu.id not in candidate_series:
+            continue
+        a = np.asarray(timeseries.data, dtype=np.float64)
+        b = np.asarray(candidate_series[gpu.id].data, dtype=np.float64)
+        if factor != 1.0:
+            b *= factor
+        if a.size == 0 or b.size == 0:
+            continue
+        distance = ks_distance(a, b)
+        critical = _KS_COEFFICIENT * np.sqrt((a.size + b.size) / (a.size * b.size))
+        comparison = GpuComparison(
+            gpu=gpu,
+            quantiles=tuple(quantiles),
+            baseline_quantiles=np.quantile(a, quantiles),
+            candidate_quantiles=np.quantile(b, quantiles),
+            baseline_peak=float(a.max()),
+            candidate_peak=float(b.max()),
+            baseline_mean=float(a.mean()),
+            candidate_mean=float(b.mean()),
+            ks_distance=distance,
+            ks_critical=float(critical),
+            significant=False)
+        comparison.significant = bool(distance > max(critical, ks_threshold) or
+                                      abs(comparison.peak_delta) > peak_threshold)
+        gpus.append(comparison)
+    return Comparison(rtype=baseline.rtype, unit=baseline.unit, baseline=baseline.name, candidate=candidate.name,
+                      gpus=gpus)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+
+from gpulink.consts import SEC
+from gpulink.recording.timeseries import TimeSeries
+from gpulink.units import conversion_factor
+
+
+def cumulative_energy(power: TimeSeries) -> TimeSeries:
+    """
+    Integrates a power time series [mW] into a cumulative energy time series [mJ] using the trapezoidal rule.
+    :param power: The recorded power usage. Timestamps are expected in nanoseconds.
+    :return: A TimeSeries of the same shape containing the energy consumed since the first sample.
+    """
+    timestamps = power.timestamps
+    data = power.data.astype(np.float64)
+    if data.size == 0:
+        return TimeSeries(timestamps=timestamps, data=data)
+    segments = (data[1:] + data[:-1]) * 0.5 * (np.diff(timestamps) / SEC)
+    return TimeSeries(timestamps=timestamps, data=np.concatenate(([0.0], np.cumsum(segments))))
+
+
+def since_first(energy: TimeSeries) -> TimeSeries:
+    """
+    Rebases a cumulative energy counter, which counts since the driver was loaded, onto its first sample.
+    :param energy: The recorded energy counter.
+    :return: A TimeSeries of the same shape containing the energy consumed since the first sample.
+    """
+    return TimeSeries(timestamps=energy.timestamps, data=energy.data - energy.data[:1])
+
+
+def integrate_power(power: TimeSeries, unit: str = "mW") -> float:
+    """
+    Integrates a power time series into the total energy consumed.
+    :param power: The recorded power usage. Timestamps are expected in nanoseconds.
+    :param unit: The unit of the recorded power usage, e.g. mW or W.
+    :return: The consumed energy [J].
+    """
+    data = power.data.astype(np.float64)
+    if data.size < 2:
+        return 0.0
+    watts = data * conversion_factor(unit, "W")
+    return float(np.sum((watts[1:] + watts[:-1]) * 0.5 * (np.diff(power.timestamps) / SEC)))
+
+
+def counter_delta(energy: TimeSeries, unit: str = "mJ") -> float:
+    """
+    Computes the energy consumed between the first and the last sample of a cumulative energy counter.
+    :param energy: The recorded energy counter.
+    :param unit: The unit of the recorded energy counter, e.g. mJ or J.
+    :return: The consumed energy [J].
+    """
+    data = energy.data
+    if data.size == 0:
+        return 0.0
+    return float(data[-1] - data[0]) * conversion_factor(unit, "J")
+
+
+def counter_difference(start: List[int], end: List[int]) -> List[float]:
+    """
+    Computes the per-GPU energy [J] consumed between two energy counter readings [mJ].
+    """
+    return [(e - s) * conversion_factor("mJ", "J") for s, e in zip(start, end)]
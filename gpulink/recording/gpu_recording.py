@@ -1,16 +1,22 @@
 from __future__ import annotations
 
-import sys
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Union
+from typing import List, Union, Optional, Sequence
 
 import numpy as np
 from tabulate import tabulate
 
+from gpulink.clock import ClockAnchor
 from gpulink.consts import SEC
 from gpulink.devices.gpu import GpuSet
+from gpulink.recording.compare import Comparison, compare_recordings
+from gpulink.recording.energy import integrate_power, counter_delta, cumulative_energy
+from gpulink.recording.instrumentation import RecorderStats
+from gpulink.recording.markers import Markers, SpanStats, span_stats
+from gpulink.recording.segmentation import Segment, segment_timeseries
 from gpulink.recording.timeseries import TimeSeries
+from gpulink.units import Unit, UNITS, conversion_factor
 
 
 class RecType(Enum):
@@ -22,6 +28,12 @@ class RecType(Enum):
     REC_TYPE_FAN_SPEED = "Fan Speed"
     REC_TYPE_TEMPERATURE = "Temperature"
     REC_TYPE_MEMORY = "Memory"
+    REC_TYPE_ENERGY = "Energy Consumption"
+    REC_TYPE_UTILIZATION_GPU = "GPU Utilization"
+    REC_TYPE_UTILIZATION_MEMORY = "Memory Utilization"
+    REC_TYPE_PCIE_TX = "PCIe TX Throughput"
+    REC_TYPE_PCIE_RX = "PCIe RX Throughput"
+    REC_TYPE_THROTTLE_REASONS = "Clock Throttle Reasons"
 
 
 @dataclass
@@ -34,6 +46,19 @@ class Recording:
     rtype: RecType
     name: str
     unit: str
+    stats: Optional[RecorderStats] = None  # The timing statistics of the recorder if recorded live
+    markers: Optional[Markers] = None  # The marks and spans set while recording, see gpulink.mark()
+    clock: Optional[ClockAnchor] = None  # Maps the timestamps to wall time if known
+
+    def to_wall_time(self) -> List[TimeSeries]:
+        """
+        Converts the timestamps into wall time [ns] since the epoch, e.g. to merge recordings of several hosts.
+        Timestamps are taken from a monotonic clock, which is anchored to wall time once per recording.
+        :return: A list containing the time series per GPU with wall time timestamps.
+        """
+        if self.clock is None:
+            raise ValueError(f"The timestamps of '{self.name}' are not anchored to wall time")
+        return [TimeSeries(timestamps=self.clock.to_wall(ts.timestamps), data=ts.data) for ts in self.timeseries]
 
     def _create_data_table(self):
         table = [["GPU", "Name", f"{self.name} ({self.rtype.value} [{self.unit}])"]]
@@ -51,20 +76,118 @@ class Recording:
     def _get_duration(self):
         timestamps = [t.timestamps for t in self.timeseries]
         min_time = min([np.min(t) for t in timestamps])
-        max_time = min([np.max(t) for t in timestamps])
+        max_time = max([np.max(t) for t in timestamps])
         return (max_time - min_time) / SEC
 
+    def get_achieved_rate(self) -> float:
+        """
+        Computes the achieved sampling rate from the recorded timestamps, averaged over all GPUs.
+        :return: The achieved sampling rate [Hz].
+        """
+        rates = []
+        for ts in self.timeseries:
+            timestamps = ts.timestamps
+            if timestamps.size > 1 and timestamps[-1] > timestamps[0]:
+                rates.append((timestamps.size - 1) / ((timestamps[-1] - timestamps[0]) / SEC))
+        return float(np.mean(rates)) if rates else 0.0
+
+    def get_energy(self) -> List[float]:
+        """
+        Computes the energy consumed by each recorded GPU.
+        Energy recordings use the difference of the cumulative counter, power recordings are integrated.
+        :return: A list containing the consumed energy [J] per GPU.
+        """
+        if self.rtype == RecType.REC_TYPE_ENERGY:
+            return [counter_delta(ts, self.unit) for ts in self.timeseries]
+        if self.rtype == RecType.REC_TYPE_POWER_USAGE:
+            return [integrate_power(ts, self.unit) for ts in self.timeseries]
+        raise ValueError(f"Cannot compute the energy of a '{self.rtype.value}' recording")
+
+    def _energy_counter(self, timeseries: TimeSeries) -> Optional[np.ndarray]:
+        # The cumulative energy [J] at each sample if the recorded property and unit allow to compute it
+        try:
+            if self.rtype == RecType.REC_TYPE_ENERGY:
+                data = timeseries.data.astype(np.float64)
+                return (data - data[:1]) * conversion_factor(self.unit, "J")
+            if self.rtype == RecType.REC_TYPE_POWER_USAGE:
+                return cumulative_energy(timeseries).data * conversion_factor(self.unit, "W")
+        except ValueError:
+            # Not an energy or power unit
+            pass
+        return None
+
+    def span_stats(self, name: str) -> List[SpanStats]:
+        """
+        Computes statistics per span or interval between consecutive marks of a name, e.g. the peak memory per step
+        of a memory recording or the energy per epoch of a power recording.
+        :param name: The name of the spans or marks.
+        :return: A list containing the statistics per GPU.
+        """
+        markers = self.markers if self.markers is not None else Markers.from_events([])
+        starts, ends, values = markers.intervals(name)
+        return [span_stats(ts, starts, ends, values, name, gpu, self._energy_counter(ts))
+                for gpu, ts in zip(self.gpus, self.timeseries)]
+
+    def compare(self, other: Recording, **kwargs) -> Comparison:
+        """
+        Compares the sample distributions of this (baseline) recording and another recording per GPU.
+        :param other: The recording to be checked against this one.
+        :param kwargs: Thresholds and quantiles, see compare_recordings().
+        :return: The comparison per GPU.
+        """
+        return compare_recordings(self, other, **kwargs)
+
+    def segments(self, gpu: int, penalty: Optional[float] = None, min_size: Optional[int] = None,
+                 max_segments: Optional[int] = None, labels: Optional[Sequence[str]] = None) -> List[Segment]:
+        """
+        Splits the recording of a GPU into phases with a stable mean, e.g. data loading, warmup, steady state, eval.
+        :param gpu: The id of the GPU.
+        :param penalty: The minimum cost reduction for a split, see find_change_points().
+        :param min_size: The minimum number of samples per segment.
+        :param max_segments: An optional maximum number of segments.
+        :param labels: Optional labels of the segments in order.
+        :return: The segments in order.
+        """
+        timeseries = self.timeseries[self.gpus.ids.index(gpu)]
+        return segment_timeseries(timeseries, penalty, min_size, max_segments, labels, gpu=gpu)
+
     def convert(self, divider: Union[int, float], unit: str):
         for ts in self.timeseries:
             ts.apply_to_data(
-                lambda data: data / divider
+                lambda data: np.true_divide(data, divider)
             )
         self.unit = unit
 
+    def convert_to(self, unit: str) -> None:
+        """
+        Converts the recording into another unit of the same quantity. The converted data is a new array, the arrays
+        the recording was created with are left untouched. Prefer converting while recording (see
+        Recorder.convert_to()), which never holds a second copy of the data.
+        :param unit: The symbol of the unit, see gpulink.units.UNITS.
+        """
+        factor = conversion_factor(self.unit, unit)
+        if factor != 1.0:
+            for ts in self.timeseries:
+                ts.apply_to_data(lambda data: np.multiply(data, factor))
+        self.unit = unit
+
+    @property
+    def unit_info(self) -> Optional[Unit]:
+        """
+        The machine-readable description of the unit if it is known.
+        """
+        return UNITS.get(self.unit)
+
     def __str__(self):
         data_table = self._create_data_table()
         duration = f"{self._get_duration():.3f}"
-        sampling_rate = f"{self.timeseries[0].data.size / max(self._get_duration(), sys.float_info.epsilon):.3f}"
-        return f"{data_table}\n" \
-               f"{'Duration:':25}{duration} [s]\n" \
-               f"{'Sampling rate:':25}{sampling_rate} [Hz]"
+        summary = f"{data_table}\n" \
+                  f"{'Duration:':25}{duration} [s]\n" \
+                  f"{'Achieved rate:':25}{self.get_achieved_rate():.3f} [Hz]"
+        if self.stats:
+            summary += f"\n{'Missed ticks:':25}{self.stats.missed_ticks}\n" \
+                       f"{'Query latency:':25}p50 {self.stats.query.quantile(0.5) * 1e3:.3f} [ms], " \
+                       f"p99 {self.stats.query.quantile(0.99) * 1e3:.3f} [ms]"
+            if self.stats.interval:
+                summary += f"\n{'Loop jitter:':25}p99 {self.stats.jitter.quantile(0.99) * 1e3:.3f} [ms]"
+        return summary
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from tabulate import tabulate
+
+# The bucket edges [s] of all histograms: 0 and log-spaced from 1 µs to 10 s, the last bucket collects everything above
+HISTOGRAM_EDGES = np.concatenate([[0.0], np.logspace(-6, 1, 57)])
+# The number of values buffered before they are sorted into the buckets at once
+_PENDING_SIZE = 1024
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram of durations [s].
+    Adding a value only stores it in a preallocated buffer, full buffers are sorted into the buckets in a single
+    vectorized pass, which keeps the cost per value at a few hundred nanoseconds.
+    """
+
+    def __init__(self, edges: np.ndarray = HISTOGRAM_EDGES):
+        self.edges = edges
+        self._counts = np.zeros(edges.size, dtype=np.int64)
+        self._pending = np.empty(_PENDING_SIZE, dtype=np.float64)
+        self._num_pending = 0
+        self._sum = 0.0
+        self._max = 0.0
+
+    def add(self, value: float) -> None:
+        self._pending[self._num_pending] = value
+        self._num_pending += 1
+        if self._num_pending == _PENDING_SIZE:
+            self._fold()
+
+    def _fold(self) -> None:
+        pending = self._pending[:self._num_pending]
+        self._counts += self._bucket_counts(pending)
+        self._sum += float(pending.sum())
+        self._max = max(self._max, float(pending.max(initial=0.0)))
+        self._num_pending = 0
+
+    def _bucket_counts(self, values: np.ndarray) -> np.ndarray:
+        buckets = np.searchsorted(self.edges, values, side="right") - 1
+        return np.bincount(np.clip(buckets, 0, None), minlength=self.edges.size)
+
+    def snapshot(self) -> HistogramSnapshot:
+        """
+        Copies the current state, which may be taken while values are added from another thread.
+        """
+        pending = self._pending[:self._num_pending].copy()
+        return HistogramSnapshot(
+            edges=self.edges,
+            counts=self._counts + self._bucket_counts(pending),
+            total=self._sum + float(pending.sum()),
+            maximum=max(self._max, float(pending.max(initial=0.0))))
+
+
+@dataclass
+class HistogramSnapshot:
+    edges: np.ndarray  # The lower edge [s] of each bucket
+    counts: np.ndarray
+    total: float  # The sum of all values [s]
+    maximum: float  # [s]
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile as the upper edge of the bucket containing it.
+        :param q: The quantile in [0, 1].
+        :return: The estimated quantile [s].
+        """
+        if not self.count:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.counts), q * self.count, side="left"))
+        return float(self.edges[bucket + 1]) if bucket + 1 < self.edges.size else self.maximum
+
+
+class RecorderInstrumentation:
+    """
+    Tracks the timing of the sampling loop of a Recorder.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval
+        self.query = Histogram()
+        self.callback = Histogram()
+        self.store = Histogram()
+        self.period = Histogram()
+        self.jitter = Histogram()
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.first_tick: Optional[float] = None
+        self.last_tick: Optional[float] = None
+        self._last_busy = 0.0
+
+    def tick(self, start: float, query: float, callback: float, store: float) -> None:
+        """
+        Records a single iteration of the sampling loop.
+        :param start: The start of the iteration as time.perf_counter() [s].
+        :param query: The duration [s] of the device query.
+        :param callback: The duration [s] of the callback.
+        :param store: The duration [s] of storing the samples.
+        """
+        if self.last_tick is not None:
+            period = start - self.last_tick
+            self.period.add(period)
+            if self.interval:
+                # The loop waits for the interval after each tick, so the period includes the work of the previous tick
+                self.jitter.add(abs(period - self.interval - self._last_busy))
+                self.missed_ticks += max(int(period / self.interval + 1e-6) - 1, 0)
+        else:
+            self.first_tick = start
+        self.last_tick = start
+        self._last_busy = query + callback + store
+        self.ticks += 1
+        self.query.add(query)
+        self.callback.add(callback)
+        self.store.add(store)
+
+    def stats(self) -> RecorderStats:
+        span = (self.last_tick - self.first_tick) if self.ticks > 1 else 0.0
+        return RecorderStats(
+            ticks=self.ticks,
+            missed_ticks=self.missed_ticks,
+            achieved_rate=(self.ticks - 1) / span if span > 0 else 0.0,
+            interval=self.interval,
+            query=self.query.snapshot(),
+            callback=self.callback.snapshot(),
+            store=self.store.snapshot(),
+            period=self.period.snapshot(),
+            jitter=self.jitter.snapshot())
+
+
+@dataclass
+class RecorderStats:
+    """
+    Timing statistics of a Recorder's sampling loop.
+    """
+    ticks: int  # The number of iterations of the sampling loop
+    missed_ticks: int  # The number of intervals without a sample, e.g. due to slow queries
+    achieved_rate: float  # The achieved number of iterations per second [Hz]
+    interval: Optional[float]  # The requested time [s] between two samples
+    query: HistogramSnapshot  # The latency of the device queries
+    callback: HistogramSnapshot  # The latency of the callback
+    store: HistogramSnapshot  # The time needed to store the samples
+    period: HistogramSnapshot  # The time between the start of two iterations
+    jitter: HistogramSnapshot  # The deviation of the period from the requested interval
+
+    def __str__(self):
+        def fmt(seconds: float) -> str:
+            return f"{seconds * 1e3:.3f} ms"
+
+        table = [["", "mean", "p50", "p99", "max"]]
+        for name in ("query", "callback", "store", "period", "jitter"):
+            histogram: HistogramSnapshot = getattr(self, name)
+            if histogram.count:
+                table.append([name, fmt(histogram.mean), fmt(histogram.quantile(0.5)), fmt(histogram.quantile(0.99)),
+                              fmt(histogram.maximum)])
+        requested = f" (requested: {1 / self.interval:.3f} [Hz])" if self.interval else ""
+        return f"{tabulate(table, tablefmt='fancy_grid')}\n" \
+               f"{'Ticks:':25}{self.ticks}\n" \
+               f"{'Missed ticks:':25}{self.missed_ticks}\n" \
+               f"{'Achieved rate:':25}{self.achieved_rate:.3f} [Hz]{requested}"
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Lock
+from typing import List, Optional, Tuple, Iterator, Dict
+
+import numpy as np
+
+from gpulink.clock import Clock, default_clock
+from gpulink.devices.gpu import Gpu
+from gpulink.recording.timeseries import TimeSeries
+
+# The end of an interval started by the last mark of a name, which lasts until the end of the recording
+_OPEN_END = np.iinfo(np.int64).max
+
+# The maximum number of markers buffered, the oldest quarter is dropped once it is reached
+MAX_MARKERS = 100_000
+
+# A marker as (clocks, starts, ends, name, value, span), stamped with each clock attached when it was set
+_Event = Tuple[Tuple[Clock, ...], Tuple[int, ...], Tuple[int, ...], str, float, bool]
+
+
+class _MarkerBuffer:
+    """
+    Collects the markers of all threads while at least one recording is attached.
+    Markers are appended as tuples to a list, which is atomic, so marking only takes a lock to drop old markers.
+    Cursors count all markers ever appended, recordings remember the count when attaching and slice their markers
+    from there. Markers older than the oldest attached cursor are dropped when a recording detaches, and at most
+    MAX_MARKERS are kept, so the buffer stays bounded even if a recording runs forever. Markers are stamped with the
+    timestamp clock of each attached recording's device, usually a single one, so they share the clock of the
+    samples they annotate.
+    """
+
+    def __init__(self, capacity: int = MAX_MARKERS):
+        self._lock = Lock()
+        self._capacity = capacity
+        self._attached: Dict[Clock, int] = {}
+        self._cursors: List[int] = []
+        # Replaced as a whole when a clock is attached or detached, so marking reads it without the lock
+        self.clocks: Tuple[Clock, ...] = ()
+        self._events: List[_Event] = []
+        self._base = 0  # The cursor of the first buffered marker
+
+    def append(self, event: _Event) -> None:
+        self._events.append(event)
+        if len(self._events) >= self._capacity:
+            with self._lock:
+                if len(self._events) >= self._capacity:
+                    self._drop(self._capacity // 4)
+
+    def _drop(self, count: int) -> None:
+        del self._events[:count]
+        self._base += count
+
+    def attach(self, clock: Clock) -> int:
+        with self._lock:
+            self._attached[clock] = self._attached.get(clock, 0) + 1
+            self.clocks = tuple(self._attached)
+            cursor = self._base + len(self._events)
+            self._cursors.append(cursor)
+            return cursor
+
+    def read(self, cursor: int, clock: Clock) -> Markers:
+        with self._lock:
+            events = self._events[max(cursor - self._base, 0):]
+            dropped = max(self._base - cursor, 0)
+        # Spans started before the clock was attached carry no timestamps of it and are skipped
+        markers = Markers.from_events([(starts[clocks.index(clock)], ends[clocks.index(clock)], name, value, span)
+                                       for clocks, starts, ends, name, value, span in events if clock in clocks])
+        markers.dropped = dropped
+        return markers
+
+    def detach(self, cursor: int, clock: Clock) -> Markers:
+        markers = self.read(cursor, clock)
+        with self._lock:
+            self._attached[clock] -= 1
+            if not self._attached[clock]:
+                del self._attached[clock]
+            self.clocks = tuple(self._attached)
+            self._cursors.remove(cursor)
+            # Markers before the oldest attached cursor are not read anymore
+            oldest = min(self._cursors, default=self._base + len(self._events))
+            self._drop(min(max(oldest - self._base, 0), len(self._events)))
+        return markers
+
+
+_buffer = _MarkerBuffer()
+
+
+def attach_markers(clock: Optional[Clock] = None) -> int:
+    """
+    Starts collecting markers for a recording.
+    :param clock: The clock the samples of the recording are stamped with, see DeviceCtx.get_timestamp_clock()
+    (default: default_clock()).
+    :return: The cursor to be passed to read_markers() and detach_markers() together with the same clock.
+    """
+    return _buffer.attach(clock if clock else default_clock())
+
+
+def read_markers(cursor: int, clock: Optional[Clock] = None) -> Markers:
+    """
+    Returns the markers set since a recording was attached, stamped with its clock.
+    """
+    return _buffer.read(cursor, clock if clock else default_clock())
+
+
+def detach_markers(cursor: int, clock: Optional[Clock] = None) -> Markers:
+    """
+    Stops collecting markers for a recording.
+    :return: The markers set since the recording was attached, stamped with its clock.
+    """
+    return _buffer.detach(cursor, clock if clock else default_clock())
+
+
+def mark(name: str, value: Optional[float] = None) -> None:
+    """
+    Marks a point in time of all running recordings, e.g. mark("step", n) at the start of each training step.
+    Consecutive marks of a name delimit intervals, see Recording.span_stats(). Does nothing if nothing is recorded.
+    :param name: The name of the marker.
+    :param value: An optional value, e.g. the step number.
+    """
+    clocks = _buffer.clocks
+    if clocks:
+        timestamps = tuple(clock.now() for clock in clocks)
+        _buffer.append((clocks, timestamps, timestamps, name, np.nan if value is None else value, False))
+
+
+@contextmanager
+def span(name: str, value: Optional[float] = None) -> Iterator[None]:
+    """
+    Marks the time span of a block in all running recordings, e.g. "with span('epoch', n):".
+    :param name: The name of the span.
+    :param value: An optional value, e.g. the epoch number.
+    """
+    clocks = _buffer.clocks
+    starts = tuple(clock.now() for clock in clocks)
+    try:
+        yield
+    finally:
+        if clocks and _buffer.clocks:
+            ends = tuple(clock.now() for clock in clocks)
+            _buffer.append((clocks, starts, ends, name, np.nan if value is None else value, True))
+
+
+@dataclass
+class Markers:
+    """
+    The marks and spans of a recording, stored column-wise in the order they were completed.
+    Timestamps share the clock of the recorded samples [ns].
+    """
+    names: np.ndarray
+    values: np.ndarray  # NaN for markers without a value
+    starts: np.ndarray
+    ends: np.ndarray  # Equal to the start for marks
+    spans: np.ndarray  # True for spans, False for marks
+    dropped: int = 0  # The number of markers dropped from the full buffer before they were read, see MAX_MARKERS
+
+    @classmethod
+    def from_events(cls, events: List[Tuple[int, int, str, float, bool]]) -> Markers:
+        starts, ends, names, values, spans = zip(*events) if events else ((), (), (), (), ())
+        return cls(names=np.array(names, dtype=object),
+                   values=np.array(values, dtype=np.float64),
+                   starts=np.array(starts, dtype=np.int64),
+                   ends=np.array(ends, dtype=np.int64),
+                   spans=np.array(spans, dtype=bool))
+
+    def __len__(self) -> int:
+        return self.starts.size
+
+    def intervals(self, name: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the intervals of a name in chronological order. Spans are used as they are, marks delimit intervals
+        from each mark to the next one, the interval of the last mark lasts until the end of the recording.
+        :param name: The name of the spans or marks.
+        :return: The (starts, ends, values) of the intervals.
+        """
+        selected = self.names == name
+        spans = selected & self.spans
+        marks = selected & ~self.spans
+        mark_starts = self.starts[marks]
+        order = np.argsort(mark_starts, kind="stable")
+        mark_starts = mark_starts[order]
+        mark_ends = np.append(mark_starts[1:], _OPEN_END)
+        starts = np.concatenate([self.starts[spans], mark_starts])
+        ends = np.concatenate([self.ends[spans], mark_ends])
+        values = np.concatenate([self.values[spans], self.values[marks][order]])
+        order = np.argsort(starts, kind="stable")
+        return starts[order], ends[order], values[order]
+
+    def to_dict(self) -> dict:
+        return {"names": self.names.tolist(),
+                "values": [None if np.isnan(value) else value for value in self.values.tolist()],
+                "starts": self.starts.tolist(),
+                "ends": self.ends.tolist(),
+                "spans": self.spans.tolist(),
+                "dropped": self.dropped}
+
+    @classmethod
+    def from_dict(cls, markers: dict) -> Markers:
+        return cls(names=np.array(markers["names"], dtype=object),
+                   values=np.array(markers["values"], dtype=np.float64),
+                   starts=np.array(markers["starts"], dtype=np.int64),
+                   ends=np.array(markers["ends"], dtype=np.int64),
+                   spans=np.array(markers["spans"], dtype=bool),
+                   dropped=markers.get("dropped", 0))
+
+
+@dataclass
+class SpanStats:
+    """
+    The statistics of a recorded property per span (or interval between marks) of a single GPU.
+    Intervals without samples have a count of 0 and NaN statistics.
+    """
+    name: str
+    gpu: Gpu
+    values: np.ndarray  # The values of the markers
+    starts: np.ndarray  # [ns]
+    ends: np.ndarray  # [ns], the end of the last sample for open intervals
+    count: np.ndarray  # The number of samples per span
+    mean: np.ndarray
+    minimum: np.ndarray
+    maximum: np.ndarray  # E.g. the peak memory per step
+    energy: Optional[np.ndarray] = None  # The consumed energy [J] per span for power and energy recordings
+
+    def __len__(self) -> int:
+        return self.starts.size
+
+
+def _reduce_intervals(ufunc: np.ufunc, data: np.ndarray, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+    # reduceat over interleaved (first, last) pairs reduces every interval in a single pass, the padding keeps
+    # 'last' a valid index for intervals ending with the data
+    padded = np.append(data, 0.0)
+    indices = np.column_stack([first, last]).ravel()
+    return ufunc.reduceat(padded, indices)[::2]
+
+
+def span_stats(timeseries: TimeSeries, starts: np.ndarray, ends: np.ndarray, values: np.ndarray, name: str,
+               gpu: Gpu, energy: Optional[np.ndarray] = None) -> SpanStats:
+    """
+    Computes the statistics of a time series for all intervals at once.
+    :param timeseries: The recorded time series.
+    :param starts: The starts of the intervals [ns].
+    :param ends: The ends of the intervals [ns].
+    :param values: The values of the markers.
+    :param name: The name of the markers.
+    :param gpu: The recorded GPU.
+    :param energy: The cumulative energy [J] at each sample, if the consumed energy per interval should be computed.
+    :return: The statistics per interval.
+    """
+    timestamps = timeseries.timestamps
+    data = np.asarray(timeseries.data, dtype=np.float64)
+    first = np.searchsorted(timestamps, starts, side="left")
+    last = np.searchsorted(timestamps, ends, side="right")
+    count = last - first
+    empty = count == 0
+    cumsum = np.concatenate([[0.0], np.cumsum(data)])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (cumsum[last] - cumsum[first]) / count
+    minimum = np.where(empty, np.nan, _reduce_intervals(np.minimum, data, first, last))
+    maximum = np.where(empty, np.nan, _reduce_intervals(np.maximum, data, first, last))
+    if timestamps.size:
+        ends = np.minimum(ends, timestamps[-1])
+
+    if energy is not None and timestamps.size:
+        consumed = np.interp(ends, timestamps, energy) - np.interp(starts, timestamps, energy)
+        energy = np.where(ends > starts, consumed, 0.0)
+
+    return SpanStats(name=name, gpu=gpu, values=values, starts=starts, ends=ends, count=count, mean=mean,
+                     minimum=minimum, maximum=maximum, energy=energy if timestamps.size else None)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import methodcaller, attrgetter
+from typing import Callable, Dict, Optional, Tuple, Any, List
+
+from gpulink.devices.nvml_defines import TemperatureSensorType, ClockType, PcieUtilCounter, SamplingType
+from gpulink.recording.energy import cumulative_energy, since_first
+from gpulink.recording.gpu_recording import RecType
+from gpulink.recording.timeseries import TimeSeries
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    Declares how a property is recorded: the DeviceCtx query returning one result per GPU and the field of the
+    results holding the value. Metrics are compiled once per set of GPUs into a query and an extractor, which are
+    implemented in C (operator.methodcaller and operator.attrgetter). This removes one Python frame per query and one
+    per GPU result compared to lambdas. The query itself still runs three Python frames: the DeviceCtx method, the
+    device method and the device's _execute.
+    The scale is applied by the Recorder to all values of a query at once.
+    """
+    rtype: RecType
+    unit: str
+    query: str  # The name of the DeviceCtx method, e.g. 'get_memory_info'
+    field: str  # The field of the query results holding the value, e.g. 'used'
+    args: Tuple[Any, ...] = ()  # Positional arguments of the query besides the GPUs
+    scale: float = 1.0  # A factor applied to each value, the unit is the one after scaling
+    sampling_type: Optional[SamplingType] = None  # The driver sample buffer, if the metric can be recorded buffered
+    transform: Optional[Callable[[TimeSeries], TimeSeries]] = None  # Applied to the recorded time series
+    fallback: Optional[Metric] = None  # Recorded instead if the device does not support the query
+
+    def compile(self, gpus: Optional[List[int]] = None) -> Tuple[Callable, Callable]:
+        """
+        Resolves the metric for a set of GPUs.
+        :param gpus: The GPU ids to be queried.
+        :return: The query taking a DeviceCtx and the extractor taking a single result.
+        """
+        return _compile(self, tuple(gpus) if gpus else None)
+
+
+@lru_cache(maxsize=None)
+def _compile(metric: Metric, gpus: Optional[Tuple[int, ...]]) -> Tuple[Callable, Callable]:
+    return methodcaller(metric.query, *metric.args, gpus=list(gpus) if gpus else None), attrgetter(metric.field)
+
+
+_metrics: Dict[RecType, Metric] = {}
+
+
+def register_metric(metric: Metric, replace: bool = False) -> None:
+    """
+    Registers how a property is recorded, Recorder.create_recorder() picks it up by its RecType.
+    :param metric: The metric to be registered.
+    :param replace: If true, a metric already registered for the RecType is replaced.
+    """
+    if metric.rtype in _metrics and not replace:
+        raise ValueError(f"A metric for '{metric.rtype.value}' is already registered")
+    _metrics[metric.rtype] = metric
+
+
+def get_metric(rtype: RecType) -> Metric:
+    """
+    Returns the registered metric of a property.
+    """
+    if rtype not in _metrics:
+        raise ValueError(f"No metric registered for '{rtype.value}'")
+    return _metrics[rtype]
+
+
+for _metric in (
+        Metric(RecType.REC_TYPE_MEMORY, "Byte", "get_memory_info", "used"),
+        Metric(RecType.REC_TYPE_TEMPERATURE, "°C", "get_temperature", "value", args=(TemperatureSensorType.GPU,)),
+        Metric(RecType.REC_TYPE_FAN_SPEED, "%", "get_fan_speed", "value"),
+        Metric(RecType.REC_TYPE_POWER_USAGE, "mW", "get_power_usage", "value",
+               sampling_type=SamplingType.TOTAL_POWER_SAMPLES),
+        # The energy counter is not available on all devices, the power usage is integrated instead. Both report the
+        # energy consumed since the first sample
+        Metric(RecType.REC_TYPE_ENERGY, "mJ", "get_energy_consumption", "value", transform=since_first,
+               fallback=Metric(RecType.REC_TYPE_ENERGY, "mJ", "get_power_usage", "value", transform=cumulative_energy)),
+        Metric(RecType.REC_TYPE_UTILIZATION_GPU, "%", "get_utilization", "gpu",
+               sampling_type=SamplingType.GPU_UTILIZATION_SAMPLES),
+        Metric(RecType.REC_TYPE_UTILIZATION_MEMORY, "%", "get_utilization", "memory",
+               sampling_type=SamplingType.MEMORY_UTILIZATION_SAMPLES),
+        Metric(RecType.REC_TYPE_PCIE_TX, "KB/s", "get_pcie_throughput", "value",
+               args=(PcieUtilCounter.PCIE_UTIL_TX_BYTES,)),
+        Metric(RecType.REC_TYPE_PCIE_RX, "KB/s", "get_pcie_throughput", "value",
+               args=(PcieUtilCounter.PCIE_UTIL_RX_BYTES,)),
+        Metric(RecType.REC_TYPE_THROTTLE_REASONS, "Bitmask", "get_throttle_reasons", "value"),
+        Metric(RecType.REC_TYPE_CLOCK_GRAPHICS, "MHz", "get_clock", "value", args=(ClockType.CLOCK_GRAPHICS,)),
+        Metric(RecType.REC_TYPE_CLOCK_SM, "MHz", "get_clock", "value", args=(ClockType.CLOCK_SM,)),
+        Metric(RecType.REC_TYPE_CLOCK_MEM, "MHz", "get_clock", "value", args=(ClockType.CLOCK_MEM,)),
+        Metric(RecType.REC_TYPE_CLOCK_VIDEO, "MHz", "get_clock", "value", args=(ClockType.CLOCK_VIDEO,)),
+):
+    register_metric(_metric)
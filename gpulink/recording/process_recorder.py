@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional, Dict
+
+import numpy as np
+from tabulate import tabulate
+
+from gpulink.devices.devicectx import DeviceCtx
+from gpulink.devices.gpu import GpuSet
+from gpulink.recording.timeseries import TimeSeries
+from gpulink.threading.stoppable_thread import StoppableThread
+
+# Marks a missing value within the integer columns (e.g. no utilization sample available)
+NOT_AVAILABLE = -1
+
+
+@dataclass
+class ProcessRecording:
+    """
+    A container for storing a per-process gpu recording in a columnar layout.
+    Each row of the columns represents a single process observed on a single GPU at a single point in time.
+    """
+    gpus: GpuSet  # The recorded Gpu devices
+    timestamps: np.ndarray  # int64
+    gpu_idx: np.ndarray  # int32
+    pid: np.ndarray  # int64
+    used_memory: np.ndarray  # int64 [Bytes], NOT_AVAILABLE if unknown
+    sm_util: np.ndarray  # int16 [%], NOT_AVAILABLE if unknown
+    mem_util: np.ndarray  # int16 [%], NOT_AVAILABLE if unknown
+    process_names: Dict[int, str]
+    name: str
+
+    def _select(self, gpu: int, pid: int) -> np.ndarray:
+        return (self.gpu_idx == gpu) & (self.pid == pid)
+
+    @property
+    def pids(self) -> List[int]:
+        return [int(pid) for pid in np.unique(self.pid)]
+
+    def get_pids(self, gpu: int) -> List[int]:
+        """
+        Returns the ids of all processes observed on a GPU.
+        """
+        return [int(pid) for pid in np.unique(self.pid[self.gpu_idx == gpu])]
+
+    def get_memory(self, gpu: int, pid: int) -> TimeSeries:
+        """
+        Returns the used memory [Bytes] of a single process on a single GPU.
+        """
+        mask = self._select(gpu, pid)
+        return TimeSeries(timestamps=self.timestamps[mask], data=self.used_memory[mask])
+
+    def get_sm_util(self, gpu: int, pid: int) -> TimeSeries:
+        """
+        Returns the SM utilization [%] of a single process on a single GPU.
+        """
+        mask = self._select(gpu, pid)
+        return TimeSeries(timestamps=self.timestamps[mask], data=self.sm_util[mask])
+
+    def get_mem_util(self, gpu: int, pid: int) -> TimeSeries:
+        """
+        Returns the memory utilization [%] of a single process on a single GPU.
+        """
+        mask = self._select(gpu, pid)
+        return TimeSeries(timestamps=self.timestamps[mask], data=self.mem_util[mask])
+
+    def _create_data_table(self):
+        table = [["GPU", "Name", "PID", "Process", "Memory [Byte]", "SM Util. [%]"]]
+        for gpu in self.gpus:
+            for pid in self.get_pids(gpu.id):
+                mask = self._select(gpu.id, pid)
+                memory = self.used_memory[mask]
+                util = self.sm_util[mask]
+                memory = memory[memory != NOT_AVAILABLE]
+                util = util[util != NOT_AVAILABLE]
+                table.append([
+                    gpu.id,
+                    gpu.name,
+                    pid,
+                    self.process_names.get(pid, "N/A"),
+                    f"maximum: {np.max(memory)}" if memory.size else "N/A",
+                    f"mean: {np.mean(util):.1f}" if util.size else "N/A"
+                ])
+        return tabulate(table, tablefmt='fancy_grid')
+
+    def __str__(self):
+        return f"{self.name}\n{self._create_data_table()}"
+
+
+class _ProcessColumns:
+    def __init__(self):
+        self.timestamps = array("q")
+        self.gpu_idx = array("i")
+        self.pid = array("q")
+        self.used_memory = array("q")
+        self.sm_util = array("h")
+        self.mem_util = array("h")
+        self.process_names: Dict[int, str] = {}
+
+
+class ProcessRecorder(StoppableThread):
+    """
+    Records the memory usage and utilization of all compute processes running on the GPUs.
+    """
+
+    def __init__(
+            self,
+            ctx: DeviceCtx,
+            gpus: Optional[List[int]] = None,
+            name: Optional[str] = None,
+            interval: Optional[float] = None
+    ):
+        super().__init__()
+        self._ctx = ctx
+        self._gpus = gpus if gpus else ctx.gpus.ids
+        self._name = name if name else "GPULink Process Recording"
+        self._interval = interval
+        self._columns = _ProcessColumns()
+
+    def __enter__(self):
+        self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop(auto_join=True)
+
+    def _fetch_and_store(self):
+        columns = self._columns
+        for result in self._ctx.get_processes(self._gpus):
+            for proc in result.processes:
+                columns.timestamps.append(result.timestamp)
+                columns.gpu_idx.append(result.gpu_idx)
+                columns.pid.append(proc.pid)
+                columns.used_memory.append(NOT_AVAILABLE if proc.used_memory is None else proc.used_memory)
+                columns.sm_util.append(NOT_AVAILABLE if proc.sm_util is None else proc.sm_util)
+                columns.mem_util.append(NOT_AVAILABLE if proc.mem_util is None else proc.mem_util)
+                if proc.pid not in columns.process_names:
+                    columns.process_names[proc.pid] = proc.name
+
+    def run(self):
+        while not self.should_stop:
+            self._fetch_and_store()
+            if self._interval:
+                self.wait(self._interval)
+
+    def get_recording(self) -> ProcessRecording:
+        columns = self._columns
+        return ProcessRecording(
+            gpus=GpuSet([self._ctx.gpus[idx] for idx in self._gpus]),
+            timestamps=np.array(columns.timestamps, dtype=np.int64),
+            gpu_idx=np.array(columns.gpu_idx, dtype=np.int32),
+            pid=np.array(columns.pid, dtype=np.int64),
+            used_memory=np.array(columns.used_memory, dtype=np.int64),
+            sm_util=np.array(columns.sm_util, dtype=np.int16),
+            mem_util=np.array(columns.mem_util, dtype=np.int16),
+            process_names=dict(columns.process_names),
+            name=self._name
+        )
@@ -1,21 +1,45 @@
+import atexit
+from contextlib import nullcontext
 from dataclasses import dataclass
 from functools import wraps
-from typing import List, Callable, Tuple, Union, Optional, Any
+from threading import Event, Lock
+from time import monotonic, perf_counter
+from typing import List, Callable, Tuple, Union, Optional, Any, Dict, Hashable, Type, Iterator
 
 import numpy as np
 
 from gpulink import DeviceCtx
+from gpulink.devices.base_device import BaseDevice
 from gpulink.devices.gpu import GpuSet
-from gpulink.devices.nvml_defines import TemperatureSensorType, ClockType
+from gpulink.devices.nvml_defines import ClockType, PcieUtilCounter, SamplingType
 from gpulink.devices.nvml_device import LocalNvmlGpu
 from gpulink.devices.query import QueryResult
+from gpulink.recording.energy import counter_difference
 from gpulink.recording.gpu_recording import Recording, RecType
+from gpulink.recording.instrumentation import RecorderInstrumentation, RecorderStats
+from gpulink.recording.markers import Markers, attach_markers, read_markers, detach_markers
+from gpulink.recording.metrics import Metric, get_metric
+from gpulink.recording.rollup import Rollup, DEFAULT_TIERS, RAW_WINDOW
 from gpulink.recording.timeseries import TimeSeries
 from gpulink.threading.stoppable_thread import StoppableThread
+from gpulink.units import conversion_factor
 
 Callback = Optional[Callable[[List, List[int]], None]]
 CMD = Callable[[DeviceCtx], List[QueryResult]]
 ResFilter = Callable[[QueryResult], Union[int, float, str]]
+Transform = Optional[Callable[[TimeSeries], TimeSeries]]
+
+# The default time [s] between two drains of the driver sample buffer
+DRAIN_INTERVAL = 0.5
+
+# The structured dtype of the sample batches yielded by Recorder.stream()
+SAMPLE_DTYPE = np.dtype([("gpu_idx", np.int32), ("timestamp", np.int64), ("value", np.float64)])
+
+# The time [s] a stream waits for new samples before checking again
+STREAM_POLL = 0.05
+
+# The time [s] an idle shared sampler waits before checking whether it should stop
+SHARED_IDLE_POLL = 0.5
 
 
 @dataclass
@@ -28,6 +52,18 @@ class _Recording:
         self._timestamps.append(timestamp)
         self._data.append(data)
 
+    def add_records(self, timestamps: List, data: List):
+        self._timestamps.extend(timestamps)
+        self._data.extend(data)
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    def since(self, index: int) -> Tuple[List, List]:
+        # The recording thread appends timestamps before data, so only complete records are returned
+        end = min(len(self._timestamps), len(self._data))
+        return self._timestamps[index:end], self._data[index:end]
+
     def to_timeseries(self) -> TimeSeries:
         return TimeSeries(
             timestamps=np.array(self._timestamps),
@@ -46,7 +82,10 @@ class Recorder(StoppableThread):
             runit: str,
             gpus: Optional[List[int]] = None,
             name: Optional[str] = None,
-            callback: Callback = None
+            callback: Callback = None,
+            interval: Optional[float] = None,
+            transform: Transform = None,
+            scale: float = 1.0
     ):
         super().__init__()
         self._cmd = cmd
@@ -57,7 +96,17 @@ class Recorder(StoppableThread):
         self._runit = runit
         self._name = name if name else "GPULink Recording"
         self._callback = callback
+        self._interval = interval
+        self._transform = transform
+        self._scale = scale
         self._recordings = [_Recording() for _ in self._gpus]
+        self._instrumentation = RecorderInstrumentation(interval)
+        self._clock = ctx.get_timestamp_clock()
+        self._clock_anchor = self._clock.anchor()
+        self._marker_cursor: Optional[int] = None
+        self._markers: Optional[Markers] = None
+        if callable(getattr(callback, "bind", None)):
+            callback.bind(self.gpus.ids)
 
     def __enter__(self):
         self.start()
@@ -65,96 +114,288 @@ class Recorder(StoppableThread):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.stop(auto_join=True)
 
+    def start(self) -> None:
+        # Markers are collected from the start on, so marks set right after start() are never lost
+        self._marker_cursor = attach_markers(self._clock)
+        super().start()
+
+    def stop(self, auto_join=True) -> None:
+        if self._marker_cursor is not None:
+            self._markers = detach_markers(self._marker_cursor, self._clock)
+            self._marker_cursor = None
+        super().stop(auto_join)
+
+    def enable_rollups(self, tiers: Tuple[Tuple[float, int], ...] = DEFAULT_TIERS,
+                       raw_window: float = RAW_WINDOW) -> "Recorder":
+        """
+        Aggregates the samples into time-bucketed rollups and keeps raw samples only for a recent window, so the
+        memory of long-running recordings stays bounded. Must be called before the recording is started.
+        Afterwards get_recording() only contains the raw samples still kept, use get_rollup() for the full range.
+        :param tiers: The rollup tiers as (bucket width [s], number of buckets kept).
+        :param raw_window: The time [s] raw samples are kept for.
+        :return: The recorder itself.
+        """
+        if self.is_alive():
+            raise RuntimeError("Rollups must be enabled before the recording is started")
+        self._recordings = [Rollup(tiers, raw_window) for _ in self._gpus]
+        return self
+
+    def convert_to(self, unit: str) -> "Recorder":
+        """
+        Converts the samples into another unit of the same quantity when they are taken, e.g. 'MB' for memory
+        recordings, so recordings never need to be converted afterwards. Must be called before the recording is
+        started. Samples are stored with the type returned by the device, i.e. integers, unless converted.
+        :param unit: The symbol of the unit, see gpulink.units.UNITS.
+        :return: The recorder itself.
+        """
+        if self.is_alive():
+            raise RuntimeError("The unit must be set before the recording is started")
+        self._scale *= conversion_factor(self._runit, unit)
+        self._runit = unit
+        return self
+
+    def get_rollup(self, gpu: int) -> Rollup:
+        """
+        Returns the rollups of a GPU for range queries while the recording is running.
+        :param gpu: The id of the GPU.
+        :return: The rollups of the GPU.
+        """
+        recording = self._recordings[self._gpus.index(gpu)]
+        if not isinstance(recording, Rollup):
+            raise RuntimeError("Rollups are not enabled, call enable_rollups() before starting the recording")
+        return recording
+
     def _get_record(self) -> Tuple[List, List[int]]:
-        data = []
-        timestamps = []
-        for result in self._cmd(self._ctx):
-            data.append(self._filter(result))
-            timestamps.append(result.timestamp)
-        return timestamps, data
+        results = self._cmd(self._ctx)
+        data = list(map(self._filter, results))
+        if self._scale != 1.0:
+            data = [value * self._scale for value in data]
+        return [result.timestamp for result in results], data
 
     def _fetch_and_store(self):
+        start = perf_counter()
         timestamps, data = self._get_record()
+        queried = perf_counter()
         if self._callback:
             self._callback(timestamps, data)
+        called = perf_counter()
         for idx, record in enumerate(zip(timestamps, data)):
             self._recordings[idx].add_record(record[0], record[1])
+        self._instrumentation.tick(start, queried - start, called - queried, perf_counter() - called)
+
+    def stats(self) -> RecorderStats:
+        """
+        Returns the timing statistics of the sampling loop: histograms of the query, callback and storage latency,
+        of the loop period and of its jitter, the number of missed ticks and the achieved rate.
+        Can be called while the recording is running.
+        """
+        return self._instrumentation.stats()
 
     def run(self):
         while not self.should_stop:
             self._fetch_and_store()
+            if self._interval:
+                self.wait(self._interval)
+
+    def read_new(self, cursors: List[int]) -> List[Tuple[List, List]]:
+        """
+        Reads the records added since the given positions while the recording is running.
+        Only the new records are copied, so repeated reads stay cheap regardless of the recording length.
+        :param cursors: The number of records already read per recorded GPU.
+        :return: A list containing the new (timestamps, data) per recorded GPU.
+        """
+        return [recording.since(cursor) for recording, cursor in zip(self._recordings, cursors)]
+
+    def _read_batch(self, cursors: List[int]) -> np.ndarray:
+        chunks = []
+        for idx, (timestamps, data) in enumerate(self.read_new(cursors)):
+            cursors[idx] += len(timestamps)
+            chunk = np.empty(len(timestamps), dtype=SAMPLE_DTYPE)
+            chunk["gpu_idx"] = self._gpus[idx]
+            chunk["timestamp"] = timestamps
+            chunk["value"] = data
+            chunks.append(chunk)
+        samples = np.concatenate(chunks) if chunks else np.empty(0, dtype=SAMPLE_DTYPE)
+        return samples[np.argsort(samples["timestamp"], kind="stable")]
+
+    def stream(self, batch: int = 1024, flush_interval: Optional[float] = None) -> Iterator[np.ndarray]:
+        """
+        Yields the recorded samples incrementally while the recording is running.
+        Each batch is a structured array of SAMPLE_DTYPE (gpu_idx, timestamp, value) ordered by timestamp. Only
+        the samples not yet yielded are copied, so the memory held by the stream is bounded by the batch size.
+        The stream ends once the recorder has stopped and all of its samples were yielded.
+        Transforms (e.g. the energy fallback of create_energy_recorder) are not applied to streamed samples.
+        :param batch: The number of samples per batch. Only the last batch may be smaller.
+        :param flush_interval: An optional time [s] after which pending samples are yielded even if the batch
+        is not full yet.
+        :return: An iterator over sample batches.
+        """
+        cursors = [0 for _ in self._gpus]
+        pending = np.empty(0, dtype=SAMPLE_DTYPE)
+        pending_since = None
+        while True:
+            running = self.is_alive()
+            samples = self._read_batch(cursors)
+            if samples.size:
+                pending = np.concatenate([pending, samples])
+                pending_since = pending_since if pending_since is not None else monotonic()
+            while pending.size >= batch:
+                yield pending[:batch]
+                pending = pending[batch:]
+                pending_since = monotonic() if pending.size else None
+            flush = flush_interval is not None and pending_since is not None and \
+                monotonic() - pending_since >= flush_interval
+            if pending.size and (flush or not running):
+                yield pending
+                pending = np.empty(0, dtype=SAMPLE_DTYPE)
+                pending_since = None
+            if not running:
+                return
+            self.join(STREAM_POLL)
+
+    @property
+    def gpus(self) -> GpuSet:
+        return GpuSet([self._ctx.gpus[idx] for idx in self._gpus])
+
+    @property
+    def rtype(self) -> RecType:
+        return self._rtype
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def unit(self) -> str:
+        return self._runit
 
     def get_recording(self) -> Recording:
+        markers = self._markers
+        if markers is None and self._marker_cursor is not None:
+            markers = read_markers(self._marker_cursor, self._clock)
+        return self._to_recording([r.to_timeseries() for r in self._recordings], self._name, self.stats(), markers)
+
+    def _to_recording(self, timeseries: List[TimeSeries], name: str, stats: Optional[RecorderStats] = None,
+                      markers: Optional[Markers] = None) -> Recording:
         return Recording(
-            gpus=GpuSet([self._ctx.gpus[idx] for idx in self._gpus]),
-            timeseries=[r.to_timeseries() for r in self._recordings],
+            gpus=self.gpus,
+            timeseries=[self._transform(ts) if self._transform else ts for ts in timeseries],
             rtype=self._rtype,
-            name=self._name,
-            unit=self._runit)
+            name=name,
+            unit=self._runit,
+            stats=stats,
+            markers=markers,
+            clock=self._clock_anchor)
 
     @classmethod
-    def create_memory_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
-                               callback: Callback = None):
-
-        return cls(
-            cmd=lambda c: c.get_memory_info(gpus),
-            res_filter=lambda res: res.used,
+    def create_metric_recorder(cls, ctx: DeviceCtx, metric: Metric, gpus: Optional[List[int]] = None,
+                               name: Optional[str] = None, callback: Callback = None,
+                               interval: Optional[float] = None, unit: Optional[str] = None):
+        """
+        Creates a recorder for a metric, see register_metric().
+        The fallback of the metric is recorded if the device does not support its query.
+        :param unit: An optional unit the samples are converted to when they are taken, see convert_to().
+        """
+        if metric.fallback is not None:
+            # The probe is not stored, samples (and the baseline of counters) are only taken once recording starts
+            try:
+                getattr(ctx, metric.query)(*metric.args, gpus=gpus)
+            except NotImplementedError:
+                return cls.create_metric_recorder(ctx, metric.fallback, gpus, name, callback, interval, unit)
+
+        cmd, res_filter = metric.compile(gpus)
+        recorder = cls(
+            cmd=cmd,
+            res_filter=res_filter,
             ctx=ctx,
             gpus=gpus,
-            rtype=RecType.REC_TYPE_MEMORY,
-            runit="Byte",
+            rtype=metric.rtype,
+            runit=metric.unit,
             name=name,
-            callback=callback
+            callback=callback,
+            interval=interval,
+            transform=metric.transform,
+            scale=metric.scale
         )
+        return recorder.convert_to(unit) if unit else recorder
 
     @classmethod
-    def create_temperature_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
-                                    callback: Callback = None):
+    def create_memory_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
+                               callback: Callback = None, interval: Optional[float] = None):
+        return cls.create_metric_recorder(ctx, get_metric(RecType.REC_TYPE_MEMORY), gpus, name, callback, interval)
 
-        return cls(
-            cmd=lambda c: c.get_temperature(sensor_type=TemperatureSensorType.GPU, gpus=gpus),
-            res_filter=lambda res: res.value,
-            ctx=ctx,
-            gpus=gpus,
-            rtype=RecType.REC_TYPE_TEMPERATURE,
-            runit="°C",
-            name=name,
-            callback=callback
-        )
+    @classmethod
+    def create_temperature_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
+                                    callback: Callback = None, interval: Optional[float] = None):
+        return cls.create_metric_recorder(ctx, get_metric(RecType.REC_TYPE_TEMPERATURE), gpus, name, callback,
+                                          interval)
 
     @classmethod
     def create_fan_speed_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
-                                  callback: Callback = None):
-
-        return cls(
-            cmd=lambda c: c.get_fan_speed(gpus=gpus),
-            res_filter=lambda res: res.value,
-            ctx=ctx,
-            gpus=gpus,
-            rtype=RecType.REC_TYPE_FAN_SPEED,
-            runit="%",
-            name=name,
-            callback=callback
-        )
+                                  callback: Callback = None, interval: Optional[float] = None):
+        return cls.create_metric_recorder(ctx, get_metric(RecType.REC_TYPE_FAN_SPEED), gpus, name, callback, interval)
 
     @classmethod
     def create_power_usage_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
-                                    callback: Callback = None):
+                                    callback: Callback = None, interval: Optional[float] = None,
+                                    buffered: bool = False):
+        return cls.create_recorder(ctx, RecType.REC_TYPE_POWER_USAGE, gpus, name, callback, interval, buffered)
 
-        return cls(
-            cmd=lambda c: c.get_power_usage(gpus=gpus),
-            res_filter=lambda res: res.value,
-            ctx=ctx,
-            gpus=gpus,
-            rtype=RecType.REC_TYPE_POWER_USAGE,
-            runit="mW",
-            name=name,
-            callback=callback
-        )
+    @classmethod
+    def create_energy_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
+                               callback: Callback = None, interval: Optional[float] = None):
+        """
+        Creates a recorder for the energy [mJ] consumed since the recording was started.
+        The energy counter of the device is used if available, rebased onto its first sample. Otherwise, the power
+        usage is recorded and integrated using the trapezoidal rule once the recording is fetched.
+        """
+        return cls.create_metric_recorder(ctx, get_metric(RecType.REC_TYPE_ENERGY), gpus, name, callback, interval)
+
+    @classmethod
+    def create_gpu_utilization_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None,
+                                        name: Optional[str] = None, callback: Callback = None,
+                                        interval: Optional[float] = None, buffered: bool = False):
+        return cls.create_recorder(ctx, RecType.REC_TYPE_UTILIZATION_GPU, gpus, name, callback, interval, buffered)
+
+    @classmethod
+    def create_memory_utilization_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None,
+                                           name: Optional[str] = None, callback: Callback = None,
+                                           interval: Optional[float] = None, buffered: bool = False):
+        return cls.create_recorder(ctx, RecType.REC_TYPE_UTILIZATION_MEMORY, gpus, name, callback, interval, buffered)
+
+    @classmethod
+    def create_pcie_throughput_recorder(cls, ctx: DeviceCtx, counter: PcieUtilCounter, gpus: Optional[List[int]] = None,
+                                        name: Optional[str] = None, callback: Callback = None,
+                                        interval: Optional[float] = None):
+
+        counter_map = {
+            PcieUtilCounter.PCIE_UTIL_TX_BYTES: RecType.REC_TYPE_PCIE_TX,
+            PcieUtilCounter.PCIE_UTIL_RX_BYTES: RecType.REC_TYPE_PCIE_RX,
+        }
+        return cls.create_metric_recorder(ctx, get_metric(counter_map[counter]), gpus, name, callback, interval)
+
+    @classmethod
+    def create_pcie_tx_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
+                                callback: Callback = None, interval: Optional[float] = None):
+        return cls.create_pcie_throughput_recorder(ctx, PcieUtilCounter.PCIE_UTIL_TX_BYTES, gpus, name, callback,
+                                                   interval)
+
+    @classmethod
+    def create_pcie_rx_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None, name: Optional[str] = None,
+                                callback: Callback = None, interval: Optional[float] = None):
+        return cls.create_pcie_throughput_recorder(ctx, PcieUtilCounter.PCIE_UTIL_RX_BYTES, gpus, name, callback,
+                                                   interval)
+
+    @classmethod
+    def create_throttle_reasons_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None,
+                                         name: Optional[str] = None, callback: Callback = None,
+                                         interval: Optional[float] = None):
+        return cls.create_metric_recorder(ctx, get_metric(RecType.REC_TYPE_THROTTLE_REASONS), gpus, name, callback,
+                                          interval)
 
     @classmethod
     def create_clock_recorder(cls, ctx: DeviceCtx, clock_type: ClockType, gpus: Optional[List[int]] = None,
-                              name: Optional[str] = None, callback: Callback = None):
+                              name: Optional[str] = None, callback: Callback = None, interval: Optional[float] = None):
 
         clock_type_map = {
             ClockType.CLOCK_SM: RecType.REC_TYPE_CLOCK_SM,
@@ -162,69 +403,321 @@ class Recorder(StoppableThread):
             ClockType.CLOCK_GRAPHICS: RecType.REC_TYPE_CLOCK_GRAPHICS,
             ClockType.CLOCK_VIDEO: RecType.REC_TYPE_CLOCK_VIDEO,
         }
-
-        return cls(
-            cmd=lambda c: c.get_clock(clock_type, gpus=gpus),
-            res_filter=lambda res: res.value,
-            ctx=ctx,
-            gpus=gpus,
-            rtype=clock_type_map[clock_type],
-            runit="MHz",
-            name=name,
-            callback=callback
-        )
+        return cls.create_metric_recorder(ctx, get_metric(clock_type_map[clock_type]), gpus, name, callback, interval)
 
     @classmethod
     def create_graphics_clock_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]] = None,
-                                       name: Optional[str] = None, callback: Callback = None):
-        return cls.create_clock_recorder(ctx, ClockType.CLOCK_GRAPHICS, gpus, name, callback)
+                                       name: Optional[str] = None, callback: Callback = None,
+                                       interval: Optional[float] = None):
+        return cls.create_clock_recorder(ctx, ClockType.CLOCK_GRAPHICS, gpus, name, callback, interval)
 
     @classmethod
     def create_video_clock_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]], name: Optional[str] = None,
-                                    callback: Callback = None):
-        return cls.create_clock_recorder(ctx, ClockType.CLOCK_VIDEO, gpus, name, callback)
+                                    callback: Callback = None, interval: Optional[float] = None):
+        return cls.create_clock_recorder(ctx, ClockType.CLOCK_VIDEO, gpus, name, callback, interval)
 
     @classmethod
     def create_sm_clock_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]], name: Optional[str] = None,
-                                 callback: Callback = None):
-        return cls.create_clock_recorder(ctx, ClockType.CLOCK_SM, gpus, name, callback)
+                                 callback: Callback = None, interval: Optional[float] = None):
+        return cls.create_clock_recorder(ctx, ClockType.CLOCK_SM, gpus, name, callback, interval)
 
     @classmethod
     def create_memory_clock_recorder(cls, ctx: DeviceCtx, gpus: Optional[List[int]], name: Optional[str] = None,
-                                     callback: Callback = None):
-        return cls.create_clock_recorder(ctx, ClockType.CLOCK_MEM, gpus, name, callback)
+                                     callback: Callback = None, interval: Optional[float] = None):
+        return cls.create_clock_recorder(ctx, ClockType.CLOCK_MEM, gpus, name, callback, interval)
+
+    @classmethod
+    def create_buffered_recorder(cls, ctx: DeviceCtx, rtype: RecType, gpus: Optional[List[int]] = None,
+                                 name: Optional[str] = None, callback: Callback = None,
+                                 interval: Optional[float] = None, unit: Optional[str] = None):
+        """
+        Creates a recorder which drains the sample buffer of the driver instead of polling single values.
+        Supported for metrics with a sampling type, i.e. power usage [mW], GPU utilization [%] and memory
+        utilization [%].
+        """
+        metric = get_metric(rtype)
+        if metric.sampling_type is None:
+            raise ValueError(f"Buffered recording is not supported for '{rtype.value}'")
+
+        recorder = DriverBufferRecorder(
+            sampling_type=metric.sampling_type,
+            ctx=ctx,
+            gpus=gpus,
+            rtype=rtype,
+            runit=metric.unit,
+            name=name,
+            callback=callback,
+            interval=interval if interval else DRAIN_INTERVAL,
+            scale=metric.scale
+        )
+        return recorder.convert_to(unit) if unit else recorder
 
     @classmethod
     def create_recorder(cls, ctx: DeviceCtx, rtype: RecType, gpus: Optional[List[int]] = None,
-                        name: Optional[str] = None, callback: Callback = None):
-        if rtype == RecType.REC_TYPE_TEMPERATURE:
-            return Recorder.create_temperature_recorder(ctx, gpus, name, callback)
-        elif rtype == RecType.REC_TYPE_CLOCK_SM:
-            return Recorder.create_sm_clock_recorder(ctx, gpus, name, callback)
-        elif rtype == RecType.REC_TYPE_CLOCK_VIDEO:
-            return Recorder.create_video_clock_recorder(ctx, gpus, name, callback)
-        elif rtype == RecType.REC_TYPE_CLOCK_GRAPHICS:
-            return Recorder.create_graphics_clock_recorder(ctx, gpus, name, callback)
-        elif rtype == RecType.REC_TYPE_CLOCK_MEM:
-            return Recorder.create_memory_clock_recorder(ctx, gpus, name, callback)
-        elif rtype == RecType.REC_TYPE_FAN_SPEED:
-            return Recorder.create_fan_speed_recorder(ctx, gpus, name, callback)
-        elif rtype == RecType.REC_TYPE_MEMORY:
-            return Recorder.create_memory_recorder(ctx, gpus, name, callback)
-        elif rtype == RecType.REC_TYPE_POWER_USAGE:
-            return Recorder.create_power_usage_recorder(ctx, gpus, name, callback)
+                        name: Optional[str] = None, callback: Callback = None, interval: Optional[float] = None,
+                        buffered: bool = False, unit: Optional[str] = None):
+        if buffered:
+            return Recorder.create_buffered_recorder(ctx, rtype, gpus, name, callback, interval, unit)
+        return Recorder.create_metric_recorder(ctx, get_metric(rtype), gpus, name, callback, interval, unit)
+
+
+class DriverBufferRecorder(Recorder):
+    """
+    Records by draining the sample buffer of the driver once per interval.
+    All samples buffered since the last drain are fetched in a single call and deduplicated on their timestamp.
+    The callback is called once per drained sample. GPUs which drained fewer samples are reported as NaN with a
+    timestamp of -1 on the remaining calls.
+    """
+
+    def __init__(
+            self,
+            sampling_type: SamplingType,
+            ctx: DeviceCtx,
+            rtype: RecType,
+            runit: str,
+            gpus: Optional[List[int]] = None,
+            name: Optional[str] = None,
+            callback: Callback = None,
+            interval: float = DRAIN_INTERVAL,
+            scale: float = 1.0
+    ):
+        super().__init__(
+            cmd=lambda c, since: c.get_samples(sampling_type, since, self._gpus),
+            res_filter=lambda res: res.values,
+            ctx=ctx,
+            rtype=rtype,
+            runit=runit,
+            gpus=gpus,
+            name=name,
+            callback=callback,
+            interval=interval,
+            scale=scale
+        )
+        self._last_timestamps = [-1 for _ in self._gpus]
+
+    def _drain(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        batches = []
+        results = self._cmd(self._ctx, max(min(self._last_timestamps), 0))
+        for idx, result in enumerate(results):
+            timestamps = np.asarray(result.timestamps, dtype=np.int64)
+            data = np.asarray(self._filter(result))
+            new = timestamps > self._last_timestamps[idx]
+            timestamps, data = timestamps[new], data[new]
+            if timestamps.size:
+                self._last_timestamps[idx] = int(timestamps.max())
+            if self._scale != 1.0:
+                data = data * self._scale
+            batches.append((timestamps, data))
+        return batches
+
+    def _fetch_and_store(self):
+        start = perf_counter()
+        batches = self._drain()
+        queried = perf_counter()
+        for idx, (timestamps, data) in enumerate(batches):
+            self._recordings[idx].add_records(timestamps.tolist(), data.tolist())
+        stored = perf_counter()
+        if self._callback:
+            for pos in range(max((timestamps.size for timestamps, _ in batches), default=0)):
+                self._callback([int(timestamps[pos]) if pos < timestamps.size else -1 for timestamps, _ in batches],
+                               [float(data[pos]) if pos < data.size else np.nan for _, data in batches])
+        self._instrumentation.tick(start, queried - start, perf_counter() - stored, stored - queried)
+
+    def run(self):
+        # Samples buffered before the recording was started are skipped
+        self._drain()
+        super().run()
+
+
+class _EnergyMeter:
+    """
+    Measures the energy [J] consumed per GPU between entering and leaving the context.
+    Two readings of the energy counter are used if the device exposes it, otherwise the power usage is recorded.
+    """
+
+    def __init__(self, ctx: DeviceCtx, gpus: Optional[List[int]] = None, interval: Optional[float] = None):
+        self._ctx = ctx
+        self._gpus = gpus
+        self._interval = interval
+        self._start: Optional[List[int]] = None
+        self._recorder: Optional[Recorder] = None
+        self.joules: Optional[List[float]] = None
+
+    def _read_counter(self) -> List[int]:
+        return [res.value for res in self._ctx.get_energy_consumption(self._gpus)]
+
+    def __enter__(self):
+        try:
+            self._start = self._read_counter()
+        except NotImplementedError:
+            self._recorder = Recorder.create_power_usage_recorder(self._ctx, self._gpus, interval=self._interval)
+            self._recorder.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._recorder:
+            self._recorder.stop(auto_join=True)
+            self.joules = self._recorder.get_recording().get_energy()
         else:
-            raise ValueError(f"Invalid RecType provided")
+            self.joules = counter_difference(self._start, self._read_counter())
+
+
+class _Window:
+    """
+    The time window of a single call recorded by a SharedSampler.
+    """
+
+    def __init__(self, start: List[int], callback: Callback, marker_cursor: int):
+        self.start = start
+        self.callback = callback
+        self.marker_cursor = marker_cursor
+
+
+class SharedSampler(StoppableThread):
+    """
+    Samples a single property for any number of concurrent or nested calls.
+    Calls attach a window to the sampler and slice their samples out of one shared buffer when detaching, so they
+    neither open a DeviceCtx nor start a thread of their own. The sampler only queries the device while at least one
+    window is attached and drops its buffer as soon as the last window is detached.
+    Use shared_sampler() to obtain the process-wide sampler of a property.
+    """
+
+    def __init__(self, ctx: DeviceCtx, rtype: RecType, gpus: Optional[List[int]] = None,
+                 interval: Optional[float] = None):
+        super().__init__()
+        # Idle samplers must not keep the interpreter alive, they are stopped by release_shared_samplers()
+        self.daemon = True
+        self._ctx = ctx
+        self._recorder = Recorder.create_recorder(ctx, rtype, gpus, interval=interval)
+        self._interval = interval
+        self._lock = Lock()
+        self._active = Event()
+        self._windows: List[_Window] = []
+        self._recordings = [_Recording() for _ in self._recorder.gpus]
+        self._discarded = [0 for _ in self._recordings]
+
+    @property
+    def ctx(self) -> DeviceCtx:
+        return self._ctx
+
+    def _ends(self) -> List[int]:
+        return [discarded + len(recording) for discarded, recording in zip(self._discarded, self._recordings)]
+
+    def attach(self, callback: Callback = None) -> _Window:
+        """
+        Starts a window, the samples taken from now on are part of it.
+        :param callback: An optional callback which is called after each sample taken while the window is attached.
+        :return: The window to be passed to detach().
+        """
+        with self._lock:
+            window = _Window(self._ends(), callback, attach_markers(self._recorder._clock))
+            self._windows.append(window)
+            self._active.set()
+        return window
+
+    def detach(self, window: _Window, name: Optional[str] = None) -> Recording:
+        """
+        Ends a window.
+        :param window: A window returned by attach().
+        :param name: An optional name for the recording.
+        :return: The samples taken while the window was attached.
+        """
+        with self._lock:
+            timeseries = []
+            for start, discarded, recording in zip(window.start, self._discarded, self._recordings):
+                timestamps, data = recording.since(start - discarded)
+                timeseries.append(TimeSeries(timestamps=np.array(timestamps), data=np.array(data)))
+            self._windows.remove(window)
+            if not self._windows:
+                self._active.clear()
+                for idx, recording in enumerate(self._recordings):
+                    self._discarded[idx] += len(recording)
+                    self._recordings[idx] = _Recording()
+        markers = detach_markers(window.marker_cursor, self._recorder._clock)
+        return self._recorder._to_recording(timeseries, name if name else self._recorder.name, markers=markers)
+
+    def run(self):
+        while not self.should_stop:
+            if not self._active.wait(SHARED_IDLE_POLL):
+                continue
+            # The device is queried without holding the lock, so attaching and detaching never wait for it
+            timestamps, data = self._recorder._get_record()
+            with self._lock:
+                if not self._windows:
+                    # The last window was detached during the query
+                    continue
+                for idx, record in enumerate(zip(timestamps, data)):
+                    self._recordings[idx].add_record(record[0], record[1])
+                callbacks = [window.callback for window in self._windows if window.callback]
+            for callback in callbacks:
+                callback(timestamps, data)
+            if self._interval:
+                self.wait(self._interval)
+
+    def stop(self, auto_join=True) -> None:
+        super().stop(auto_join=False)
+        self._active.set()
+        if auto_join:
+            self.join()
+
+
+_shared_lock = Lock()
+_shared_contexts: Dict[Hashable, DeviceCtx] = {}
+_shared_samplers: Dict[Hashable, SharedSampler] = {}
+
+
+def _shared_ctx(ctx_class: Type[BaseDevice]) -> DeviceCtx:
+    if ctx_class not in _shared_contexts:
+        if not _shared_contexts:
+            atexit.register(release_shared_samplers)
+        _shared_contexts[ctx_class] = DeviceCtx(device=ctx_class).__enter__()
+    return _shared_contexts[ctx_class]
+
+
+def shared_sampler(rtype: RecType, ctx_class: Type[BaseDevice] = LocalNvmlGpu, gpus: Optional[List[int]] = None,
+                   interval: Optional[float] = None) -> SharedSampler:
+    """
+    Returns the process-wide sampler of a property, which is created and started on first use.
+    All samplers of a device class share a single DeviceCtx.
+    :param rtype: Specifies the recorded property.
+    :param ctx_class: The GPU device context (default: LocalNvmlGpu).
+    :param gpus: A list of GPU ids to be recorded from.
+    :param interval: An optional time [s] to wait between two samples.
+    :return: The shared sampler.
+    """
+    key = (ctx_class, rtype, tuple(gpus) if gpus else None, interval)
+    with _shared_lock:
+        sampler = _shared_samplers.get(key)
+        if sampler is None:
+            sampler = SharedSampler(_shared_ctx(ctx_class), rtype, gpus, interval)
+            sampler.start()
+            _shared_samplers[key] = sampler
+        return sampler
+
+
+def release_shared_samplers() -> None:
+    """
+    Stops all shared samplers and closes their device contexts.
+    Samplers requested afterwards are created anew.
+    """
+    with _shared_lock:
+        for sampler in _shared_samplers.values():
+            sampler.stop(auto_join=True)
+        for ctx in _shared_contexts.values():
+            ctx.__exit__(None, None, None)
+        _shared_samplers.clear()
+        _shared_contexts.clear()
 
 
 @dataclass
 class RecWrapper:
     value: Any
     recording: Recording
+    energy: Optional[List[float]] = None  # The consumed energy [J] per GPU if requested
 
 
 def record(rtype: RecType, ctx_class=LocalNvmlGpu, gpus: Optional[List[int]] = None, name: str = None,
-           callback: Callback = None):
+           callback: Callback = None, interval: Optional[float] = None, energy: bool = False, shared: bool = False):
     """
     A decorator for recording GPU stats.
     :param rtype: Specifies the recorder type.
@@ -232,19 +725,37 @@ def record(rtype: RecType, ctx_class=LocalNvmlGpu, gpus: Optional[List[int]] = N
     :param gpus: A list of GPU ids to be recorded from.
     :param name: An optional name for the recording. If not provided __name__ of the decorated function is used.
     :param callback: An optional callback which is called after recording a data frame.
+    :param interval: An optional time [s] to wait between two samples. If not provided, samples are taken continuously.
+    :param energy: If true, the energy [J] consumed per GPU during the function call is added to the result.
+    :param shared: If true, the call is recorded by the process-wide shared sampler of the property instead of a
+    DeviceCtx and Recorder of its own. This keeps the overhead of frequently called or nested functions low.
     :return: Wrapped function.
     """
 
     def record_inner(fn):
+        @wraps(fn)
+        def wrapped_shared(*args, **kwargs) -> RecWrapper:
+            sampler = shared_sampler(rtype, ctx_class, gpus, interval)
+            meter = _EnergyMeter(sampler.ctx, gpus, interval) if energy else None
+            with meter if meter else nullcontext():
+                window = sampler.attach(callback)
+                try:
+                    ret_val = fn(*args, **kwargs)
+                finally:
+                    recording = sampler.detach(window, name if name else fn.__name__)
+            return RecWrapper(value=ret_val, recording=recording, energy=meter.joules if meter else None)
+
         @wraps(fn)
         def wrapped(*args, **kwargs) -> RecWrapper:
             with DeviceCtx(device=ctx_class) as ctx:
                 rec_name = name if name else fn.__name__
-                recorder = Recorder.create_recorder(ctx, rtype, gpus, rec_name, callback)
-                with recorder:
+                recorder = Recorder.create_recorder(ctx, rtype, gpus, rec_name, callback, interval)
+                meter = _EnergyMeter(ctx, gpus, interval) if energy else None
+                with meter if meter else nullcontext(), recorder:
                     ret_val = fn(*args, **kwargs)
-                return RecWrapper(value=ret_val, recording=recorder.get_recording())
+                return RecWrapper(value=ret_val, recording=recorder.get_recording(),
+                                  energy=meter.joules if meter else None)
 
-        return wrapped
+        return wrapped_shared if shared else wrapped
 
     return record_inner
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from threading import Lock
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from gpulink.consts import SEC
+from gpulink.recording.timeseries import TimeSeries
+
+# The default rollup tiers as (bucket width [s], number of buckets kept): 1 s for an hour, 1 min for a day and
+# 1 h for a year
+DEFAULT_TIERS = ((1, 3600), (60, 1440), (3600, 8760))
+# The default time [s] raw samples are kept for
+RAW_WINDOW = 60.0
+# The number of raw samples collected before they are aggregated at once
+_FLUSH_SIZE = 1024
+
+
+@dataclass
+class Buckets:
+    """
+    The result of a range query on a Rollup.
+    For raw samples (width 0), data_min, data_max, data_mean and data_last are identical.
+    """
+    width: int  # The bucket width [ns], 0 for raw samples
+    timestamps: np.ndarray  # The start of each bucket
+    data_min: np.ndarray
+    data_max: np.ndarray
+    data_mean: np.ndarray
+    data_last: np.ndarray
+
+    def to_timeseries(self) -> TimeSeries:
+        return TimeSeries(timestamps=self.timestamps, data=self.data_mean)
+
+
+class _Tier:
+    """
+    Aggregates samples into fixed-width buckets and keeps the most recent ones.
+    """
+
+    def __init__(self, width: int, capacity: int):
+        self.width = width
+        self._capacity = capacity
+        self._bucket = np.empty(0, dtype=np.int64)
+        self._min = np.empty(0, dtype=np.float64)
+        self._max = np.empty(0, dtype=np.float64)
+        self._sum = np.empty(0, dtype=np.float64)
+        self._count = np.empty(0, dtype=np.int64)
+        self._last = np.empty(0, dtype=np.float64)
+
+    @property
+    def oldest(self) -> Optional[int]:
+        return int(self._bucket[0]) * self.width if self._bucket.size else None
+
+    def add(self, timestamps: np.ndarray, data: np.ndarray) -> None:
+        buckets = timestamps // self.width
+        unique, starts = np.unique(buckets, return_index=True)
+        ends = np.append(starts[1:], data.size)
+        mins = np.minimum.reduceat(data, starts)
+        maxs = np.maximum.reduceat(data, starts)
+        sums = np.add.reduceat(data, starts)
+        counts = ends - starts
+        lasts = data[ends - 1]
+
+        if self._bucket.size and unique[0] == self._bucket[-1]:
+            # The first bucket continues the last open bucket
+            self._min[-1] = min(self._min[-1], mins[0])
+            self._max[-1] = max(self._max[-1], maxs[0])
+            self._sum[-1] += sums[0]
+            self._count[-1] += counts[0]
+            self._last[-1] = lasts[0]
+            unique, mins, maxs, sums, counts, lasts = unique[1:], mins[1:], maxs[1:], sums[1:], counts[1:], lasts[1:]
+
+        keep = -self._capacity
+        self._bucket = np.concatenate([self._bucket, unique])[keep:]
+        self._min = np.concatenate([self._min, mins])[keep:]
+        self._max = np.concatenate([self._max, maxs])[keep:]
+        self._sum = np.concatenate([self._sum, sums])[keep:]
+        self._count = np.concatenate([self._count, counts])[keep:]
+        self._last = np.concatenate([self._last, lasts])[keep:]
+
+    def query(self, t0: int, t1: int) -> Buckets:
+        selection = slice(np.searchsorted(self._bucket, t0 // self.width, side="left"),
+                          np.searchsorted(self._bucket, t1 // self.width, side="right"))
+        return Buckets(
+            width=self.width,
+            timestamps=self._bucket[selection] * self.width,
+            data_min=self._min[selection].copy(),
+            data_max=self._max[selection].copy(),
+            data_mean=self._sum[selection] / self._count[selection],
+            data_last=self._last[selection].copy())
+
+
+class Rollup:
+    """
+    Keeps the raw samples of a recent time window and aggregates all samples into coarser tiers of fixed-width
+    buckets (min/max/mean/last). Each tier keeps a fixed number of buckets, so the memory stays bounded regardless
+    of how long samples are added.
+
+    It also serves as the per-GPU storage of a Recorder with enabled rollups: add_record(s), since() and
+    to_timeseries() behave like the plain storage, but only cover the raw samples still kept.
+    """
+
+    def __init__(self, tiers: Tuple[Tuple[float, int], ...] = DEFAULT_TIERS, raw_window: float = RAW_WINDOW):
+        self._tiers = [_Tier(int(width * SEC), capacity) for width, capacity in sorted(tiers)]
+        self._raw_window = int(raw_window * SEC)
+        self._lock = Lock()
+        self._timestamps: List[int] = []
+        self._data: List[float] = []
+        self._first: Optional[int] = None  # The timestamp of the first sample ever added
+        self._discarded = 0  # The number of raw samples dropped so far
+        self._aggregated = 0  # The number of kept raw samples already added to the tiers
+
+    def __len__(self) -> int:
+        return self._discarded + len(self._timestamps)
+
+    def add_record(self, timestamp, data):
+        with self._lock:
+            self._timestamps.append(timestamp)
+            self._data.append(data)
+            if len(self._timestamps) - self._aggregated >= _FLUSH_SIZE:
+                self._flush()
+
+    def add_records(self, timestamps: List, data: List):
+        with self._lock:
+            self._timestamps.extend(timestamps)
+            self._data.extend(data)
+            if len(self._timestamps) - self._aggregated >= _FLUSH_SIZE:
+                self._flush()
+
+    def _flush(self) -> None:
+        # Aggregates the pending raw samples in a single vectorized pass and drops raw samples outside the window
+        if self._aggregated < len(self._timestamps):
+            if self._first is None:
+                self._first = self._timestamps[0]
+            timestamps = np.asarray(self._timestamps[self._aggregated:], dtype=np.int64)
+            data = np.asarray(self._data[self._aggregated:], dtype=np.float64)
+            for tier in self._tiers:
+                tier.add(timestamps, data)
+            self._aggregated = len(self._timestamps)
+
+        if self._timestamps:
+            expired = int(np.searchsorted(np.asarray(self._timestamps, dtype=np.int64),
+                                          self._timestamps[-1] - self._raw_window, side="left"))
+            del self._timestamps[:expired]
+            del self._data[:expired]
+            self._discarded += expired
+            self._aggregated -= expired
+
+    def since(self, index: int) -> Tuple[List, List]:
+        with self._lock:
+            start = max(index - self._discarded, 0)
+            return self._timestamps[start:], self._data[start:]
+
+    def to_timeseries(self) -> TimeSeries:
+        with self._lock:
+            return TimeSeries(timestamps=np.array(self._timestamps), data=np.array(self._data))
+
+    def _oldest(self) -> Optional[int]:
+        oldest = [tier.oldest for tier in self._tiers if tier.oldest is not None]
+        if not oldest:
+            return None
+        # Buckets start before their first sample
+        return max(min(oldest), self._first)
+
+    @property
+    def time_range(self) -> Tuple[Optional[int], Optional[int]]:
+        """
+        The timestamps of the oldest sample still covered by any tier and of the newest sample.
+        """
+        with self._lock:
+            self._flush()
+            return self._oldest(), (self._timestamps[-1] if self._timestamps else None)
+
+    def query(self, t0: Optional[int] = None, t1: Optional[int] = None, resolution: float = 0.0) -> Buckets:
+        """
+        Answers a range query from the coarsest tier which is precise enough and still covers the start of the range.
+        :param t0: The first timestamp of the range (default: the oldest covered sample).
+        :param t1: The last timestamp of the range (default: the newest sample).
+        :param resolution: The coarsest acceptable bucket width [s]. 0 requests raw samples.
+        :return: The buckets within the range.
+        """
+        with self._lock:
+            self._flush()
+            oldest = self._oldest()
+            if oldest is None:
+                return _raw_buckets(np.empty(0, dtype=np.int64), np.empty(0))
+            t0 = oldest if t0 is None else t0
+            t1 = np.iinfo(np.int64).max if t1 is None else t1
+
+            raw_covers = bool(self._timestamps) and self._timestamps[0] <= t0
+            covering = [tier for tier in self._tiers if tier.oldest is not None and tier.oldest <= t0]
+            precise = [tier for tier in covering if tier.width <= resolution * SEC]
+            if precise:
+                return precise[-1].query(t0, t1)
+            if raw_covers:
+                return self._query_raw(t0, t1)
+            if covering:
+                return covering[0].query(t0, t1)
+            # No tier reaches back to t0 anymore - the coarsest tier reaches back the furthest
+            return self._tiers[-1].query(t0, t1)
+
+    def _query_raw(self, t0: int, t1: int) -> Buckets:
+        timestamps = np.asarray(self._timestamps, dtype=np.int64)
+        first, last = np.searchsorted(timestamps, t0, side="left"), np.searchsorted(timestamps, t1, side="right")
+        return _raw_buckets(timestamps[first:last], np.asarray(self._data[first:last], dtype=np.float64))
+
+
+def _raw_buckets(timestamps: np.ndarray, data: np.ndarray) -> Buckets:
+    return Buckets(width=0, timestamps=timestamps, data_min=data, data_max=data, data_mean=data, data_last=data)
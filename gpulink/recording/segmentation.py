@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gpulink.consts import SEC
+from gpulink.recording.timeseries import TimeSeries
+
+# Each segment contains at least this fraction of the samples unless min_size is given
+MIN_SIZE_FRACTION = 1 / 500
+
+
+@dataclass
+class Segment:
+    """
+    A phase of a time series with a stable mean.
+    """
+    label: str
+    gpu: Optional[int]  # The id of the segmented GPU if known
+    start_idx: int
+    end_idx: int  # Exclusive
+    start: int  # The timestamp of the first sample
+    end: int  # The timestamp of the last sample
+    mean: float
+    std: float
+    minimum: float
+    maximum: float
+
+    @property
+    def duration(self) -> float:
+        """
+        The duration [s] of the segment.
+        """
+        return (self.end - self.start) / SEC
+
+
+def _noise_variance(data: np.ndarray) -> float:
+    # Robust estimate from the first differences, which are not affected by the level changes themselves
+    if data.size < 3:
+        return 0.0
+    mad = np.median(np.abs(np.diff(data) - np.median(np.diff(data))))
+    return float((mad / 0.6745) ** 2 / 2)
+
+
+def _best_split(cumsum: np.ndarray, start: int, end: int, min_size: int) -> Tuple[float, int]:
+    # The reduction of the squared error for all split points at once, using prefix sums
+    splits = np.arange(start + min_size, end - min_size + 1)
+    if splits.size == 0:
+        return 0.0, -1
+    left = cumsum[splits] - cumsum[start]
+    right = cumsum[end] - cumsum[splits]
+    gains = left ** 2 / (splits - start) + right ** 2 / (end - splits) - (cumsum[end] - cumsum[start]) ** 2 / (
+            end - start)
+    best = int(np.argmax(gains))
+    return float(gains[best]), int(splits[best])
+
+
+def find_change_points(data: np.ndarray, penalty: Optional[float] = None, min_size: Optional[int] = None,
+                       max_segments: Optional[int] = None) -> List[int]:
+    """
+    Detects changes of the mean using binary segmentation with a penalized squared-error cost.
+    The segment whose best split reduces the cost the most is split first, the best split of a segment is found in a
+    single vectorized pass over prefix sums. This takes O(n log k) for n samples and k segments.
+    :param data: The samples.
+    :param penalty: The minimum cost reduction for a split (default: BIC penalty from the estimated noise).
+    :param min_size: The minimum number of samples per segment (default: 1/500 of the samples, at least 2).
+    :param max_segments: An optional maximum number of segments.
+    :return: The sorted indices at which new segments start.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    n = data.size
+    if n < 2:
+        return []
+    min_size = max(min_size if min_size else int(n * MIN_SIZE_FRACTION), 2)
+    if penalty is None:
+        penalty = 2 * _noise_variance(data) * np.log(n)
+    # Never split on rounding errors
+    penalty = max(penalty, 1e-9 * n * float(np.var(data)))
+
+    cumsum = np.concatenate([[0.0], np.cumsum(data - data.mean())])
+    heap = []
+    gain, split = _best_split(cumsum, 0, n, min_size)
+    heapq.heappush(heap, (-gain, 0, n, split))
+    change_points = []
+    while heap and (max_segments is None or len(change_points) + 1 < max_segments):
+        gain, start, end, split = heapq.heappop(heap)
+        if split < 0 or -gain <= penalty:
+            break
+        change_points.append(split)
+        for s, e in ((start, split), (split, end)):
+            child_gain, child_split = _best_split(cumsum, s, e, min_size)
+            heapq.heappush(heap, (-child_gain, s, e, child_split))
+    return sorted(change_points)
+
+
+def segment_timeseries(timeseries: TimeSeries, penalty: Optional[float] = None, min_size: Optional[int] = None,
+                       max_segments: Optional[int] = None, labels: Optional[Sequence[str]] = None,
+                       gpu: Optional[int] = None) -> List[Segment]:
+    """
+    Splits a time series into phases with a stable mean and computes per-segment statistics.
+    :param timeseries: The time series to be segmented.
+    :param penalty: The minimum cost reduction for a split, see find_change_points().
+    :param min_size: The minimum number of samples per segment.
+    :param max_segments: An optional maximum number of segments.
+    :param labels: Optional labels of the segments in order, e.g. ["loading", "warmup", "steady", "eval"].
+    Segments without a label are named "Phase <n>".
+    :param gpu: The id of the GPU the time series was recorded from.
+    :return: The segments in order.
+    """
+    timestamps, data = timeseries.timestamps, np.asarray(timeseries.data, dtype=np.float64)
+    if data.size == 0:
+        return []
+    starts = np.array([0] + find_change_points(data, penalty, min_size, max_segments))
+    ends = np.append(starts[1:], data.size)
+    counts = ends - starts
+    sums = np.add.reduceat(data, starts)
+    means = sums / counts
+    variances = np.add.reduceat(data ** 2, starts) / counts - means ** 2
+    minima = np.minimum.reduceat(data, starts)
+    maxima = np.maximum.reduceat(data, starts)
+    labels = list(labels) if labels else []
+    return [Segment(
+        label=labels[i] if i < len(labels) else f"Phase {i + 1}",
+        gpu=gpu,
+        start_idx=int(starts[i]),
+        end_idx=int(ends[i]),
+        start=int(timestamps[starts[i]]),
+        end=int(timestamps[ends[i] - 1]),
+        mean=float(means[i]),
+        std=float(np.sqrt(max(variances[i], 0.0))),
+        minimum=float(minima[i]),
+        maximum=float(maxima[i])
+    ) for i in range(starts.size)]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import struct
+from pathlib import Path
+from typing import Union, List, Tuple
+
+import numpy as np
+
+from gpulink.clock import ClockAnchor
+from gpulink.devices.gpu import GpuSet, Gpu
+from gpulink.recording.gpu_recording import Recording, RecType
+from gpulink.recording.markers import Markers
+from gpulink.recording.timeseries import TimeSeries
+
+# File layout of a stored recording:
+#   MAGIC | header length (uint64, little endian) | JSON header | padding | array blocks
+# The data section and every array block within it start at offsets aligned to ALIGNMENT bytes, so the arrays
+# can be memory-mapped directly. Array offsets in the header are relative to the start of the data section.
+MAGIC = b"GPULINK\x00"
+VERSION = 1
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct("<8sQ")
+
+PathLike = Union[str, Path]
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_recording(recording: Recording, path: PathLike) -> None:
+    """
+    Stores a recording in a file which can be memory-mapped.
+    :param recording: The recording to be stored.
+    :param path: The path to the file.
+    """
+    series = []
+    arrays = []
+    offset = 0
+    for gpu, ts in zip(recording.gpus, recording.timeseries):
+        timestamps = np.ascontiguousarray(ts.timestamps, dtype=np.int64)
+        data = np.ascontiguousarray(ts.data)
+        if data.size == 0:
+            data = data.astype(np.float64)
+        blocks = {}
+        for key, array in (("timestamps", timestamps), ("data", data)):
+            blocks[key] = {"offset": offset, "dtype": array.dtype.str}
+            arrays.append((offset, array))
+            offset = _align(offset + array.nbytes)
+        series.append({"gpu": gpu.id, "length": int(timestamps.size), **blocks})
+
+    header = json.dumps({
+        "version": VERSION,
+        "name": recording.name,
+        "rtype": recording.rtype.name,
+        "unit": recording.unit,
+        "unit_info": recording.unit_info.to_dict() if recording.unit_info else None,
+        "gpus": [{"id": gpu.id, "name": gpu.name} for gpu in recording.gpus],
+        "series": series,
+        "markers": recording.markers.to_dict() if recording.markers is not None else None,
+        "clock": recording.clock.to_dict() if recording.clock is not None else None
+    }).encode("utf-8")
+    data_start = _align(_PREFIX.size + len(header))
+
+    with open(path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, len(header)))
+        f.write(header)
+        for array_offset, array in arrays:
+            f.seek(data_start + array_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+
+
+def read_header(path: PathLike) -> dict:
+    """
+    Reads the header of a stored recording.
+    :param path: The path to the file.
+    :return: The header as dictionary.
+    """
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        magic, length = _PREFIX.unpack(prefix) if len(prefix) == _PREFIX.size else (None, 0)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a gpulink recording")
+        header = json.loads(f.read(length).decode("utf-8"))
+    if header["version"] != VERSION:
+        raise ValueError(f"Unsupported recording version {header['version']}")
+    header["data_start"] = _align(_PREFIX.size + length)
+    return header
+
+
+def map_series(path: PathLike, header: dict) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Memory-maps all time series of a stored recording without reading them.
+    :param path: The path to the file.
+    :param header: The header of the file (see read_header).
+    :return: A list containing the read-only (timestamps, data) arrays per GPU.
+    """
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+    def view(block: dict, length: int) -> np.ndarray:
+        dtype = np.dtype(block["dtype"])
+        start = header["data_start"] + block["offset"]
+        return buffer[start:start + length * dtype.itemsize].view(dtype)
+
+    return [(view(s["timestamps"], s["length"]), view(s["data"], s["length"])) for s in header["series"]]
+
+
+def load_recording(path: PathLike) -> Recording:
+    """
+    Loads a stored recording. The time series data is memory-mapped and only read on access.
+    :param path: The path to the file.
+    :return: The loaded Recording.
+    """
+    header = read_header(path)
+    return Recording(
+        gpus=GpuSet([Gpu(gpu["id"], gpu["name"]) for gpu in header["gpus"]]),
+        timeseries=[TimeSeries(timestamps=t, data=d) for t, d in map_series(path, header)],
+        rtype=RecType[header["rtype"]],
+        name=header["name"],
+        unit=header["unit"],
+        markers=Markers.from_dict(header["markers"]) if header.get("markers") else None,
+        clock=ClockAnchor.from_dict(header["clock"]) if header.get("clock") else None
+    )
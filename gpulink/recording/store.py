@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from gpulink.devices.gpu import GpuSet, Gpu
+from gpulink.recording.gpu_recording import RecType
+from gpulink.recording.storage import PathLike, read_header, map_series
+
+# The number of samples aggregated by a block of the finest index level
+BLOCK_SIZE = 1024
+# The number of blocks of a level aggregated by a single block of the next coarser level
+LEVEL_FACTOR = 16
+# The number of samples processed at once while building the index
+_CHUNK_SIZE = BLOCK_SIZE * 1024
+
+
+@dataclass
+class Window:
+    """
+    The result of a windowed query for a single GPU.
+    For raw samples, data_min, data_max and data_mean are identical.
+    """
+    gpu: Gpu
+    timestamps: np.ndarray  # The timestamp of the first sample of each bucket
+    data_min: np.ndarray
+    data_max: np.ndarray
+    data_mean: np.ndarray
+
+
+@dataclass
+class _Level:
+    block_size: int
+    timestamps: np.ndarray  # The timestamp of the first sample of each block
+    data_min: np.ndarray
+    data_max: np.ndarray
+    data_sum: np.ndarray
+    count: np.ndarray
+
+
+def _reduce_blocks(timestamps: np.ndarray, data: np.ndarray, block_size: int) -> Tuple[np.ndarray, ...]:
+    starts = np.arange(0, data.size, block_size)
+    data = data.astype(np.float64)
+    return (timestamps[starts],
+            np.minimum.reduceat(data, starts),
+            np.maximum.reduceat(data, starts),
+            np.add.reduceat(data, starts),
+            np.diff(np.append(starts, data.size)))
+
+
+def _build_levels(timestamps: np.ndarray, data: np.ndarray) -> List[_Level]:
+    if data.size == 0:
+        return []
+
+    # The finest level is built chunk-wise, so only a bounded part of the file is paged in at once
+    parts = [_reduce_blocks(timestamps[i:i + _CHUNK_SIZE], data[i:i + _CHUNK_SIZE], BLOCK_SIZE)
+             for i in range(0, data.size, _CHUNK_SIZE)]
+    levels = [_Level(BLOCK_SIZE, *[np.concatenate(columns) for columns in zip(*parts)])]
+
+    while levels[-1].timestamps.size > 1:
+        finer = levels[-1]
+        starts = np.arange(0, finer.timestamps.size, LEVEL_FACTOR)
+        levels.append(_Level(
+            block_size=finer.block_size * LEVEL_FACTOR,
+            timestamps=finer.timestamps[starts],
+            data_min=np.minimum.reduceat(finer.data_min, starts),
+            data_max=np.maximum.reduceat(finer.data_max, starts),
+            data_sum=np.add.reduceat(finer.data_sum, starts),
+            count=np.add.reduceat(finer.count, starts)
+        ))
+    return levels
+
+
+class RecordingStore:
+    """
+    Provides windowed queries on a stored recording without loading it.
+    The time series are memory-mapped and a min/max/mean pyramid is built per GPU. The pyramid is cached next to the
+    recording file and rebuilt if the recording changes.
+    """
+
+    def __init__(self, path: PathLike):
+        self._path = Path(path)
+        header = read_header(self._path)
+        self.gpus = GpuSet([Gpu(gpu["id"], gpu["name"]) for gpu in header["gpus"]])
+        self.rtype = RecType[header["rtype"]]
+        self.name: str = header["name"]
+        self.unit: str = header["unit"]
+        self._series = map_series(self._path, header)
+        self._levels = self._load_index()
+
+    @property
+    def index_path(self) -> Path:
+        return self._path.with_name(self._path.name + ".idx.npz")
+
+    def _load_index(self) -> List[List[_Level]]:
+        stat = os.stat(self._path)
+        signature = np.array([stat.st_size, stat.st_mtime_ns, BLOCK_SIZE, LEVEL_FACTOR], dtype=np.int64)
+        try:
+            with np.load(self.index_path) as cached:
+                if np.array_equal(cached["signature"], signature):
+                    return self._unpack_index(cached)
+        except (OSError, KeyError, ValueError):
+            pass
+
+        levels = [_build_levels(timestamps, data) for timestamps, data in self._series]
+        try:
+            self._save_index(levels, signature)
+        except OSError:
+            # The index is only a cache - a read-only location must not prevent viewing
+            pass
+        return levels
+
+    def _save_index(self, levels: List[List[_Level]], signature: np.ndarray):
+        arrays = {"signature": signature}
+        for s, series_levels in enumerate(levels):
+            arrays[f"{s}_levels"] = np.array([level.block_size for level in series_levels], dtype=np.int64)
+            for i, level in enumerate(series_levels):
+                for key in ("timestamps", "data_min", "data_max", "data_sum", "count"):
+                    arrays[f"{s}_{i}_{key}"] = getattr(level, key)
+        with open(self.index_path, "wb") as f:
+            np.savez(f, **arrays)
+
+    def _unpack_index(self, cached) -> List[List[_Level]]:
+        levels = []
+        for s in range(len(self._series)):
+            levels.append([
+                _Level(int(block_size), *[cached[f"{s}_{i}_{key}"]
+                                          for key in ("timestamps", "data_min", "data_max", "data_sum", "count")])
+                for i, block_size in enumerate(cached[f"{s}_levels"])
+            ])
+        return levels
+
+    @property
+    def time_range(self) -> Tuple[int, int]:
+        """
+        The timestamps of the first and the last sample over all GPUs.
+        """
+        firsts = [timestamps[0] for timestamps, _ in self._series if timestamps.size]
+        lasts = [timestamps[-1] for timestamps, _ in self._series if timestamps.size]
+        if not firsts:
+            raise ValueError("The recording is empty")
+        return int(min(firsts)), int(max(lasts))
+
+    def _window(self, idx: int, t0: int, t1: int, max_points: int) -> Window:
+        timestamps, data = self._series[idx]
+        start = int(np.searchsorted(timestamps, t0, side="left"))
+        end = int(np.searchsorted(timestamps, t1, side="right"))
+        count = end - start
+
+        if count <= max_points:
+            raw = np.asarray(data[start:end])
+            return Window(self.gpus[idx], np.asarray(timestamps[start:end]), raw, raw, raw)
+
+        levels = self._levels[idx]
+        if count <= max_points * BLOCK_SIZE or not levels:
+            # Reduce the raw samples on the fly - at most max_points * BLOCK_SIZE samples are read
+            bucket = -(-count // max_points)
+            t, d_min, d_max, d_sum, n = _reduce_blocks(timestamps[start:end], data[start:end], bucket)
+            return Window(self.gpus[idx], t, d_min, d_max, d_sum / n)
+
+        for level in levels:
+            first, last = start // level.block_size, -(-end // level.block_size)
+            if last - first <= max_points:
+                break
+        sl = slice(first, last)
+        return Window(self.gpus[idx], level.timestamps[sl], level.data_min[sl], level.data_max[sl],
+                      level.data_sum[sl] / level.count[sl])
+
+    def window(self, t0: Optional[int] = None, t1: Optional[int] = None, max_points: int = 2000,
+               gpus: Optional[List[int]] = None) -> List[Window]:
+        """
+        Queries the recorded data between two timestamps.
+        If the time range contains more than max_points samples, the data is aggregated into at most max_points
+        buckets, each providing the minimum, maximum and mean of the aggregated samples.
+        :param t0: The start timestamp (default: the first sample).
+        :param t1: The end timestamp (default: the last sample).
+        :param max_points: The maximum number of points returned per GPU.
+        :param gpus: An optional list of GPU ids to be queried.
+        :return: A list of Window per GPU.
+        """
+        if max_points < 1:
+            raise ValueError("max_points must be positive")
+        if t0 is None or t1 is None:
+            first, last = self.time_range
+            t0 = first if t0 is None else t0
+            t1 = last if t1 is None else t1
+        return [self._window(idx, t0, t1, max_points) for idx, gpu in enumerate(self.gpus)
+                if not gpus or gpu.id in gpus]
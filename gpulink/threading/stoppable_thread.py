@@ -1,4 +1,5 @@
 from threading import Thread, Event
+from typing import Optional
 
 
 class StoppableThread(Thread):
@@ -11,6 +12,14 @@ class StoppableThread(Thread):
         if auto_join:
             self.join()
 
+    def wait(self, timeout: Optional[float]) -> bool:
+        """
+        Blocks until the thread is requested to stop or the timeout expires.
+        :param timeout: The maximum time to wait [s].
+        :return: True if the thread should stop, else False.
+        """
+        return self._stop_event.wait(timeout)
+
     @property
     def should_stop(self):
         return self._stop_event.is_set()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class Unit:
+    """
+    The machine-readable description of a unit.
+    """
+    symbol: str  # As shown in tables and plots, e.g. 'MB'
+    quantity: str  # The measured quantity, units of the same quantity can be converted into each other
+    factor: float  # The factor converting a value into the base unit of the quantity, e.g. 1e6 for MB to Byte
+
+    def to_dict(self) -> dict:
+        return {"symbol": self.symbol, "quantity": self.quantity, "factor": self.factor}
+
+
+UNITS: Dict[str, Unit] = {unit.symbol: unit for unit in (
+    Unit("Byte", "memory", 1.0),
+    Unit("KB", "memory", 1e3),
+    Unit("MB", "memory", 1e6),
+    Unit("GB", "memory", 1e9),
+    Unit("mW", "power", 1e-3),
+    Unit("W", "power", 1.0),
+    Unit("kW", "power", 1e3),
+    Unit("mJ", "energy", 1e-3),
+    Unit("J", "energy", 1.0),
+    Unit("kJ", "energy", 1e3),
+    Unit("Wh", "energy", 3.6e3),
+    Unit("kWh", "energy", 3.6e6),
+    Unit("MHz", "frequency", 1e6),
+    Unit("GHz", "frequency", 1e9),
+    Unit("KB/s", "throughput", 1e3),
+    Unit("MB/s", "throughput", 1e6),
+    Unit("GB/s", "throughput", 1e9),
+    Unit("°C", "temperature", 1.0),
+    Unit("%", "ratio", 1.0),
+    Unit("Bitmask", "bitmask", 1.0),
+)}
+
+
+def get_unit(symbol: str) -> Unit:
+    """
+    Looks up a unit by its symbol.
+    """
+    if symbol not in UNITS:
+        raise ValueError(f"Unknown unit '{symbol}', use one of {', '.join(UNITS)}")
+    return UNITS[symbol]
+
+
+def conversion_factor(source: str, target: str) -> float:
+    """
+    Computes the factor converting values from one unit into another.
+    :param source: The symbol of the unit of the values.
+    :param target: The symbol of the unit the values should be converted to.
+    :return: The factor the values have to be multiplied with.
+    """
+    if source == target:
+        return 1.0
+    source_unit, target_unit = get_unit(source), get_unit(target)
+    if source_unit.quantity != target_unit.quantity:
+        raise ValueError(f"Cannot convert {source_unit.quantity} [{source}] into {target_unit.quantity} [{target}]")
+    return source_unit.factor / target_unit.factor
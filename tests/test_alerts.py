@@ -0,0 +1,75 @@
+import json
+import logging
+
+import numpy as np
+
+import gpulink as gpu
+from gpulink.consts import SEC
+from gpulink.devices.device_mock import TEST_TEMP
+
+
+def evaluate(engine, frames):
+    alerts = []
+    for second, values in enumerate(frames):
+        alerts += engine.evaluate(np.full(len(values), second * SEC), np.array(values, dtype=np.float64))
+    return [(a.rule, a.gpu, a.firing) for a in alerts]
+
+
+def test_threshold_with_hysteresis():
+    engine = gpu.AlertEngine([gpu.Rule.above("hot", 80, clear=70)], sinks=[], gpus=[3, 5])
+    alerts = evaluate(engine, [[60, 60], [85, 60], [75, 60], [69, 90]])
+    # GPU 3 stays hot at 75 because of the hysteresis
+    assert alerts == [("hot", 3, True), ("hot", 5, True), ("hot", 3, False)]
+    assert engine.active.tolist() == [[False, True]]
+
+
+def test_sustained_condition():
+    engine = gpu.AlertEngine([gpu.Rule.below("idle", 10, sustained=2)], sinks=[])
+    alerts = evaluate(engine, [[5], [5], [50], [5], [5], [5]])
+    # The first dip only lasts 1 s, the second one fires after 2 s
+    assert alerts == [("idle", 0, True)]
+
+
+def test_rate_of_change():
+    engine = gpu.AlertEngine([gpu.Rule.rising("spike", 10), gpu.Rule.falling("drop", 10)], sinks=[])
+    alerts = evaluate(engine, [[0, 0], [5, 20], [30, 20], [30, 5]])
+    # Alerts firing on a frame are reported before the ones resolving
+    assert alerts == [("spike", 1, True), ("spike", 0, True), ("spike", 1, False), ("drop", 1, True),
+                      ("spike", 0, False)]
+
+
+def test_sinks(tmp_path, caplog):
+    path = tmp_path / "alerts.jsonl"
+    webhook = gpu.WebhookSink("http://localhost/hook")
+    engine = gpu.AlertEngine([gpu.Rule.above("hot", 80)], sinks=[gpu.LogSink(), gpu.FileSink(path), webhook])
+    with caplog.at_level(logging.INFO, logger="gpulink"):
+        evaluate(engine, [[90], [50]])
+
+    assert [json.loads(line)["firing"] for line in path.read_text().splitlines()] == [True, False]
+    assert json.loads(webhook.payloads[0])["text"] == "FIRING: hot on GPU 0"
+    assert "Alert 'hot' fired on GPU 0" in caplog.text
+
+
+def test_engine_as_recorder_callback():
+    webhook = gpu.WebhookSink("http://localhost/hook")
+    with gpu.DeviceCtx(device=gpu.DeviceMock) as ctx:
+        engine = gpu.AlertEngine([gpu.Rule.above("warm", TEST_TEMP - 1)], sinks=[webhook])
+        rec = gpu.Recorder.create_temperature_recorder(ctx, gpus=[1], callback=engine)
+        for _ in range(3):
+            rec._fetch_and_store()
+    # The engine reports the device ids of the recorder, not the position of the GPU in the results
+    assert [json.loads(p)["alert"]["gpu"] for p in webhook.payloads] == [1]
+
+
+def test_engine_evaluates_every_drained_sample(mocker):
+    alerts = []
+    engine = gpu.AlertEngine([gpu.Rule.above("busy", 90)], sinks=[alerts.append])
+    with gpu.DeviceCtx(device=gpu.DeviceMock) as ctx:
+        rec = gpu.Recorder.create_gpu_utilization_recorder(ctx, callback=engine, buffered=True)
+        # The spike on GPU 0 is neither the last sample of the drain nor present on GPU 1
+        mocker.patch.object(ctx._device, "get_samples", return_value=[
+            gpu.SampleResult(gpu_idx=0, timestamp=0, gpu_name="GPU_0", timestamps=[1, 2, 3], values=[50, 95, 50]),
+            gpu.SampleResult(gpu_idx=1, timestamp=0, gpu_name="GPU_1", timestamps=[1], values=[50])])
+        rec._fetch_and_store()
+    assert [(a.gpu, a.timestamp, a.firing) for a in alerts] == [(0, 2, True), (0, 3, False)]
+    assert engine.active.tolist() == [[False, False]]
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+import gpulink as gpu
+from gpulink.cli.cmd_query import query
+from gpulink.consts import SEC
+
+
+def save(directory, file_name, name, rtype, values_per_gpu, unit="W"):
+    recording = gpu.Recording(
+        gpus=gpu.GpuSet([gpu.Gpu(idx, f"GPU_{idx}") for idx in range(len(values_per_gpu))]),
+        timeseries=[gpu.TimeSeries(np.arange(len(values), dtype=np.int64) * SEC, np.array(values, dtype=np.float64))
+                    for values in values_per_gpu],
+        rtype=rtype,
+        name=name,
+        unit=unit)
+    gpu.save_recording(recording, directory / file_name)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    power, temp = gpu.RecType.REC_TYPE_POWER_USAGE, gpu.RecType.REC_TYPE_TEMPERATURE
+    save(tmp_path, "a.rec", "job-a", power, [np.arange(101), np.arange(101) * 2])
+    save(tmp_path, "b.rec", "job-b", power, [np.full(50, 7)])
+    save(tmp_path, "c.rec", "job-a", temp, [np.full(10, 60)])
+    (tmp_path / "notes.rec").write_bytes(b"not a recording")
+    return gpu.RecordingCatalog(tmp_path)
+
+
+def test_group_and_aggregate(catalog):
+    table = catalog.query().where(rtypes=[gpu.RecType.REC_TYPE_POWER_USAGE]).group_by("name", "gpu") \
+        .aggregate("count", "mean", "p99", "max")
+    assert table.columns == ["name", "gpu", "rtype", "unit", "count", "mean", "p99", "max"]
+    assert table.rows == [["job-a", 0, "Power Usage", "W", 101, 50, 99, 100],
+                          ["job-a", 1, "Power Usage", "W", 101, 100, 198, 200],
+                          ["job-b", 0, "Power Usage", "W", 50, 7, 7, 7]]
+
+
+def test_filters(catalog):
+    records = catalog.query().where(name="job-a", gpus=[0]).group_by("rtype").aggregate("min", "max").to_records()
+    assert records == [{"rtype": "Power Usage", "unit": "W", "min": 0, "max": 100},
+                       {"rtype": "Temperature", "unit": "W", "min": 60, "max": 60}]
+
+    # The time range is relative to the first sample of each recording
+    table = catalog.query().where(name="job-a", gpus=[0], start=10, end=19).group_by("file").aggregate("count", "sum")
+    assert table.rows == [["a.rec", "Power Usage", "W", 10, sum(range(10, 20))], ["c.rec", "Temperature", "W", 0, 0]]
+
+
+def test_groups_spanning_several_recordings(catalog):
+    table = catalog.query().where(rtypes=[gpu.RecType.REC_TYPE_POWER_USAGE]).aggregate("count", "mean", "std", "p50")
+    data = np.concatenate([np.arange(101), np.arange(101) * 2, np.full(50, 7)])
+    assert table.rows[0][:2] == ["Power Usage", "W"]
+    np.testing.assert_allclose(table.rows[0][2:], [data.size, data.mean(), data.std(), np.quantile(data, 0.5)])
+
+
+def test_mixed_units_are_not_merged(tmp_path):
+    save(tmp_path, "memory.rec", "job", gpu.RecType.REC_TYPE_MEMORY, [np.full(5, 8000)], unit="MB")
+    save(tmp_path, "power.rec", "job", gpu.RecType.REC_TYPE_POWER_USAGE, [np.full(5, 250)])
+    records = gpu.RecordingCatalog(tmp_path).query().group_by("name", "gpu").aggregate("count", "mean").to_records()
+    assert records == [{"name": "job", "gpu": 0, "rtype": "Memory", "unit": "MB", "count": 5, "mean": 8000},
+                       {"name": "job", "gpu": 0, "rtype": "Power Usage", "unit": "W", "count": 5, "mean": 250}]
+
+
+def test_group_results_are_bounded(tmp_path, catalog, mocker):
+    mocker.patch.object(gpu.recording.catalog, "MAX_GROUP_RESULTS", 2)
+    for q in ("p10", "p20", "p30"):
+        catalog.query().where(name="job-a", rtypes=[gpu.RecType.REC_TYPE_POWER_USAGE]).aggregate(q)
+    assert len(catalog._group_results) == 2
+
+    # Changed files replace the entries of their groups
+    query = catalog.query().where(rtypes=[gpu.RecType.REC_TYPE_POWER_USAGE])
+    query.aggregate("p50")
+    save(tmp_path, "b.rec", "job-b", gpu.RecType.REC_TYPE_POWER_USAGE, [np.full(500, 9)])
+    os.utime(tmp_path / "b.rec", ns=(1, 1))
+    assert query.aggregate("p50").rows[0][-1] == 9
+    assert len(catalog._group_results) == 2
+
+
+def test_results_are_cached_by_mtime(tmp_path, catalog, mocker):
+    catalog.query().group_by("file").aggregate("p90")
+    read_header = mocker.spy(gpu.recording.catalog, "read_header")
+    slice_data = mocker.spy(catalog, "_slice")
+
+    catalog.query().group_by("file").aggregate("p90")
+    assert read_header.call_count == 0
+    assert slice_data.call_count == 0
+
+    save(tmp_path, "b.rec", "job-b", gpu.RecType.REC_TYPE_POWER_USAGE, [np.full(60, 9)])
+    os.utime(tmp_path / "b.rec", ns=(1, 1))
+    table = catalog.query().group_by("file").aggregate("p90", "count")
+    assert read_header.call_count == 1
+    assert table.rows[1] == ["b.rec", "Power Usage", "W", 9, 60]
+
+
+def test_invalid_aggregation(catalog):
+    with pytest.raises(ValueError):
+        catalog.query().aggregate("median")
+    with pytest.raises(ValueError):
+        catalog.query().group_by("host")
+
+
+def test_query_command(tmp_path, catalog):
+    result = CliRunner().invoke(query, [str(tmp_path), "-m", "power-usage", "-g", "name", "-a", "p99"])
+    assert result.exit_code == 0
+    assert "job-a" in result.output and "job-b" in result.output
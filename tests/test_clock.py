@@ -0,0 +1,75 @@
+from time import time_ns
+
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.consts import SEC
+
+
+@pytest.fixture
+def device_ctx():
+    return gpu.DeviceCtx(device=gpu.DeviceMock)
+
+
+def test_anchor():
+    clock = gpu.MonotonicClock()
+    before = time_ns()
+    anchor = clock.anchor()
+    after = time_ns()
+    assert anchor.clock == "monotonic"
+    assert before <= anchor.wall <= after
+    now = clock.now()
+    assert abs(anchor.to_wall(now) - time_ns()) < SEC
+    assert anchor.from_wall(anchor.to_wall(now)) == now
+    timestamps = np.array([anchor.timestamp, anchor.timestamp + 10])
+    assert anchor.to_wall(timestamps).tolist() == [anchor.wall, anchor.wall + 10]
+
+
+def test_clocks_are_monotonic():
+    for clock in (gpu.MonotonicClock(), gpu.PerfCounterClock()):
+        readings = [clock.now() for _ in range(100)]
+        assert readings == sorted(readings)
+
+
+def test_set_default_clock():
+    default = gpu.default_clock()
+    clock = gpu.Clock(lambda: 42, "fixed")
+    gpu.set_default_clock(clock)
+    try:
+        assert gpu.default_clock() is clock
+    finally:
+        gpu.set_default_clock(default)
+    assert gpu.default_clock() is default
+
+
+def test_recording_anchor(device_ctx):
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_memory_recorder(ctx, ctx.gpus.ids)
+        for _ in range(3):
+            recorder._fetch_and_store()
+        recording = recorder.get_recording()
+
+    assert recording.clock.clock == "simulated"
+    assert recording.clock.timestamp == 0
+    wall = recording.to_wall_time()
+    assert wall[0].timestamps.tolist() == [recording.clock.wall + i for i in range(3)]
+    assert wall[0] == gpu.TimeSeries(recording.timeseries[0].timestamps + recording.clock.wall,
+                                     recording.timeseries[0].data)
+
+
+def test_recording_without_anchor():
+    recording = gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0")]),
+                              timeseries=[gpu.TimeSeries(np.array([0, 1]), np.array([1, 2]))],
+                              rtype=gpu.RecType.REC_TYPE_MEMORY, name="test", unit="MB")
+    with pytest.raises(ValueError):
+        recording.to_wall_time()
+
+
+def test_storage_roundtrip(tmp_path):
+    recording = gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0")]),
+                              timeseries=[gpu.TimeSeries(np.array([0, 1]), np.array([1, 2]))],
+                              rtype=gpu.RecType.REC_TYPE_MEMORY, name="test", unit="MB",
+                              clock=gpu.ClockAnchor("monotonic", 100, 1_700_000_000 * int(SEC)))
+    gpu.save_recording(recording, tmp_path / "clock.rec")
+    assert gpu.load_recording(tmp_path / "clock.rec").clock == recording.clock
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+import gpulink as gpu
+from gpulink.cli.cmd_compare import compare
+from gpulink.recording.compare import ks_distance
+
+
+def power_recording(name, gpu0, gpu1):
+    return gpu.Recording(
+        gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0"), gpu.Gpu(1, "GPU_1")]),
+        timeseries=[gpu.TimeSeries(np.arange(data.size), data) for data in (gpu0, gpu1)],
+        rtype=gpu.RecType.REC_TYPE_POWER_USAGE,
+        name=name,
+        unit="mW")
+
+
+@pytest.fixture
+def runs():
+    rng = np.random.default_rng(0)
+    baseline = power_recording("nightly-1", rng.normal(100, 5, 200000), rng.normal(200, 5, 200000))
+    # GPU 1 draws more power in the candidate run
+    candidate = power_recording("nightly-2", rng.normal(100, 5, 150000), rng.normal(220, 5, 150000))
+    return baseline, candidate
+
+
+def test_ks_distance():
+    a = np.arange(100, dtype=np.float64)
+    assert ks_distance(a, a) == 0
+    assert ks_distance(a, a + 1000) == 1
+    assert ks_distance(a, a + 50) == pytest.approx(0.5)
+
+
+def test_compare_recordings(runs):
+    baseline, candidate = runs
+    comparison = baseline.compare(candidate)
+
+    assert [c.gpu.id for c in comparison.gpus] == [0, 1]
+    assert not comparison.gpus[0].significant
+    assert comparison.gpus[1].significant
+    assert comparison.significant
+    assert comparison.gpus[1].candidate_quantiles[2] == pytest.approx(220, abs=0.5)
+    assert comparison.gpus[1].peak_delta == pytest.approx(0.1, abs=0.03)
+    assert "DIFFERENT" in str(comparison)
+
+
+def test_compare_rejects_different_properties(runs):
+    baseline, candidate = runs
+    candidate.rtype = gpu.RecType.REC_TYPE_TEMPERATURE
+    with pytest.raises(ValueError):
+        baseline.compare(candidate)
+
+
+def test_compare_command(tmp_path, runs):
+    baseline, candidate = runs
+    gpu.save_recording(baseline, tmp_path / "a.rec")
+    gpu.save_recording(candidate, tmp_path / "b.rec")
+
+    result = CliRunner().invoke(compare, [str(tmp_path / "a.rec"), str(tmp_path / "b.rec"), "--fail"])
+    assert result.exit_code == 1
+    assert "nightly-1 -> nightly-2" in result.output
+
+    result = CliRunner().invoke(compare, [str(tmp_path / "a.rec"), str(tmp_path / "a.rec"), "--fail"])
+    assert result.exit_code == 0
@@ -2,10 +2,14 @@
 Tests for the DeviceCtx using a mocked device.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 import gpulink as gpu
-from gpulink.devices.device_mock import TEST_GB, TEST_FAN_SPEED_PCT, TEST_TEMP, TEST_CLOCK, TEST_POWER_CONSUMPTION
+from gpulink.devices.device_mock import TEST_GB, TEST_FAN_SPEED_PCT, TEST_TEMP, TEST_CLOCK, TEST_POWER_CONSUMPTION, \
+    TEST_ENERGY_PER_TICK, TEST_PROCESSES, TEST_GPU_UTIL, TEST_MEM_UTIL, TEST_PCIE_TX, TEST_PCIE_RX, \
+    TEST_THROTTLE_REASONS, TEST_SAMPLES_PER_QUERY
 
 
 @pytest.fixture
@@ -24,6 +28,32 @@ def test_raises_on_invalid_context(device_ctx):
         device_ctx.get_memory_info()
 
 
+def test_nested_ctx_is_reference_counted(mocker, device_ctx):
+    setup = mocker.spy(gpu.DeviceMock, "setup")
+    shutdown = mocker.spy(gpu.DeviceMock, "shutdown")
+    with device_ctx as outer:
+        with device_ctx as inner:
+            assert inner is outer
+        # Leaving the inner context keeps the session open
+        assert device_ctx.valid_ctx
+        assert outer.get_temperature(gpu.TemperatureSensorType.GPU)
+    assert not device_ctx.valid_ctx
+    assert setup.call_count == 1
+    assert shutdown.call_count == 1
+
+
+def test_concurrent_queries(device_ctx):
+    def query(_):
+        with device_ctx as ctx:
+            return [ctx.get_temperature(gpu.TemperatureSensorType.GPU)[0].timestamp for _ in range(100)]
+
+    with device_ctx:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            timestamps = [ts for result in executor.map(query, range(8)) for ts in result]
+    # Serialized queries observe every tick of the simulated clock exactly once
+    assert sorted(timestamps) == list(range(800))
+
+
 def test_gpus(device_ctx):
     with device_ctx as ctx:
         assert ctx.gpus == gpu.GpuSet([gpu.Gpu(0, "GPU_0"), gpu.Gpu(1, "GPU_1")])
@@ -95,3 +125,51 @@ def test_get_power_usage(device_ctx):
         assert ctx.get_power_usage(gpus=[1]) == [
             gpu.SimpleResult(gpu_idx=1, timestamp=1, gpu_name="GPU_1", value=TEST_POWER_CONSUMPTION)
         ]
+
+
+def test_get_energy_consumption(device_ctx):
+    with device_ctx as ctx:
+        assert ctx.get_energy_consumption() == [
+            gpu.SimpleResult(gpu_idx=0, timestamp=0, gpu_name="GPU_0", value=0),
+            gpu.SimpleResult(gpu_idx=1, timestamp=0, gpu_name="GPU_1", value=0)
+        ]
+        assert ctx.get_energy_consumption(gpus=[1]) == [
+            gpu.SimpleResult(gpu_idx=1, timestamp=1, gpu_name="GPU_1", value=TEST_ENERGY_PER_TICK)
+        ]
+
+
+def test_get_processes(device_ctx):
+    with device_ctx as ctx:
+        assert ctx.get_processes(gpus=[1]) == [
+            gpu.ProcessResult(gpu_idx=1, timestamp=0, gpu_name="GPU_1", processes=TEST_PROCESSES[1])
+        ]
+
+
+def test_get_utilization(device_ctx):
+    with device_ctx as ctx:
+        assert ctx.get_utilization(gpus=[0]) == [
+            gpu.UtilizationInfo(gpu_idx=0, timestamp=0, gpu_name="GPU_0", gpu=TEST_GPU_UTIL, memory=TEST_MEM_UTIL)
+        ]
+
+
+def test_get_pcie_throughput(device_ctx):
+    with device_ctx as ctx:
+        assert ctx.get_pcie_throughput(gpu.PcieUtilCounter.PCIE_UTIL_TX_BYTES, gpus=[0]) == [
+            gpu.SimpleResult(gpu_idx=0, timestamp=0, gpu_name="GPU_0", value=TEST_PCIE_TX)
+        ]
+        assert ctx.get_pcie_throughput(gpu.PcieUtilCounter.PCIE_UTIL_RX_BYTES, gpus=[0]) == [
+            gpu.SimpleResult(gpu_idx=0, timestamp=1, gpu_name="GPU_0", value=TEST_PCIE_RX)
+        ]
+
+
+def test_get_throttle_reasons(device_ctx):
+    with device_ctx as ctx:
+        reasons = ctx.get_throttle_reasons()
+        assert [gpu.ThrottleReason(r.value) for r in reasons] == TEST_THROTTLE_REASONS
+
+
+def test_get_samples(device_ctx):
+    with device_ctx as ctx:
+        samples = ctx.get_samples(gpu.SamplingType.TOTAL_POWER_SAMPLES, gpus=[0])
+        assert samples[0].timestamps == list(range(TEST_SAMPLES_PER_QUERY))
+        assert samples[0].values == [TEST_POWER_CONSUMPTION] * TEST_SAMPLES_PER_QUERY
@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.recording.instrumentation import RecorderInstrumentation
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = gpu.Histogram()
+    values = np.concatenate([np.full(990, 1e-4), np.full(10, 0.5)])
+    for value in values:
+        histogram.add(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot.count == 1000
+    assert snapshot.maximum == 0.5
+    assert snapshot.mean == pytest.approx(values.mean())
+    # Quantiles are the upper edges of their buckets
+    assert 1e-4 <= snapshot.quantile(0.5) < 1.4e-4
+    assert 0.5 <= snapshot.quantile(0.995) < 0.7
+
+
+def test_missed_ticks_and_jitter():
+    instrumentation = RecorderInstrumentation(interval=0.1)
+    for start in (0.0, 0.1, 0.2, 0.5, 0.6):
+        instrumentation.tick(start, query=0.0, callback=0.0, store=0.0)
+
+    stats = instrumentation.stats()
+    assert stats.ticks == 5
+    # 0.2 -> 0.5 skipped two intervals
+    assert stats.missed_ticks == 2
+    assert stats.achieved_rate == pytest.approx(4 / 0.6)
+    assert stats.jitter.maximum == pytest.approx(0.2)
+
+
+def test_recorder_stats():
+    def slow_callback(*_):
+        time.sleep(0.002)
+
+    with gpu.DeviceCtx(device=gpu.DeviceMock) as ctx:
+        rec = gpu.Recorder.create_temperature_recorder(ctx, callback=slow_callback, interval=0.005)
+        with rec:
+            time.sleep(0.1)
+
+        stats = rec.stats()
+        assert stats.ticks == stats.query.count == stats.callback.count > 1
+        assert stats.callback.mean >= 0.002
+        assert 0 < stats.achieved_rate < 1 / 0.005
+
+        recording = rec.get_recording()
+        assert recording.stats.ticks == stats.ticks
+        summary = str(recording)
+        assert "Achieved rate:" in summary and "Sampling rate:" not in summary
+        assert "Query latency:" in summary and "Loop jitter:" in summary
+
+
+def test_jitter_with_uneven_latency():
+    instrumentation = RecorderInstrumentation(interval=0.1)
+    start = 0.0
+    for i in range(10):
+        query = 0.05 if i % 2 else 0.0
+        instrumentation.tick(start, query=query, callback=0.0, store=0.0)
+        # Exactly on schedule: the next tick starts after this tick's work and the interval
+        start += query + 0.1
+
+    stats = instrumentation.stats()
+    assert stats.jitter.count == 9
+    assert stats.jitter.maximum == pytest.approx(0.0, abs=1e-9)
+    assert stats.missed_ticks == 0
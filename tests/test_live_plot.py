@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.consts import SEC
+from gpulink.plotting.live_plot import LivePlot
+
+
+@pytest.fixture
+def device_ctx():
+    return gpu.DeviceCtx(device=gpu.DeviceMock)
+
+
+def test_update_appends_new_samples(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.Recorder.create_temperature_recorder(ctx, ctx.gpus.ids)
+        live_plot = LivePlot(rec, window=10, max_points=10)
+
+        for i in range(3):
+            rec._recordings[0].add_record(i * SEC, i)
+        lines = live_plot.update()
+        np.testing.assert_equal(lines[0].get_xdata(True), [-2, -1, 0])
+        np.testing.assert_equal(lines[0].get_ydata(True), [0, 1, 2])
+        assert len(lines[1].get_xdata(True)) == 0
+
+        rec._recordings[0].add_record(3 * SEC, 3)
+        lines = live_plot.update()
+        np.testing.assert_equal(lines[0].get_xdata(True), [-3, -2, -1, 0])
+
+
+def test_update_keeps_point_budget(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.Recorder.create_temperature_recorder(ctx, ctx.gpus.ids)
+        live_plot = LivePlot(rec, window=1, max_points=10)
+
+        # 1000 samples per second, but only one sample per 0.1 s fits into the point budget
+        for i in range(2000):
+            rec._recordings[0].add_record(i * SEC // 1000, 100)
+        lines = live_plot.update()
+
+        assert len(lines[0].get_xdata(True)) == 10
+        assert live_plot._ax.get_ylim()[1] > 100
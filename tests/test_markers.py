@@ -0,0 +1,186 @@
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.consts import SEC
+from gpulink.recording.markers import read_markers, attach_markers, detach_markers, _MarkerBuffer
+
+
+@pytest.fixture
+def device_ctx():
+    return gpu.DeviceCtx(device=gpu.DeviceMock)
+
+
+def _recording(rtype, data, unit, events):
+    timestamps = np.arange(len(data), dtype=np.int64) * int(SEC)
+    return gpu.Recording(
+        gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_TEST")]),
+        timeseries=[gpu.TimeSeries(timestamps, np.array(data))],
+        rtype=rtype,
+        name="test",
+        unit=unit,
+        markers=gpu.Markers.from_events(events))
+
+
+def _mark(second, name, value=np.nan):
+    return int(second * SEC), int(second * SEC), name, value, False
+
+
+def _span(start, end, name, value=np.nan):
+    return int(start * SEC), int(end * SEC), name, value, True
+
+
+def test_mark_without_recording():
+    cursor = attach_markers()
+    detach_markers(cursor)
+    gpu.mark("step", 0)
+    with gpu.span("epoch"):
+        pass
+    cursor = attach_markers()
+    assert len(read_markers(cursor)) == 0
+    detach_markers(cursor)
+
+
+def test_marker_buffer_is_bounded():
+    clock = gpu.Clock(lambda: 0, "fixed")
+    buffer = _MarkerBuffer(capacity=8)
+    event = ((clock,), (0,), (0,), "step", np.nan, False)
+    cursor = buffer.attach(clock)
+    for _ in range(20):
+        buffer.append(event)
+    assert len(buffer._events) < 8
+    markers = buffer.read(cursor, clock)
+    assert len(markers) + markers.dropped == 20
+
+    # Markers before the oldest attached cursor are dropped when detaching
+    late = buffer.attach(clock)
+    buffer.append(event)
+    buffer.detach(cursor, clock)
+    assert len(buffer._events) == 1
+    assert len(buffer.read(late, clock)) == 1 and buffer.read(late, clock).dropped == 0
+    buffer.detach(late, clock)
+    assert buffer._events == []
+
+
+def test_recorder_markers(device_ctx):
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_memory_recorder(ctx, ctx.gpus.ids)
+        with recorder:
+            gpu.mark("step", 1)
+            with gpu.span("epoch", 0):
+                gpu.mark("step", 2)
+        gpu.mark("step", 3)
+        markers = recorder.get_recording().markers
+
+    assert markers.names.tolist() == ["step", "step", "epoch"]
+    assert markers.values.tolist() == [1, 2, 0]
+    assert markers.spans.tolist() == [False, False, True]
+    assert markers.starts[2] <= markers.starts[1] <= markers.ends[2]
+
+
+def test_markers_use_device_clock(device_ctx):
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_memory_recorder(ctx, ctx.gpus.ids)
+        cursor = attach_markers(recorder._clock)
+        recorder._fetch_and_store()
+        gpu.mark("step")
+        recorder._fetch_and_store()
+        markers = detach_markers(cursor, recorder._clock)
+        timestamps = recorder.get_recording().timeseries[0].timestamps
+    # The mock device counts ticks, the marker lies between the two samples
+    assert timestamps[0] < markers.starts[0] <= timestamps[1]
+
+
+def test_markers_per_clock():
+    fixed = gpu.Clock(lambda: 42, "fixed")
+    default_cursor, fixed_cursor = attach_markers(), attach_markers(fixed)
+    with gpu.span("epoch"):
+        gpu.mark("step")
+    fixed_markers = detach_markers(fixed_cursor, fixed)
+    default_markers = detach_markers(default_cursor)
+    assert fixed_markers.starts.tolist() == [42, 42] and fixed_markers.ends.tolist() == [42, 42]
+    assert default_markers.names.tolist() == ["step", "epoch"]
+    assert np.all(default_markers.starts > 42)
+
+
+def test_shared_record_markers():
+    @gpu.record(rtype=gpu.RecType.REC_TYPE_MEMORY, ctx_class=gpu.DeviceMock, shared=True)
+    def step():
+        gpu.mark("inner")
+
+    try:
+        res = step()
+    finally:
+        gpu.release_shared_samplers()
+    assert res.recording.markers.names.tolist() == ["inner"]
+
+
+def test_intervals():
+    markers = gpu.Markers.from_events([_mark(1, "step", 0), _span(0, 5, "epoch"), _mark(3, "step", 1)])
+    starts, ends, values = markers.intervals("step")
+    assert starts.tolist() == [SEC, 3 * SEC]
+    assert ends[0] == 3 * SEC and ends[1] == np.iinfo(np.int64).max
+    assert values.tolist() == [0, 1]
+    starts, ends, _ = markers.intervals("epoch")
+    assert starts.tolist() == [0] and ends.tolist() == [5 * SEC]
+    assert len(markers.intervals("missing")[0]) == 0
+
+
+def test_peak_memory_per_step():
+    data = [1, 5, 2, 2, 9, 3, 1, 1, 7, 4]
+    recording = _recording(gpu.RecType.REC_TYPE_MEMORY, data, "MB",
+                           [_mark(0, "step", 0), _mark(3, "step", 1), _mark(6, "step", 2), _mark(9.5, "step", 3)])
+    stats, = recording.span_stats("step")
+    assert stats.values.tolist() == [0, 1, 2, 3]
+    # Samples on a boundary belong to both adjacent steps
+    assert stats.maximum[:3].tolist() == [5, 9, 7]
+    assert stats.count.tolist() == [4, 4, 4, 0]
+    assert np.isnan(stats.maximum[3]) and np.isnan(stats.mean[3])
+    assert stats.mean[0] == pytest.approx(2.5)
+    assert stats.minimum[:3].tolist() == [1, 1, 1]
+    assert stats.energy is None
+
+
+def test_energy_per_epoch():
+    recording = _recording(gpu.RecType.REC_TYPE_POWER_USAGE, [2000.0] * 10, "mW",
+                           [_span(0, 4, "epoch", 0), _span(4, 9, "epoch", 1), _span(8.5, 20, "epoch", 2)])
+    stats, = recording.span_stats("epoch")
+    # 2 W over 4, 5 and the remaining 0.5 seconds
+    assert stats.energy.tolist() == pytest.approx([8.0, 10.0, 1.0])
+
+
+def test_energy_counter_per_step():
+    recording = _recording(gpu.RecType.REC_TYPE_ENERGY, [i * 1000 for i in range(10)], "mJ",
+                           [_mark(1, "step"), _mark(4, "step")])
+    stats, = recording.span_stats("step")
+    assert stats.energy.tolist() == pytest.approx([3.0, 5.0])
+
+
+def test_storage_roundtrip(tmp_path):
+    recording = _recording(gpu.RecType.REC_TYPE_MEMORY, [1, 2, 3], "MB", [_mark(1, "step", 1), _span(0, 2, "epoch")])
+    gpu.save_recording(recording, tmp_path / "markers.rec")
+    markers = gpu.load_recording(tmp_path / "markers.rec").markers
+    assert markers.names.tolist() == ["step", "epoch"]
+    assert markers.values[0] == 1 and np.isnan(markers.values[1])
+    assert markers.starts.tolist() == recording.markers.starts.tolist()
+    assert markers.ends.tolist() == recording.markers.ends.tolist()
+    assert markers.spans.tolist() == [False, True]
+
+
+def test_plot_markers():
+    recording = _recording(gpu.RecType.REC_TYPE_MEMORY, [1, 2, 3, 4], "MB", [_mark(1, "step", 1), _span(0, 2, "epoch")])
+    ax = gpu.Plot(recording).render().axes[0]
+    assert [text.get_text() for text in ax.texts] == ["step 1", "epoch"]
+    assert not gpu.Plot(recording, markers=False).render().axes[0].texts
+
+
+def test_plot_markers_shared_origin():
+    timeseries = [gpu.TimeSeries(np.arange(4, dtype=np.int64) * int(SEC) + offset, np.arange(4)) for offset in (0, SEC)]
+    recording = gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0"), gpu.Gpu(1, "GPU_1")]), timeseries=timeseries,
+                              rtype=gpu.RecType.REC_TYPE_MEMORY, name="test", unit="MB",
+                              markers=gpu.Markers.from_events([_mark(2, "step", 1)]))
+    ax = gpu.Plot(recording).render().axes[0]
+    # All GPUs share a time axis starting at the earliest sample, markers are drawn once
+    assert ax.lines[1].get_xdata(True)[0] == 1
+    assert [line.get_xdata()[0] for line in ax.lines[2:]] == [2]
+    assert [text.get_text() for text in ax.texts] == ["step 1"]
@@ -0,0 +1,73 @@
+from operator import attrgetter, methodcaller
+
+import pytest
+
+import gpulink as gpu
+from gpulink.devices.device_mock import TEST_GB, TEST_TEMP
+from gpulink.recording.energy import cumulative_energy
+
+
+@pytest.fixture
+def device_ctx():
+    return gpu.DeviceCtx(device=gpu.DeviceMock)
+
+
+@pytest.fixture
+def restore_memory_metric():
+    metric = gpu.get_metric(gpu.RecType.REC_TYPE_MEMORY)
+    yield
+    gpu.register_metric(metric, replace=True)
+
+
+def test_all_rtypes_registered():
+    for rtype in gpu.RecType:
+        assert gpu.get_metric(rtype).rtype == rtype
+
+
+def test_create_recorder_units(device_ctx):
+    units = {gpu.RecType.REC_TYPE_MEMORY: "Byte", gpu.RecType.REC_TYPE_TEMPERATURE: "°C",
+             gpu.RecType.REC_TYPE_POWER_USAGE: "mW", gpu.RecType.REC_TYPE_ENERGY: "mJ",
+             gpu.RecType.REC_TYPE_PCIE_TX: "KB/s", gpu.RecType.REC_TYPE_CLOCK_SM: "MHz",
+             gpu.RecType.REC_TYPE_THROTTLE_REASONS: "Bitmask", gpu.RecType.REC_TYPE_UTILIZATION_GPU: "%"}
+    with device_ctx as ctx:
+        for rtype, unit in units.items():
+            recorder = gpu.Recorder.create_recorder(ctx, rtype)
+            assert recorder.rtype == rtype
+            assert recorder.unit == unit
+
+
+def test_compiled_metric(device_ctx):
+    metric = gpu.get_metric(gpu.RecType.REC_TYPE_TEMPERATURE)
+    cmd, extract = metric.compile([1])
+    assert isinstance(cmd, methodcaller) and isinstance(extract, attrgetter)
+    assert metric.compile([1]) == (cmd, extract)
+    with device_ctx as ctx:
+        assert [extract(result) for result in cmd(ctx)] == [TEST_TEMP]
+
+
+def test_register_metric(device_ctx, restore_memory_metric):
+    with pytest.raises(ValueError):
+        gpu.register_metric(gpu.Metric(gpu.RecType.REC_TYPE_MEMORY, "MB", "get_memory_info", "used"))
+
+    gpu.register_metric(gpu.Metric(gpu.RecType.REC_TYPE_MEMORY, "GB", "get_memory_info", "total", scale=1e-9),
+                        replace=True)
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_recorder(ctx, gpu.RecType.REC_TYPE_MEMORY)
+        recorder._fetch_and_store()
+        recording = recorder.get_recording()
+    assert recording.unit == "GB"
+    assert [ts.data.tolist() for ts in recording.timeseries] == [[TEST_GB * 1e-9], [TEST_GB * 1e-9]]
+
+
+def test_energy_fallback(device_ctx, mocker):
+    mocker.patch.object(gpu.DeviceMock, "get_energy_consumption", side_effect=NotImplementedError)
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_energy_recorder(ctx)
+    assert recorder.rtype == gpu.RecType.REC_TYPE_ENERGY
+    assert recorder._transform is cumulative_energy
+
+
+def test_buffered_requires_sampling_type(device_ctx):
+    with device_ctx as ctx:
+        with pytest.raises(ValueError):
+            gpu.Recorder.create_recorder(ctx, gpu.RecType.REC_TYPE_MEMORY, buffered=True)
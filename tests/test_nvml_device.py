@@ -4,6 +4,8 @@ Tests for the LocalNvmlGpu using patched nvml functions
 
 from collections import namedtuple
 
+import numpy as np
+import pynvml
 import pytest
 
 import gpulink as gpu
@@ -13,6 +15,11 @@ _GB = int(1e9)
 MemoryInfo = namedtuple('MemoryInfo', 'total used free')
 FanSpeed = namedtuple('FanSpeed', 'speed')
 Temperature = namedtuple('Temperature', 'temperature')
+Utilization = namedtuple('Utilization', 'gpu memory')
+Sample = namedtuple('Sample', 'timeStamp sampleValue')
+SampleValue = namedtuple('SampleValue', 'uiVal')
+ProcessInfo = namedtuple('ProcessInfo', 'pid usedGpuMemory')
+ProcessUtilization = namedtuple('ProcessUtilization', 'pid timeStamp smUtil memUtil')
 
 time = 0
 
@@ -20,12 +27,24 @@ _FAN_SPEED_PCT = 100
 _TMP = 30
 _CLOCK = 100
 _POWER_CONSUMPTION = 30
+_ENERGY = 3000
+
+
+class _FrozenClock(gpu.Clock):
+    """
+    Stamps all results with 0 and maps timestamps to the same wall time.
+    """
+
+    def __init__(self):
+        super().__init__(lambda: 0, "frozen")
+
+    def anchor(self) -> gpu.ClockAnchor:
+        return gpu.ClockAnchor(self.name, 0, 0)
 
 
 @pytest.fixture(autouse=True)
 def patch_nvcontext(mocker):
-    time = 0
-    mocker.patch("gpulink.devices.nvml_device.time_ns", return_value=time)
+    mocker.patch("gpulink.devices.nvml_device.default_clock", return_value=_FrozenClock())
     mocker.patch("gpulink.devices.nvml_device.nvmlInit")
     mocker.patch("gpulink.devices.nvml_device.nvmlShutdown")
     mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetCount", return_value=2)
@@ -40,6 +59,19 @@ def patch_nvcontext(mocker):
     mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetClock", return_value=_CLOCK // 2)
     mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetClockInfo", return_value=_CLOCK)
     mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetPowerUsage", return_value=_POWER_CONSUMPTION)
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetTotalEnergyConsumption", return_value=_ENERGY)
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetComputeRunningProcesses",
+                 return_value=[ProcessInfo(pid=10, usedGpuMemory=_GB // 4), ProcessInfo(pid=11, usedGpuMemory=None)])
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetProcessUtilization",
+                 return_value=[ProcessUtilization(pid=10, timeStamp=1, smUtil=10, memUtil=5),
+                               ProcessUtilization(pid=10, timeStamp=2, smUtil=20, memUtil=10)])
+    mocker.patch("gpulink.devices.nvml_device.nvmlSystemGetProcessName", return_value="train.py")
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetUtilizationRates", return_value=Utilization(80, 40))
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetPcieThroughput", return_value=1000)
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetCurrentClocksThrottleReasons", return_value=0x4)
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetSamples",
+                 return_value=(pynvml.NVML_VALUE_TYPE_UNSIGNED_INT, [Sample(1, SampleValue(10)),
+                                                                     Sample(2, SampleValue(20))]))
 
 
 def test_gpus():
@@ -107,3 +139,105 @@ def test_get_power_usage():
             gpu.SimpleResult(gpu_idx=0, timestamp=0, gpu_name="GPU_TEST", value=_POWER_CONSUMPTION),
             gpu.SimpleResult(gpu_idx=1, timestamp=0, gpu_name="GPU_TEST", value=_POWER_CONSUMPTION)
         ]
+
+
+def test_get_energy_consumption():
+    with gpu.DeviceCtx() as ctx:
+        assert ctx.get_energy_consumption(gpus=[1]) == [
+            gpu.SimpleResult(gpu_idx=1, timestamp=0, gpu_name="GPU_TEST", value=_ENERGY)
+        ]
+
+
+def test_get_energy_consumption_not_supported(mocker):
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetTotalEnergyConsumption",
+                 side_effect=pynvml.NVMLError(pynvml.NVML_ERROR_NOT_SUPPORTED))
+    with gpu.DeviceCtx() as ctx:
+        with pytest.raises(NotImplementedError):
+            ctx.get_energy_consumption()
+
+
+def test_get_processes():
+    with gpu.DeviceCtx() as ctx:
+        assert ctx.get_processes(gpus=[0]) == [
+            gpu.ProcessResult(gpu_idx=0, timestamp=0, gpu_name="GPU_TEST", processes=[
+                gpu.ProcessInfo(pid=10, name="train.py", used_memory=_GB // 4, sm_util=20, mem_util=10),
+                gpu.ProcessInfo(pid=11, name="train.py", used_memory=None, sm_util=None, mem_util=None)
+            ])
+        ]
+
+
+def test_get_processes_without_utilization_samples(mocker):
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetProcessUtilization",
+                 side_effect=pynvml.NVMLError(pynvml.NVML_ERROR_NOT_FOUND))
+    with gpu.DeviceCtx() as ctx:
+        result = ctx.get_processes(gpus=[0])
+        assert [p.sm_util for p in result[0].processes] == [None, None]
+
+
+def test_get_processes_without_utilization_support(mocker):
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetProcessUtilization",
+                 side_effect=pynvml.NVMLError(pynvml.NVML_ERROR_NOT_SUPPORTED))
+    with gpu.DeviceCtx() as ctx:
+        processes = ctx.get_processes(gpus=[0])[0].processes
+        assert [(p.pid, p.used_memory) for p in processes] == [(10, _GB // 4), (11, None)]
+        assert [(p.sm_util, p.mem_util) for p in processes] == [(None, None), (None, None)]
+
+
+def test_get_utilization():
+    with gpu.DeviceCtx() as ctx:
+        assert ctx.get_utilization(gpus=[0]) == [
+            gpu.UtilizationInfo(gpu_idx=0, timestamp=0, gpu_name="GPU_TEST", gpu=80, memory=40)
+        ]
+
+
+def test_get_pcie_throughput_and_throttle_reasons():
+    with gpu.DeviceCtx() as ctx:
+        assert ctx.get_pcie_throughput(gpu.PcieUtilCounter.PCIE_UTIL_RX_BYTES, gpus=[0])[0].value == 1000
+        assert ctx.get_throttle_reasons(gpus=[0])[0].value == gpu.ThrottleReason.SW_POWER_CAP
+
+
+def test_get_samples():
+    with gpu.DeviceCtx() as ctx:
+        # Sample timestamps are converted from microseconds to nanoseconds
+        assert ctx.get_samples(gpu.SamplingType.GPU_UTILIZATION_SAMPLES, gpus=[0]) == [
+            gpu.SampleResult(gpu_idx=0, timestamp=0, gpu_name="GPU_TEST", timestamps=[1000, 2000], values=[10, 20])
+        ]
+
+
+def test_get_samples_empty_buffer(mocker):
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetSamples",
+                 side_effect=pynvml.NVMLError(pynvml.NVML_ERROR_NOT_FOUND))
+    with gpu.DeviceCtx() as ctx:
+        assert ctx.get_samples(gpu.SamplingType.GPU_UTILIZATION_SAMPLES, gpus=[0])[0].values == []
+
+
+def test_buffered_recorder_with_overlapping_driver_samples(mocker):
+    value_type = pynvml.NVML_VALUE_TYPE_UNSIGNED_INT
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetSamples", side_effect=[
+        (value_type, [Sample(1, SampleValue(10)), Sample(2, SampleValue(20))]),
+        (value_type, [Sample(2, SampleValue(20)), Sample(3, SampleValue(30)), Sample(4, SampleValue(40))]),
+    ])
+    with gpu.DeviceCtx() as ctx:
+        rec = gpu.Recorder.create_power_usage_recorder(ctx, gpus=[0], buffered=True)
+        rec._fetch_and_store()
+        rec._fetch_and_store()
+
+        assert rec.get_recording().timeseries == [
+            gpu.TimeSeries(np.array([1000, 2000, 3000, 4000]), np.array([10, 20, 30, 40]))
+        ]
+
+
+def test_get_samples_clock_domain(mocker):
+    class _ShiftedClock(_FrozenClock):
+        def anchor(self) -> gpu.ClockAnchor:
+            # The clock reads 5000 ns at the wall time of 1000 ns
+            return gpu.ClockAnchor(self.name, 5000, 1000)
+
+    mocker.patch("gpulink.devices.nvml_device.default_clock", return_value=_ShiftedClock())
+    get_samples = mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetSamples",
+                               return_value=(pynvml.NVML_VALUE_TYPE_UNSIGNED_INT, [Sample(2, SampleValue(10))]))
+    with gpu.DeviceCtx() as ctx:
+        result = ctx.get_samples(gpu.SamplingType.GPU_UTILIZATION_SAMPLES, since=5000, gpus=[0])
+    # Wall time [µs] is converted into the clock domain and back
+    assert get_samples.call_args[0][2] == 1
+    assert result[0].timestamps == [6000]
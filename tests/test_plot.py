@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+from matplotlib import pyplot as plt
 
 import gpulink as gpu
 from gpulink.consts import SEC
@@ -49,3 +50,86 @@ def test_generate_graph_with_autoscale(device_ctx, time_series):
         np.testing.assert_equal(gpu2.get_xdata(True), time_expected)
         np.testing.assert_equal(gpu1.get_ydata(True), time_series[0].data)
         np.testing.assert_equal(gpu2.get_ydata(True), time_series[1].data)
+
+
+def test_render_does_not_use_pyplot(device_ctx, time_series):
+    with device_ctx as ctx:
+        recording = gpu.Recording(
+            gpus=ctx.gpus,
+            timeseries=time_series,
+            rtype=gpu.RecType.REC_TYPE_TEMPERATURE,
+            name="Test Recording",
+            unit="°C"
+        )
+
+        plt.close("all")
+        fig = gpu.Plot(recording).render()
+
+        assert plt.get_fignums() == []
+        ax = fig.axes[0]
+        assert ax.get_title() == "Test Recording"
+        np.testing.assert_equal(ax.lines[1].get_ydata(True), time_series[1].data)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_save_plots(tmp_path, device_ctx, time_series, processes):
+    with device_ctx as ctx:
+        recordings = [
+            gpu.Recording(gpus=ctx.gpus, timeseries=time_series, rtype=gpu.RecType.REC_TYPE_TEMPERATURE,
+                          name=f"Recording {i}", unit="°C")
+            for i in range(3)
+        ]
+        paths = [tmp_path / f"plot_{i}.png" for i in range(3)]
+
+        gpu.save_plots(recordings, paths, processes=processes)
+
+        assert all(path.stat().st_size > 0 for path in paths)
+
+
+def test_dashboard_shares_time_axis(device_ctx, time_series):
+    with device_ctx as ctx:
+        shifted = [gpu.TimeSeries(ts.timestamps + 5 * SEC, ts.data) for ts in time_series]
+        recordings = [
+            gpu.Recording(gpus=ctx.gpus, timeseries=time_series, rtype=gpu.RecType.REC_TYPE_TEMPERATURE,
+                          name="Temperature", unit="°C"),
+            gpu.Recording(gpus=ctx.gpus, timeseries=shifted, rtype=gpu.RecType.REC_TYPE_POWER_USAGE,
+                          name="Power", unit="W")
+        ]
+
+        fig = gpu.Dashboard(recordings, name="Run").render()
+
+        assert len(fig.axes) == 2
+        assert fig.axes[0].get_ylabel() == "Temperature [°C]"
+        assert fig.axes[1].get_ylabel() == "Power Usage [W]"
+        assert fig.axes[0].get_shared_x_axes().joined(fig.axes[0], fig.axes[1])
+        np.testing.assert_equal(fig.axes[0].lines[0].get_xdata(True), time_series[0].timestamps / SEC)
+        np.testing.assert_equal(fig.axes[1].lines[0].get_xdata(True), time_series[0].timestamps / SEC + 5)
+
+
+def test_dashboard_decimation(device_ctx, time_series):
+    with device_ctx as ctx:
+        recording = gpu.Recording(gpus=ctx.gpus, timeseries=time_series, rtype=gpu.RecType.REC_TYPE_TEMPERATURE,
+                                  name="Temperature", unit="°C")
+
+        fig = gpu.Dashboard([recording], max_points=4).render()
+
+        # The minimum and maximum of two buckets of five samples
+        line = fig.axes[0].lines[0]
+        np.testing.assert_equal(line.get_xdata(True), np.array([0, 4, 5, 9]) / SEC)
+        np.testing.assert_equal(line.get_ydata(True), time_series[0].data[[0, 4, 5, 9]])
+
+
+def test_dashboard_decimation_keeps_peaks(device_ctx):
+    data = np.full(1001, 100)
+    data[[123, 124]] = 8000
+    data[777] = 0
+    with device_ctx as ctx:
+        recording = gpu.Recording(gpus=gpu.GpuSet([ctx.gpus[0]]), timeseries=[gpu.TimeSeries(np.arange(1001), data)],
+                                  rtype=gpu.RecType.REC_TYPE_MEMORY, name="Memory", unit="MB")
+
+        fig = gpu.Dashboard([recording], max_points=10).render()
+
+        y_data = fig.axes[0].lines[0].get_ydata(True)
+        assert len(y_data) <= 10
+        assert y_data.max() == 8000 and y_data.min() == 0
+        assert np.all(np.diff(fig.axes[0].lines[0].get_xdata(True)) > 0)
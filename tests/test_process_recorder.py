@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.devices.device_mock import TEST_GB
+
+
+@pytest.fixture
+def device_ctx():
+    return gpu.DeviceCtx(device=gpu.DeviceMock)
+
+
+def test_fetch_and_return_data(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.ProcessRecorder(ctx)
+        for i in range(3):
+            rec._fetch_and_store()
+
+        recording = rec.get_recording()
+        assert recording.gpus == ctx.gpus
+        assert recording.pids == [1000, 1001, 1002]
+        assert recording.get_pids(0) == [1000]
+        assert recording.get_pids(1) == [1001, 1002]
+        assert recording.process_names == {1000: "train.py", 1001: "train.py", 1002: "eval.py"}
+        assert recording.get_memory(1, 1002) == gpu.TimeSeries(np.array([0, 1, 2]), np.array([TEST_GB // 8] * 3))
+        assert recording.get_sm_util(0, 1000) == gpu.TimeSeries(np.array([0, 1, 2]), np.array([80] * 3))
+        assert recording.used_memory.dtype == np.int64
+        assert recording.sm_util.dtype == np.int16
+
+
+def test_record_using_context_manager(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.ProcessRecorder(ctx, gpus=[1], name="Processes")
+        with rec:
+            time.sleep(0.1)
+
+        recording = rec.get_recording()
+        assert recording.name == "Processes"
+        assert recording.get_pids(0) == []
+        assert recording.get_memory(1, 1001).data.size > 0
+        assert "eval.py" in str(recording)
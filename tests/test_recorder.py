@@ -4,7 +4,8 @@ import numpy as np
 import pytest
 
 import gpulink as gpu
-from gpulink.devices.device_mock import TEST_GB
+from gpulink.devices.device_mock import TEST_GB, TEST_ENERGY_PER_TICK, TEST_POWER_CONSUMPTION, \
+    TEST_SAMPLES_PER_QUERY
 
 
 @pytest.fixture
@@ -114,7 +115,13 @@ unit_map = {
     gpu.RecType.REC_TYPE_POWER_USAGE: "mW",
     gpu.RecType.REC_TYPE_FAN_SPEED: "%",
     gpu.RecType.REC_TYPE_TEMPERATURE: "°C",
-    gpu.RecType.REC_TYPE_MEMORY: "Byte"
+    gpu.RecType.REC_TYPE_MEMORY: "Byte",
+    gpu.RecType.REC_TYPE_ENERGY: "mJ",
+    gpu.RecType.REC_TYPE_UTILIZATION_GPU: "%",
+    gpu.RecType.REC_TYPE_UTILIZATION_MEMORY: "%",
+    gpu.RecType.REC_TYPE_PCIE_TX: "KB/s",
+    gpu.RecType.REC_TYPE_PCIE_RX: "KB/s",
+    gpu.RecType.REC_TYPE_THROTTLE_REASONS: "Bitmask"
 }
 
 
@@ -135,3 +142,176 @@ def test_recording_with_all_rec_types(device_ctx):
             assert recording.rtype == rec_type
             assert recording.name == rec_type.value
             assert recording.unit == unit_map[rec_type]
+
+
+class DeviceMockWithoutEnergyCounter(gpu.DeviceMock):
+    def get_energy_consumption(self, gpus=None):
+        raise NotImplementedError()
+
+
+def test_energy_recorder_uses_energy_counter(device_ctx, mocker):
+    with device_ctx as ctx:
+        # The counter counts since the driver was loaded
+        ctx.get_energy_consumption()
+        query = mocker.spy(gpu.DeviceMock, "get_energy_consumption")
+        rec = gpu.Recorder.create_energy_recorder(ctx, ctx.gpus.ids)
+        for i in range(3):
+            rec._fetch_and_store()
+
+        recording = rec.get_recording()
+        assert recording.unit == "mJ"
+        # The energy is counted from the first sample after the recorder was created, not from the probe
+        assert query.call_count == 4
+        np.testing.assert_equal(recording.timeseries[0].timestamps, [2, 3, 4])
+        np.testing.assert_equal(recording.timeseries[0].data, [TEST_ENERGY_PER_TICK * t for t in [0, 1, 2]])
+        assert recording.get_energy() == [2 * TEST_ENERGY_PER_TICK / 1e3] * 2
+
+
+def test_energy_recorder_falls_back_to_power_integration():
+    with gpu.DeviceCtx(device=DeviceMockWithoutEnergyCounter) as ctx:
+        rec = gpu.Recorder.create_energy_recorder(ctx, ctx.gpus.ids)
+        rec._recordings[0].add_record(0, 1000)
+        rec._recordings[0].add_record(int(1e9), 3000)
+        rec._recordings[0].add_record(int(3e9), 3000)
+
+        recording = rec.get_recording()
+        assert recording.rtype == gpu.RecType.REC_TYPE_ENERGY
+        np.testing.assert_allclose(recording.timeseries[0].data, [0.0, 2000.0, 8000.0])
+        assert recording.get_energy()[0] == pytest.approx(8.0)
+
+
+def test_power_recording_energy_integration():
+    recording = gpu.Recording(
+        gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0")]),
+        timeseries=[gpu.TimeSeries(np.array([0, 1e9, 2e9]), np.array([TEST_POWER_CONSUMPTION] * 3))],
+        rtype=gpu.RecType.REC_TYPE_POWER_USAGE,
+        name="Power",
+        unit="mW"
+    )
+    assert recording.get_energy() == [pytest.approx(2 * TEST_POWER_CONSUMPTION / 1e3)]
+
+
+@pytest.mark.parametrize("device", [gpu.DeviceMock, DeviceMockWithoutEnergyCounter])
+def test_record_decorator_with_energy(device):
+    @gpu.record(ctx_class=device, rtype=gpu.RecType.REC_TYPE_TEMPERATURE, energy=True, interval=0.01)
+    def my_heavy_gpu_function():
+        time.sleep(0.1)
+
+    result = my_heavy_gpu_function()
+    assert len(result.energy) == 2
+    assert all(joules >= 0 for joules in result.energy)
+
+
+def test_record_using_interval(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.Recorder.create_memory_recorder(ctx, ctx.gpus.ids, interval=10)
+        with rec:
+            time.sleep(0.1)
+
+        # Only a single sample is taken before waiting - stopping interrupts the wait
+        assert rec.get_recording().timeseries[0].data.size == 1
+
+
+def test_buffered_recorder_drains_and_deduplicates(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.Recorder.create_power_usage_recorder(ctx, ctx.gpus.ids, buffered=True)
+        for i in range(3):
+            rec._fetch_and_store()
+
+        recording = rec.get_recording()
+        assert recording.rtype == gpu.RecType.REC_TYPE_POWER_USAGE
+        assert recording.unit == "mW"
+        # Each drain returns the overlapping sample of the previous drain which must be skipped
+        np.testing.assert_equal(recording.timeseries[0].timestamps, np.arange(3 * TEST_SAMPLES_PER_QUERY))
+        np.testing.assert_equal(recording.timeseries[1].data, [TEST_POWER_CONSUMPTION] * 3 * TEST_SAMPLES_PER_QUERY)
+
+
+def test_buffered_recorder_skips_samples_before_start(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.Recorder.create_recorder(ctx, gpu.RecType.REC_TYPE_UTILIZATION_GPU, buffered=True, interval=0.01)
+        with rec:
+            time.sleep(0.1)
+
+        timestamps = rec.get_recording().timeseries[0].timestamps
+        assert timestamps.size > 0
+        assert timestamps[0] >= TEST_SAMPLES_PER_QUERY
+        assert np.all(np.diff(timestamps) > 0)
+
+
+def test_buffered_recorder_not_supported(device_ctx):
+    with device_ctx as ctx:
+        with pytest.raises(ValueError):
+            gpu.Recorder.create_recorder(ctx, gpu.RecType.REC_TYPE_TEMPERATURE, buffered=True)
+
+
+def test_shared_sampler_nested_calls():
+    @gpu.record(ctx_class=gpu.DeviceMock, rtype=gpu.RecType.REC_TYPE_TEMPERATURE, shared=True)
+    def inner():
+        time.sleep(0.05)
+
+    @gpu.record(ctx_class=gpu.DeviceMock, rtype=gpu.RecType.REC_TYPE_TEMPERATURE, shared=True)
+    def outer():
+        time.sleep(0.05)
+        inner_result = inner()
+        time.sleep(0.05)
+        return inner_result
+
+    try:
+        result = outer()
+        outer_ts = result.recording.timeseries[0].timestamps
+        inner_ts = result.value.recording.timeseries[0].timestamps
+        assert result.recording.name == "outer"
+        assert result.value.recording.name == "inner"
+        assert inner_ts.size > 0
+        # The inner window is a slice of the outer window taken from the same buffer
+        assert set(inner_ts.tolist()) < set(outer_ts.tolist())
+        assert gpu.shared_sampler(gpu.RecType.REC_TYPE_TEMPERATURE, gpu.DeviceMock) is \
+            gpu.shared_sampler(gpu.RecType.REC_TYPE_TEMPERATURE, gpu.DeviceMock)
+    finally:
+        gpu.release_shared_samplers()
+
+
+def test_shared_sampler_drops_samples_when_idle():
+    try:
+        sampler = gpu.shared_sampler(gpu.RecType.REC_TYPE_MEMORY, gpu.DeviceMock, interval=0.01)
+        first = sampler.detach(sampler.attach(), name="first")
+        window = sampler.attach()
+        time.sleep(0.05)
+        second = sampler.detach(window)
+
+        assert first.name == "first"
+        assert second.timeseries[0].data.size > 0
+        assert np.all(second.timeseries[0].data == TEST_GB // 2)
+        # Samples taken while no window was attached are not kept
+        assert all(len(recording) == 0 for recording in sampler._recordings)
+    finally:
+        gpu.release_shared_samplers()
+    assert not sampler.is_alive()
+
+
+def test_stream_while_recording(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.Recorder.create_memory_recorder(ctx, interval=0.005)
+        rec.start()
+        batches = []
+        for samples in rec.stream(batch=8):
+            batches.append(samples)
+            if len(batches) == 3:
+                rec.stop(auto_join=False)
+
+        assert all(samples.dtype == gpu.SAMPLE_DTYPE for samples in batches)
+        assert all(samples.size == 8 for samples in batches[:-1])
+        streamed = np.concatenate(batches)
+        recording = rec.get_recording()
+        assert streamed.size == sum(ts.data.size for ts in recording.timeseries)
+        assert np.all(np.diff(streamed["timestamp"]) >= 0)
+        assert np.all(streamed["value"][streamed["gpu_idx"] == 1] == TEST_GB // 4)
+
+
+def test_stream_flushes_partial_batches(device_ctx):
+    with device_ctx as ctx:
+        rec = gpu.Recorder.create_temperature_recorder(ctx, gpus=[0], interval=0.01)
+        with rec:
+            samples = next(rec.stream(batch=1000000, flush_interval=0.05))
+        assert 0 < samples.size < 1000000
+        assert np.all(samples["gpu_idx"] == 0)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.consts import SEC
+from gpulink.recording import rollup
+
+
+@pytest.fixture
+def samples():
+    # Two hours of samples at 10 Hz with the value equal to the elapsed seconds
+    timestamps = np.arange(0, 2 * 3600 * SEC, SEC // 10, dtype=np.int64)
+    return timestamps, timestamps / SEC
+
+
+def test_tiers_aggregate_buckets(samples):
+    timestamps, values = samples
+    roll = gpu.Rollup(tiers=((1, 10000), (60, 1000)), raw_window=60)
+    roll.add_records(timestamps.tolist(), values.tolist())
+
+    minutes = roll.query(resolution=60)
+    assert minutes.width == 60 * SEC
+    assert minutes.timestamps.size == 120
+    np.testing.assert_allclose(minutes.data_min, np.arange(120) * 60)
+    np.testing.assert_allclose(minutes.data_max, np.arange(120) * 60 + 59.9)
+    np.testing.assert_allclose(minutes.data_mean, np.arange(120) * 60 + 29.95)
+    np.testing.assert_allclose(minutes.data_last, minutes.data_max)
+
+    seconds = roll.query(t0=10 * SEC, t1=19 * SEC, resolution=1)
+    assert seconds.width == SEC
+    np.testing.assert_allclose(seconds.data_min, np.arange(10, 20))
+
+
+def test_raw_samples_are_bounded(samples):
+    timestamps, values = samples
+    roll = gpu.Rollup(tiers=((1, 600), (3600, 10)), raw_window=60)
+    for start in range(0, timestamps.size, 500):
+        roll.add_records(timestamps[start:start + 500].tolist(), values[start:start + 500].tolist())
+
+    assert len(roll) == timestamps.size
+    assert len(roll.to_timeseries().timestamps) <= 60 * 10 + rollup._FLUSH_SIZE
+    assert roll.time_range == (0, timestamps[-1])
+
+    # Recent ranges are answered from raw samples, older ones from the finest tier still covering them
+    assert roll.query(t0=timestamps[-10]).width == 0
+    assert roll.query(t0=timestamps[-1] - 300 * SEC).width == SEC
+    old = roll.query(t0=0, t1=3600 * SEC - 1)
+    assert old.width == 3600 * SEC
+    np.testing.assert_allclose(old.data_max, [3599.9])
+
+
+def test_recorder_with_rollups():
+    with gpu.DeviceCtx(device=gpu.DeviceMock) as ctx:
+        rec = gpu.Recorder.create_memory_recorder(ctx).enable_rollups(raw_window=1)
+        for _ in range(5):
+            rec._fetch_and_store()
+
+        buckets = rec.get_rollup(1).query()
+        assert buckets.width == 0
+        assert buckets.data_mean.tolist() == [ctx.get_memory_info()[1].used] * 5
+        with pytest.raises(RuntimeError):
+            gpu.Recorder.create_memory_recorder(ctx).get_rollup(0)
@@ -0,0 +1,41 @@
+import os
+import signal
+import sys
+
+import gpulink as gpu
+from gpulink.cli.cmd_run import run_and_record, METRICS, _SignalForwarder
+
+
+def test_run_and_record():
+    command = [sys.executable, "-c", "import time, sys; time.sleep(0.2); sys.exit(3)"]
+    returncode, recordings = run_and_record(
+        command,
+        [gpu.RecType.REC_TYPE_MEMORY, gpu.RecType.REC_TYPE_POWER_USAGE],
+        device=gpu.DeviceMock,
+        interval=0.01
+    )
+
+    assert returncode == 3
+    assert [r.rtype for r in recordings] == [gpu.RecType.REC_TYPE_MEMORY, gpu.RecType.REC_TYPE_POWER_USAGE]
+    for recording in recordings:
+        assert recording.name == " ".join(command)
+        assert recording.gpus == gpu.GpuSet([gpu.Gpu(0, "GPU_0"), gpu.Gpu(1, "GPU_1")])
+        assert recording.timeseries[0].data.size > 0
+
+
+def test_metric_names():
+    assert METRICS["power-usage"] == gpu.RecType.REC_TYPE_POWER_USAGE
+    assert METRICS["clock-graphics"] == gpu.RecType.REC_TYPE_CLOCK_GRAPHICS
+    assert len(METRICS) == len(gpu.RecType)
+
+
+def test_signal_forwarding(mocker):
+    child = mocker.Mock()
+    previous = signal.getsignal(signal.SIGINT)
+    with _SignalForwarder(child):
+        # The terminal delivers SIGINT to the child itself
+        os.kill(os.getpid(), signal.SIGINT)
+        child.send_signal.assert_not_called()
+        os.kill(os.getpid(), signal.SIGTERM)
+        child.send_signal.assert_called_once_with(signal.SIGTERM)
+    assert signal.getsignal(signal.SIGINT) is previous
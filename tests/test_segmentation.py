@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.consts import SEC
+
+
+@pytest.fixture
+def phases():
+    # Loading, warmup, steady state and eval at 10 Hz with measurement noise
+    rng = np.random.default_rng(1)
+    levels = np.repeat([50.0, 150.0, 250.0, 120.0], [3000, 1000, 10000, 2000])
+    data = levels + rng.normal(0, 5, levels.size)
+    timestamps = np.arange(levels.size, dtype=np.int64) * SEC // 10
+    return gpu.TimeSeries(timestamps, data)
+
+
+def test_find_change_points(phases):
+    change_points = gpu.find_change_points(phases.data)
+    assert len(change_points) == 3
+    np.testing.assert_allclose(change_points, [3000, 4000, 14000], atol=2)
+
+
+def test_constant_data_has_single_segment():
+    assert gpu.find_change_points(np.full(1000, 7.0)) == []
+    assert gpu.find_change_points(np.repeat([1.0, 2.0], 500)) == [500]
+
+
+def test_segment_statistics(phases):
+    recording = gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(2, "GPU_2")]), timeseries=[phases],
+                              rtype=gpu.RecType.REC_TYPE_POWER_USAGE, name="Training", unit="W")
+    segments = recording.segments(2, labels=["loading", "warmup"])
+
+    assert [s.label for s in segments] == ["loading", "warmup", "Phase 3", "Phase 4"]
+    assert all(s.gpu == 2 for s in segments)
+    assert [round(s.mean, -1) for s in segments] == [50, 150, 250, 120]
+    assert all(4 < s.std < 6 for s in segments)
+    assert segments[2].duration == pytest.approx(1000, abs=0.5)
+    assert segments[0].start_idx == 0 and segments[-1].end_idx == phases.data.size
+
+
+def test_max_segments(phases):
+    assert len(gpu.segment_timeseries(phases, max_segments=2)) == 2
+
+
+def test_plot_with_segments(phases):
+    recording = gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0")]), timeseries=[phases],
+                              rtype=gpu.RecType.REC_TYPE_POWER_USAGE, name="Training", unit="W")
+    segments = recording.segments(0)
+    fig = gpu.Plot(recording, segments=segments).render()
+    ax = fig.axes[0]
+    assert [text.get_text() for text in ax.texts] == ["Phase 1", "Phase 2", "Phase 3", "Phase 4"]
+    assert len(ax.patches) == 4
@@ -0,0 +1,125 @@
+import functools
+import os
+
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.devices.device_mock import TEST_GB, TEST_TEMP, TEST_CLOCK, TEST_POWER_CONSUMPTION, TEST_GPU_UTIL, \
+    TEST_MEM_UTIL, TEST_FAN_SPEED_PCT
+from gpulink.devices.shm_device import shared_memory
+
+pytestmark = pytest.mark.skipif(shared_memory is None, reason="requires multiprocessing.shared_memory")
+
+
+@pytest.fixture
+def publisher():
+    with gpu.DeviceCtx(device=gpu.DeviceMock) as ctx:
+        publisher = gpu.TelemetryPublisher(ctx, name=f"gpulink_test_{os.getpid()}", capacity=4)
+        yield publisher
+        publisher.close()
+
+
+@pytest.fixture
+def consumer_ctx(publisher):
+    return gpu.DeviceCtx(device=functools.partial(gpu.SharedMemoryDevice, name=publisher.name))
+
+
+def test_read_latest_sample(publisher, consumer_ctx):
+    publisher.publish()
+    with consumer_ctx as ctx:
+        assert ctx.gpus == gpu.GpuSet([gpu.Gpu(0, "GPU_0"), gpu.Gpu(1, "GPU_1")])
+
+        mem_info = ctx.get_memory_info()
+        assert [m.total for m in mem_info] == [TEST_GB, TEST_GB]
+        with gpu.DeviceCtx(device=gpu.DeviceMock) as mock_ctx:
+            expected = mock_ctx.get_memory_info()
+        assert [(m.used, m.free) for m in mem_info] == [(m.used, m.free) for m in expected]
+        assert [r.value for r in ctx.get_temperature(gpu.TemperatureSensorType.GPU)] == [TEST_TEMP] * 2
+        assert [r.value for r in ctx.get_fan_speed()] == [TEST_FAN_SPEED_PCT // 2] * 2
+        assert [r.value for r in ctx.get_clock(gpu.ClockType.CLOCK_SM)] == [TEST_CLOCK] * 2
+        assert [r.value for r in ctx.get_power_usage(gpus=[1])] == [TEST_POWER_CONSUMPTION]
+        assert [(r.gpu, r.memory) for r in ctx.get_utilization()] == \
+            [(TEST_GPU_UTIL, TEST_MEM_UTIL), (TEST_GPU_UTIL // 2, TEST_MEM_UTIL // 2)]
+
+
+def test_read_history(publisher, consumer_ctx):
+    for _ in range(6):
+        publisher.publish()
+    with consumer_ctx as ctx:
+        history = ctx._device.get_history("temperature", samples=10)
+        assert list(history.keys()) == [0, 1]
+        timestamps, values = history[0]
+        # The ring buffer only keeps the most recent 'capacity' samples, oldest first
+        assert len(timestamps) == 4
+        assert np.all(np.diff(timestamps) > 0)
+        assert np.all(values == TEST_TEMP)
+
+
+def test_read_history_wrapping(publisher, consumer_ctx):
+    for _ in range(6):
+        publisher.publish()
+    with consumer_ctx as ctx:
+        device = ctx._device
+        timestamps, _ = device._read(4)
+        # The last four of six samples occupy slots 2, 3, 0 and 1
+        np.testing.assert_array_equal(timestamps, device._layout.timestamps[[2, 3, 0, 1]])
+        assert not np.shares_memory(device._read(2)[0], device._layout.timestamps)
+
+
+def test_interrupted_write(publisher, consumer_ctx, mocker):
+    publisher.publish()
+    mocker.patch("gpulink.devices.shm_device.READ_ATTEMPTS", 20)
+    sleep = mocker.patch("gpulink.devices.shm_device.time.sleep")
+    with consumer_ctx as ctx:
+        # A publisher which died while writing a sample leaves the sequence number odd
+        publisher._layout.header[0] += 1
+        with pytest.raises(RuntimeError):
+            ctx.get_temperature(gpu.TemperatureSensorType.GPU)
+        assert sleep.call_count == 20
+
+
+def test_unpublished_property(publisher, consumer_ctx):
+    publisher.publish()
+    with consumer_ctx as ctx:
+        with pytest.raises(NotImplementedError):
+            ctx._device.get_history("unknown", samples=1)
+        with pytest.raises(NotImplementedError):
+            ctx.get_temperature_threshold(gpu.TemperatureThreshold.TEMPERATURE_THRESHOLD_SHUTDOWN)
+
+
+def test_oversized_metadata_creates_no_block(mocker):
+    mocker.patch("gpulink.devices.shm_device.META_SIZE", 8)
+    create = mocker.spy(shared_memory, "SharedMemory")
+    with gpu.DeviceCtx(device=gpu.DeviceMock) as ctx:
+        with pytest.raises(ValueError):
+            gpu.TelemetryPublisher(ctx, name=f"gpulink_test_meta_{os.getpid()}")
+    create.assert_not_called()
+
+
+def test_failed_samples(publisher, consumer_ctx, mocker):
+    publisher.publish()
+    publish = mocker.patch.object(publisher, "publish", side_effect=[RuntimeError("GPU lost"), None])
+    with consumer_ctx as ctx:
+        failures = []
+
+        def wait(_):
+            failures.append(ctx._device.failed_samples)
+            if len(failures) == 2:
+                publisher.stop(auto_join=False)
+
+        mocker.patch.object(publisher, "wait", side_effect=wait)
+        # The publisher keeps running after a failed sample and readers see the failure
+        publisher.run()
+        assert publish.call_count == 2
+        assert failures == [1, 1]
+        assert ctx.get_temperature(gpu.TemperatureSensorType.GPU)[0].value == TEST_TEMP
+        # Until the next sample is published
+        gpu.TelemetryPublisher.publish(publisher)
+        assert ctx._device.failed_samples == 0
+
+
+def test_missing_publisher():
+    with pytest.raises(RuntimeError):
+        with gpu.DeviceCtx(device=functools.partial(gpu.SharedMemoryDevice, name="gpulink_test_missing")):
+            pass
@@ -0,0 +1,32 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from gpulink.cli.stop import StopCondition, pid_alive
+
+
+def test_stop_after_duration():
+    start = time.monotonic()
+    with StopCondition(duration=0.1) as stop_condition:
+        assert stop_condition.wait() == "duration elapsed"
+    assert time.monotonic() - start >= 0.1
+
+
+def test_stop_when_process_exits():
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.2)"])
+    with StopCondition(until_pid=child.pid) as stop_condition:
+        # Reap the child in the background, otherwise it stays a zombie which is still alive
+        threading.Thread(target=child.wait).start()
+        assert stop_condition.wait() == f"process {child.pid} exited"
+    assert not pid_alive(child.pid)
+
+
+def test_stop_on_sigterm():
+    previous = signal.getsignal(signal.SIGTERM)
+    with StopCondition() as stop_condition:
+        threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGTERM)).start()
+        assert stop_condition.wait() == "SIGTERM"
+    assert signal.getsignal(signal.SIGTERM) == previous
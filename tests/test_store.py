@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt
+
+import gpulink as gpu
+from gpulink.plotting.store_view import StoreView
+from gpulink.recording.store import BLOCK_SIZE
+
+
+@pytest.fixture
+def recording():
+    n = 100_000
+    timestamps = np.arange(n, dtype=np.int64) * 1000
+    return gpu.Recording(
+        gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0"), gpu.Gpu(1, "GPU_1")]),
+        timeseries=[
+            gpu.TimeSeries(timestamps, np.arange(n, dtype=np.int64)),
+            gpu.TimeSeries(timestamps[:10], np.linspace(0, 1, 10))
+        ],
+        rtype=gpu.RecType.REC_TYPE_MEMORY,
+        name="Store Test",
+        unit="Byte"
+    )
+
+
+@pytest.fixture
+def stored(tmp_path, recording):
+    path = tmp_path / "test.rec"
+    gpu.save_recording(recording, path)
+    return path
+
+
+def test_save_and_load_recording(stored, recording):
+    loaded = gpu.load_recording(stored)
+    assert loaded.gpus == recording.gpus
+    assert loaded.timeseries == recording.timeseries
+    assert loaded.rtype == recording.rtype
+    assert loaded.name == recording.name
+    assert loaded.unit == recording.unit
+
+
+def test_load_invalid_file(tmp_path):
+    path = tmp_path / "invalid.rec"
+    path.write_bytes(b"no recording at all")
+    with pytest.raises(ValueError, match="is not a gpulink recording"):
+        gpu.load_recording(path)
+
+
+def test_window_returns_raw_samples(stored):
+    store = gpu.RecordingStore(stored)
+    windows = store.window(t0=10_000, t1=19_000, max_points=100)
+    np.testing.assert_equal(windows[0].timestamps, np.arange(10, 20) * 1000)
+    np.testing.assert_equal(windows[0].data_mean, np.arange(10, 20))
+    assert windows[1].timestamps.size == 0
+
+
+def test_window_aggregates_raw_samples(stored):
+    store = gpu.RecordingStore(stored)
+    window = store.window(t0=0, t1=9_999_000, max_points=100, gpus=[0])[0]
+    assert window.timestamps.size == 100
+    assert window.data_min[0] == 0
+    assert window.data_max[0] == 99
+    assert window.data_mean[0] == pytest.approx(49.5)
+
+
+def test_window_uses_index(stored):
+    store = gpu.RecordingStore(stored)
+    window = store.window(max_points=10, gpus=[0])[0]
+    assert 0 < window.timestamps.size <= 10
+    assert window.data_min.min() == 0
+    assert window.data_max.max() == 99_999
+    np.testing.assert_allclose(np.sum(window.data_mean * np.diff(np.append(window.timestamps, 100_000_000))),
+                               np.sum(np.arange(100_000)) * 1000, rtol=1e-6)
+
+
+def test_index_is_cached(stored):
+    store = gpu.RecordingStore(stored)
+    assert store.index_path.exists()
+    cached = gpu.RecordingStore(stored)
+    levels, cached_levels = store._levels[0], cached._levels[0]
+    assert [level.block_size for level in cached_levels] == [level.block_size for level in levels]
+    assert levels[0].block_size == BLOCK_SIZE
+    np.testing.assert_equal(cached_levels[0].data_max, levels[0].data_max)
+
+
+def test_store_view_save_does_not_use_pyplot(tmp_path, stored):
+    plt.close("all")
+    view = StoreView(gpu.RecordingStore(stored), max_points=100)
+    view.save(tmp_path / "view.png", start=0.01, end=0.02)
+
+    assert plt.get_fignums() == []
+    assert (tmp_path / "view.png").stat().st_size > 0
+    ax = view.render().axes[0]
+    assert ax.get_title() == "Store Test"
+    assert len(ax.lines) == 2
@@ -0,0 +1,88 @@
+"""
+Tests for the tracing hooks around device queries
+"""
+
+import json
+
+import pytest
+
+import gpulink as gpu
+
+_POWER_CONSUMPTION = 30
+
+
+def nvmlDeviceGetPowerUsage(handle):
+    return _POWER_CONSUMPTION
+
+
+class _RecordingHook(gpu.QueryHook):
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def on_query_start(self, query, gpu):
+        self.starts.append((query, gpu))
+
+    def on_query_end(self, query, gpu, start, duration, error):
+        self.ends.append((query, gpu, duration, error))
+
+
+@pytest.fixture(autouse=True)
+def patch_nvcontext(mocker):
+    mocker.patch("gpulink.devices.nvml_device.nvmlInit")
+    mocker.patch("gpulink.devices.nvml_device.nvmlShutdown")
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetCount", return_value=2)
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetHandleByIndex")
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetName", return_value="GPU_TEST")
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetPowerUsage", new=nvmlDeviceGetPowerUsage)
+
+
+@pytest.fixture
+def hook():
+    hook = _RecordingHook()
+    gpu.add_hook(hook)
+    yield hook
+    gpu.remove_hook(hook)
+
+
+def test_hook_events(hook):
+    with gpu.DeviceCtx() as ctx:
+        ctx.get_power_usage(gpus=None)
+        ctx.get_power_usage(gpus=[1])
+    assert hook.starts == [("nvmlDeviceGetPowerUsage", 0), ("nvmlDeviceGetPowerUsage", 1),
+                           ("nvmlDeviceGetPowerUsage", 1)]
+    assert [(query, idx) for query, idx, _, _ in hook.ends] == hook.starts
+    assert all(duration >= 0 and error is None for _, _, duration, error in hook.ends)
+
+
+def test_hook_error(hook, mocker):
+    mocker.patch("gpulink.devices.nvml_device.nvmlDeviceGetPowerUsage", side_effect=RuntimeError("lost"))
+    with gpu.DeviceCtx() as ctx:
+        with pytest.raises(RuntimeError):
+            ctx.get_power_usage(gpus=[0])
+    assert len(hook.ends) == 1
+    assert isinstance(hook.ends[0][3], RuntimeError)
+
+
+def test_removed_hook(hook):
+    gpu.remove_hook(hook)
+    with gpu.DeviceCtx() as ctx:
+        assert ctx.get_power_usage(gpus=None)[0].value == _POWER_CONSUMPTION
+    assert hook.starts == [] and hook.ends == []
+
+
+def test_chrome_trace_exporter(tmp_path):
+    path = tmp_path / "trace.json"
+    with gpu.ChromeTraceExporter(path):
+        with gpu.DeviceCtx() as ctx:
+            ctx.get_power_usage(gpus=None)
+    # Uninstalled when leaving the context
+    with gpu.DeviceCtx() as ctx:
+        ctx.get_power_usage(gpus=None)
+
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [(event["name"], event["ph"], event["args"]["gpu"]) for event in events] == [
+        ("nvmlDeviceGetPowerUsage", "X", 0), ("nvmlDeviceGetPowerUsage", "X", 1)]
+    assert all(event["dur"] >= 0 for event in events)
+    assert events[0]["ts"] <= events[1]["ts"]
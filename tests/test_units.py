@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+import gpulink as gpu
+from gpulink.consts import SEC
+from gpulink.devices.device_mock import TEST_GB, TEST_POWER_CONSUMPTION
+from gpulink.recording.storage import read_header
+
+
+@pytest.fixture
+def device_ctx():
+    return gpu.DeviceCtx(device=gpu.DeviceMock)
+
+
+def _recording(data, unit):
+    return gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0")]),
+                         timeseries=[gpu.TimeSeries(np.arange(len(data)), np.array(data))],
+                         rtype=gpu.RecType.REC_TYPE_MEMORY, name="test", unit=unit)
+
+
+def test_conversion_factor():
+    assert gpu.conversion_factor("Byte", "MB") == pytest.approx(1e-6)
+    assert gpu.conversion_factor("mW", "W") == pytest.approx(1e-3)
+    assert gpu.conversion_factor("kWh", "J") == pytest.approx(3.6e6)
+    assert gpu.conversion_factor("%", "%") == 1.0
+    with pytest.raises(ValueError):
+        gpu.conversion_factor("MB", "W")
+    with pytest.raises(ValueError):
+        gpu.conversion_factor("MB", "furlong")
+
+
+def test_recorder_keeps_raw_type(device_ctx):
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_memory_recorder(ctx)
+        recorder._fetch_and_store()
+        recording = recorder.get_recording()
+    assert recording.unit == "Byte"
+    assert np.issubdtype(recording.timeseries[0].data.dtype, np.integer)
+
+
+def test_recorder_converts_while_recording(device_ctx):
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_memory_recorder(ctx).convert_to("MB")
+        recorder._fetch_and_store()
+        recording = recorder.get_recording()
+        power = gpu.Recorder.create_recorder(ctx, gpu.RecType.REC_TYPE_POWER_USAGE, unit="W")
+        power._fetch_and_store()
+        power_recording = power.get_recording()
+    assert recording.unit == "MB"
+    assert recording.unit_info == gpu.get_unit("MB")
+    assert recording.timeseries[0].data.tolist() == [TEST_GB // 2 / 1e6]
+    assert power_recording.unit == "W"
+    assert power_recording.timeseries[0].data.tolist() == [pytest.approx(TEST_POWER_CONSUMPTION / 1e3)]
+
+
+def test_buffered_recorder_converts_while_recording(device_ctx):
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_recorder(ctx, gpu.RecType.REC_TYPE_POWER_USAGE, buffered=True, unit="W")
+        recorder._fetch_and_store()
+        data = recorder.get_recording().timeseries[0].data
+    assert data.size and np.allclose(data, TEST_POWER_CONSUMPTION / 1e3)
+
+
+def test_energy_fallback_unit(device_ctx, mocker):
+    mocker.patch.object(gpu.DeviceMock, "get_energy_consumption", side_effect=NotImplementedError)
+    with device_ctx as ctx:
+        recorder = gpu.Recorder.create_recorder(ctx, gpu.RecType.REC_TYPE_ENERGY, unit="J")
+    assert recorder.unit == "J"
+
+
+def test_invalid_unit(device_ctx):
+    with device_ctx as ctx:
+        with pytest.raises(ValueError):
+            gpu.Recorder.create_memory_recorder(ctx).convert_to("W")
+
+
+def test_recording_convert_keeps_source_arrays():
+    data = np.array([1e6, 2e6])
+    recording = gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0"), gpu.Gpu(1, "GPU_1")]),
+                              timeseries=[gpu.TimeSeries(np.arange(2), data), gpu.TimeSeries(np.arange(2), data)],
+                              rtype=gpu.RecType.REC_TYPE_MEMORY, name="test", unit="Byte")
+    recording.convert_to("MB")
+    assert data.tolist() == [1e6, 2e6]
+    # Series sharing a buffer are converted once each
+    assert [ts.data.tolist() for ts in recording.timeseries] == [[1.0, 2.0], [1.0, 2.0]]
+    assert recording.unit == "MB"
+
+    recording = _recording([1000, 2000], "Byte")
+    recording.convert(1000, "KB")
+    assert recording.timeseries[0].data.tolist() == [1.0, 2.0]
+
+
+def test_compare_across_units():
+    baseline = _recording([1.0, 2.0, 3.0], "MB")
+    candidate = _recording([1e6, 2e6, 3e6], "Byte")
+    comparison = baseline.compare(candidate)
+    assert not comparison.significant
+    assert comparison.gpus[0].candidate_peak == pytest.approx(3.0)
+
+
+def test_stored_unit_info(tmp_path):
+    gpu.save_recording(_recording([1, 2], "MB"), tmp_path / "unit.rec")
+    assert read_header(tmp_path / "unit.rec")["unit_info"] == {"symbol": "MB", "quantity": "memory", "factor": 1e6}
+
+
+def test_energy_in_converted_units():
+    energy = gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0")]),
+                           timeseries=[gpu.TimeSeries(np.arange(3) * SEC, np.array([1e6, 2e6, 4e6]))],
+                           rtype=gpu.RecType.REC_TYPE_ENERGY, name="test", unit="mJ")
+    energy.convert_to("kJ")
+    assert energy.get_energy() == [pytest.approx(3e3)]
+    energy.convert_to("Wh")
+    assert energy._energy_counter(energy.timeseries[0]).tolist() == pytest.approx([0.0, 1e3, 3e3])
+
+    power = gpu.Recording(gpus=gpu.GpuSet([gpu.Gpu(0, "GPU_0")]),
+                          timeseries=[gpu.TimeSeries(np.arange(3) * SEC, np.full(3, 2.0))],
+                          rtype=gpu.RecType.REC_TYPE_POWER_USAGE, name="test", unit="kW")
+    assert power.get_energy() == [pytest.approx(4e3)]
+    assert power._energy_counter(power.timeseries[0]).tolist() == pytest.approx([0.0, 2e3, 4e3])